@@ -2,8 +2,6 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 from pathlib import Path
 import sys
 from datetime import datetime, timedelta
@@ -11,6 +9,9 @@ from datetime import datetime, timedelta
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent / 'src'))
 
+from data_preprocessing import load_aggregate_pyramid, pyramid_range, pyramid_range_totals
+from downsampling import downsample, points_for_width
+
 # Page configuration
 st.set_page_config(
     page_title="Sales Forecasting Dashboard",
@@ -210,7 +211,13 @@ def load_data():
     if (forecast_dir / 'monthly_forecast.csv').exists():
         forecasts['monthly'] = pd.read_csv(forecast_dir / 'monthly_forecast.csv')
     
-    return daily_simple, daily_features, forecasts
+    # Pre-aggregated daily/weekly/monthly/quarterly pyramid, rebuilt only when the daily series changes
+    pyramid = load_aggregate_pyramid(
+        str(data_dir / 'processed' / 'daily_sales_simple.csv'),
+        str(data_dir / 'cache' / 'aggregate_pyramid.pkl')
+    )
+    
+    return daily_simple, daily_features, forecasts, pyramid
 
 def create_plotly_theme():
     """Create consistent Plotly theme"""
@@ -228,6 +235,12 @@ def create_plotly_theme():
         }
     }
 
+def reduce_trace(x, y, chart_width, method):
+    """Downsample a trace to the chart's pixel budget before sending it to the browser"""
+    if method == 'full':
+        return x, y
+    return downsample(x, y, points_for_width(chart_width), method=method)
+
 # Main app
 def main():
     # Header
@@ -238,7 +251,7 @@ def main():
     
     # Load data
     try:
-        daily_simple, daily_features, forecasts = load_data()
+        daily_simple, daily_features, forecasts, pyramid = load_data()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         st.info("Please ensure all data files are in the correct location.")
@@ -278,6 +291,16 @@ def main():
             max_value=max_date
         )
         
+        # Chart resolution: long ranges are downsampled to the chart width,
+        # narrowing the date range above zooms in to full-resolution points
+        with st.expander("Chart resolution"):
+            chart_width = st.slider("Chart width (px)", 400, 3000, 1200, step=100)
+            downsample_method = st.selectbox(
+                "Downsampling",
+                options=['lttb', 'minmax', 'full'],
+                format_func=lambda m: {'lttb': 'LTTB (shape)', 'minmax': 'Min/Max (spikes)', 'full': 'Full resolution'}[m]
+            )
+        
         st.markdown("---")
         
         # Info section
@@ -302,28 +325,24 @@ def main():
     with tab1:
         st.markdown("## Sales Overview")
         
-        # Filter data by date range
-        if len(date_range) == 2:
-            filtered_data = daily_simple[
-                (daily_simple['Order Date'] >= pd.Timestamp(date_range[0])) &
-                (daily_simple['Order Date'] <= pd.Timestamp(date_range[1]))
-            ]
-        else:
-            filtered_data = daily_simple
+        # Filter data by date range (a slice of the precomputed daily level, indexed by date)
+        range_start, range_end = date_range if len(date_range) == 2 else (min_date, max_date)
+        filtered_data = pyramid_range(pyramid, range_start, range_end)
+        range_totals = pyramid_range_totals(pyramid, range_start, range_end)
         
         # Key metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_sales = filtered_data['Sales'].sum()
+            total_sales = range_totals['sum']
             st.metric(
                 "Total Sales",
                 f"${total_sales:,.0f}",
-                delta=f"{len(filtered_data)} days"
+                delta=f"{range_totals['count']} days"
             )
         
         with col2:
-            avg_daily_sales = filtered_data['Sales'].mean()
+            avg_daily_sales = range_totals['mean']
             st.metric(
                 "Avg Daily Sales",
                 f"${avg_daily_sales:,.0f}",
@@ -335,7 +354,7 @@ def main():
             st.metric(
                 "Peak Sales Day",
                 f"${max_sales:,.0f}",
-                delta=filtered_data.loc[filtered_data['Sales'].idxmax(), 'Order Date'].strftime('%Y-%m-%d')
+                delta=filtered_data['Sales'].idxmax().strftime('%Y-%m-%d')
             )
         
         with col4:
@@ -354,9 +373,10 @@ def main():
         fig = go.Figure()
         
         # Add main sales line
+        x, y = reduce_trace(filtered_data.index, filtered_data['Sales'], chart_width, downsample_method)
         fig.add_trace(go.Scatter(
-            x=filtered_data['Order Date'],
-            y=filtered_data['Sales'],
+            x=x,
+            y=y,
             mode='lines',
             name='Daily Sales',
             line=dict(color='#00f5ff', width=2),
@@ -365,12 +385,11 @@ def main():
             hovertemplate='<b>Date:</b> %{x}<br><b>Sales:</b> $%{y:,.2f}<extra></extra>'
         ))
         
-        # Add 7-day moving average
-        filtered_data_copy = filtered_data.copy()
-        filtered_data_copy['MA7'] = filtered_data_copy['Sales'].rolling(window=7).mean()
+        # Add 7-day moving average (precomputed over the full history)
+        x, y = reduce_trace(filtered_data.index, filtered_data['MA7'], chart_width, downsample_method)
         fig.add_trace(go.Scatter(
-            x=filtered_data_copy['Order Date'],
-            y=filtered_data_copy['MA7'],
+            x=x,
+            y=y,
             mode='lines',
             name='7-Day MA',
             line=dict(color='#ff6b6b', width=2, dash='dash'),
@@ -378,10 +397,10 @@ def main():
         ))
         
         # Add 30-day moving average
-        filtered_data_copy['MA30'] = filtered_data_copy['Sales'].rolling(window=30).mean()
+        x, y = reduce_trace(filtered_data.index, filtered_data['MA30'], chart_width, downsample_method)
         fig.add_trace(go.Scatter(
-            x=filtered_data_copy['Order Date'],
-            y=filtered_data_copy['MA30'],
+            x=x,
+            y=y,
             mode='lines',
             name='30-Day MA',
             line=dict(color='#4ecdc4', width=2, dash='dot'),
@@ -416,7 +435,7 @@ def main():
             st.metric("30-Day Growth Rate", f"{growth_rate:+.2f}%")
         
         with col2:
-            best_month = filtered_data.groupby(filtered_data['Order Date'].dt.to_period('M'))['Sales'].sum().idxmax()
+            best_month = pyramid_range_totals(pyramid, range_start, range_end, level='monthly')['sum'].idxmax()
             st.metric("Best Month", str(best_month))
         
         with col3:
@@ -483,9 +502,10 @@ def main():
                 
                 # Plot historical (last 90 days)
                 recent_data = daily_simple.tail(90)
+                x, y = reduce_trace(recent_data['Order Date'], recent_data['Sales'], chart_width, downsample_method)
                 fig.add_trace(go.Scatter(
-                    x=recent_data['Order Date'],
-                    y=recent_data['Sales'],
+                    x=x,
+                    y=y,
                     mode='lines',
                     name='Historical',
                     line=dict(color='#00f5ff', width=2),
@@ -493,9 +513,10 @@ def main():
                 ))
                 
                 # Plot forecast
+                x, y = reduce_trace(forecast_df['Date'], forecast_df['Predicted_Sales'], chart_width, downsample_method)
                 fig.add_trace(go.Scatter(
-                    x=forecast_df['Date'],
-                    y=forecast_df['Predicted_Sales'],
+                    x=x,
+                    y=y,
                     mode='lines',
                     name='Forecast',
                     line=dict(color='#ff6b6b', width=2, dash='dash'),
@@ -735,10 +756,10 @@ def main():
         
         # Monthly aggregation
         st.markdown("### 📅 Monthly Sales Trend")
-        monthly_data = daily_simple.copy()
-        monthly_data['Month'] = monthly_data['Order Date'].dt.to_period('M')
-        monthly_sales = monthly_data.groupby('Month')['Sales'].sum().reset_index()
-        monthly_sales['Month'] = monthly_sales['Month'].astype(str)
+        monthly_sales = pd.DataFrame({
+            'Month': pyramid['monthly'].index.astype(str),
+            'Sales': pyramid['monthly']['sum'].to_numpy()
+        })
         
         fig = go.Figure(data=[go.Bar(
             x=monthly_sales['Month'],
@@ -769,10 +790,7 @@ def main():
         # Day of week analysis
         st.markdown("### 📊 Day of Week Analysis")
         
-        daily_simple_copy = daily_simple.copy()
-        daily_simple_copy['DayOfWeek'] = daily_simple_copy['Order Date'].dt.day_name()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        dow_sales = daily_simple_copy.groupby('DayOfWeek')['Sales'].agg(['mean', 'sum', 'count']).reindex(day_order)
+        dow_sales = pyramid['dayofweek']
         
         col1, col2 = st.columns(2)
         
@@ -862,10 +880,11 @@ def main():
         # Quarterly analysis
         st.markdown("### 📊 Quarterly Performance")
         
-        quarterly_data = daily_simple.copy()
-        quarterly_data['Quarter'] = quarterly_data['Order Date'].dt.to_period('Q')
-        quarterly_sales = quarterly_data.groupby('Quarter')['Sales'].agg(['sum', 'mean', 'count']).reset_index()
-        quarterly_sales['Quarter'] = quarterly_sales['Quarter'].astype(str)
+        quarterly_sales = pyramid['quarterly'][['sum', 'mean', 'count']].reset_index(drop=True)
+        quarterly_sales.insert(0, 'Quarter', pyramid['quarterly'].index.astype(str))
+        
+        # Only this chart needs subplots; import it when the tab renders
+        from plotly.subplots import make_subplots
         
         fig = make_subplots(
             rows=1, cols=2,
@@ -0,0 +1,104 @@
+"""
+Benchmark cold-start import cost of the src modules and the heavy libraries
+they depend on. Every module is imported in a fresh interpreter with
+`python -X importtime`, so each number is what a new batch job or dashboard
+process would pay for that import alone.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+DEFAULT_MODULES = [
+    'data_preprocessing',
+    'feature_engineering',
+    'downsampling',
+    'artifact_store',
+    'models',
+    'backtesting',
+    'serving',
+    'visualization',
+]
+
+LIBRARY_MODULES = [
+    'pandas',
+    'sklearn.ensemble',
+    'statsmodels.tsa.arima.model',
+    'plotly.graph_objects',
+    'plotly.subplots',
+    'matplotlib.pyplot',
+]
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def import_profile(module):
+    """
+    Import a module in a fresh interpreter and parse the -X importtime output.
+
+    Args:
+        module (str): Dotted module name
+
+    Returns:
+        tuple: (total seconds, list of (cumulative seconds, name) for its direct imports)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # importtime prints children before their parent, indented by depth
+    children, pending = [], []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative = int(match.group(2)) / 1e6
+        depth = (len(match.group(3)) - 1) // 2
+        name = match.group(4)
+        if depth == 1:
+            pending.append((cumulative, name))
+        elif depth == 0:
+            if name == module:
+                total, children = cumulative, pending
+            pending = []
+    return total, children
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('modules', nargs='*', help='Modules to profile (default: every src module)')
+    parser.add_argument('--libraries', action='store_true', help='Also profile the heavy third-party libraries')
+    parser.add_argument('--top', type=int, default=3, help='Most expensive dependencies to list per module')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per module; the fastest is reported')
+    args = parser.parse_args()
+
+    modules = args.modules or DEFAULT_MODULES
+    if args.libraries:
+        modules = modules + LIBRARY_MODULES
+
+    print("="*60)
+    print("IMPORT BENCHMARK")
+    print("="*60)
+    print(f"{'Module':<30} {'Import (s)':>10}  Heaviest dependencies")
+
+    for module in modules:
+        try:
+            runs = [import_profile(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<30} {'failed':>10}  {e}")
+            continue
+        total, children = min(runs, key=lambda run: run[0])
+        heaviest = sorted(children, reverse=True)[:args.top]
+        deps = ', '.join(f"{name} {seconds:.2f}" for seconds, name in heaviest)
+        print(f"{module:<30} {total:>10.3f}  {deps}")
+
+    print("="*60)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""
+Benchmark the forecasting pipeline at increasing data scales.
+
+For every scale (a multiple of the 9,994-row Superstore sample) a synthetic
+order file is written with synthetic_data.write_orders and each stage is timed: load_data,
+prepare_time_series_data, create_all_features, fit/predict of every
+forecaster, evaluate_model and batch figure rendering. Wall time, peak
+memory and throughput are appended to a JSON history, and stages that got
+slower than in the previous run are flagged.
+
+Wall time and memory come from separate runs of each stage, since
+tracemalloc slows down the code it traces. The memory run happens in a
+forked process: its peak is the traced Python allocations plus the peak RSS
+of the largest worker process the stage started (RUSAGE_CHILDREN), which is
+what the process-pool stages allocate in. --skip-memory drops that second
+run, e.g. for the 10,000x scale.
+
+Row-level stages (loading, aggregation) process scale x 9,994 orders.
+Series-level stages run on one daily series per simulated store, with
+min(scale, --max-series) stores, so their cost grows with the number of
+series rather than with an unrealistically long history.
+
+The 10,000x scale (~100M rows, several GB of CSV) is opt-in:
+    python scripts/benchmark_pipeline.py --scales 1 100 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from data_preprocessing import load_data, prepare_time_series_data
+from synthetic_data import write_orders
+from feature_engineering import create_all_features
+from models import BaselineForecaster, ARIMAForecaster, MLForecaster, evaluate_model
+from visualization import render_figures
+
+# models imports these on first use; load them now so the first scale is not charged for it
+import sklearn.ensemble, sklearn.linear_model, statsmodels.tsa.arima.model  # noqa: E401,F401
+
+SUPERSTORE_ROWS = 9994
+HORIZON = 30
+
+# ru_maxrss is reported in KiB on Linux and in bytes on macOS
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+FORECASTERS = {
+    'naive': (BaselineForecaster, {'method': 'naive'}),
+    'arima': (ARIMAForecaster, {'order': (1, 1, 1)}),
+    'linear_regression': (MLForecaster, {'model_type': 'linear_regression'}),
+    'random_forest': (MLForecaster, {'model_type': 'random_forest', 'n_estimators': 50, 'random_state': 42}),
+}
+
+def quietly(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return func(*args)
+
+def traced_peak(func, *args):
+    """Return (peak traced MiB, peak RSS MiB of the largest child process) of one call."""
+    tracemalloc.start()
+    try:
+        quietly(func, *args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * RSS_UNIT if resource else 0
+    return peak / 2**20, children / 2**20
+
+def _memory_run(conn, func, args):
+    try:
+        conn.send(traced_peak(func, *args))
+    finally:
+        conn.close()
+
+def measure_memory(func, *args):
+    """
+    Peak memory of func(*args) as (traced MiB, child RSS MiB), or None if the run died.
+    
+    Runs in a forked process so RUSAGE_CHILDREN only covers the workers this
+    call starts; without fork (Windows) it runs in-process with traced
+    allocations only.
+    """
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        return traced_peak(func, *args)[0], 0.0
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_memory_run, args=(sender, func, args))
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        return None
+    finally:
+        receiver.close()
+        process.join()
+
+def measure(func, *args, trace_memory=True):
+    """
+    Run func quietly; return (result, wall seconds, peak MiB, child peak MiB).
+    
+    The timed run is untraced; with trace_memory, func runs a second time
+    under measure_memory and the peak is traced plus child memory (None
+    when not measured).
+    """
+    start = time.perf_counter()
+    result = quietly(func, *args)
+    seconds = time.perf_counter() - start
+    memory = measure_memory(func, *args) if trace_memory else None
+    if memory is None:
+        return result, seconds, None, None
+    traced, children = memory
+    return result, seconds, traced + children, children
+
+def make_store_series(daily, n_series, seed=42):
+    """One daily sales frame per simulated store, each a noisy copy of the total."""
+    rng = np.random.default_rng(seed)
+    frame = daily.reset_index()[['Order Date', 'Sales']]
+    return [
+        frame.assign(Sales=frame['Sales'].to_numpy() * rng.lognormal(0.0, 0.2, len(frame)))
+        for _ in range(n_series)
+    ]
+
+def split_series(features):
+    """Train/test split of a feature frame: the last HORIZON days are held out."""
+    feature_columns = [c for c in features.select_dtypes(include='number').columns if c != 'Sales']
+    train, test = features.iloc[:-HORIZON], features.iloc[-HORIZON:]
+    return train, test, feature_columns
+
+def fit_all(forecaster_cls, kwargs, feature_frames):
+    fitted = []
+    for features in feature_frames:
+        train, _, feature_columns = split_series(features)
+        forecaster = forecaster_cls(**kwargs)
+        if forecaster_cls is MLForecaster:
+            forecaster.fit(train[feature_columns], train['Sales'])
+        else:
+            forecaster.fit(train['Sales'].reset_index(drop=True))
+        fitted.append(forecaster)
+    return fitted
+
+def predict_all(fitted, feature_frames):
+    predictions = []
+    for forecaster, features in zip(fitted, feature_frames):
+        _, test, feature_columns = split_series(features)
+        if isinstance(forecaster, MLForecaster):
+            predictions.append(np.asarray(forecaster.predict(test[feature_columns])))
+        else:
+            predictions.append(np.asarray(forecaster.predict(HORIZON)))
+    return predictions
+
+def evaluate_all(predictions, feature_frames):
+    return [
+        evaluate_model(features['Sales'].to_numpy()[-HORIZON:], y_pred, name, verbose=False)
+        for name, model_predictions in predictions.items()
+        for y_pred, features in zip(model_predictions, feature_frames)
+    ]
+
+def plot_all(predictions, feature_frames, comparison_df, n_plots, out_dir, n_jobs=None):
+    jobs = []
+    for i, features in enumerate(feature_frames[:n_plots]):
+        series = features.set_index('Order Date')['Sales']
+        actuals = series.iloc[-HORIZON:]
+        forecast = pd.Series(predictions['linear_regression'][i], index=actuals.index)
+        prefix = os.path.join(out_dir, f"store_{i}")
+        jobs += [
+            ('plot_forecast', {'historical': series.iloc[:-HORIZON], 'forecast': forecast, 'actuals': actuals,
+                               'title': 'Benchmark', 'save_path': f"{prefix}_forecast.png"}),
+            ('plot_error_analysis', {'y_true': actuals, 'y_pred': forecast, 'title': 'Benchmark',
+                                     'save_path': f"{prefix}_errors.png"}),
+            ('plot_model_comparison', {'df': comparison_df, 'save_path': f"{prefix}_comparison.png"}),
+            ('create_dashboard', {'historical': series.iloc[:-HORIZON], 'forecast': forecast, 'actuals': actuals,
+                                  'comparison_df': comparison_df, 'save_path': f"{prefix}_dashboard.png"}),
+        ]
+    return render_figures(jobs, n_jobs=n_jobs)
+
+def run_scale(scale, args):
+    """Benchmark every stage at one scale; return a list of result records."""
+    results = []
+
+    def timed(func, *func_args):
+        return measure(func, *func_args, trace_memory=not args.skip_memory)
+
+    def record(stage, items, unit, seconds, peak_mb, child_peak_mb):
+        results.append({
+            'scale': scale, 'stage': stage, 'items': int(items), 'unit': unit,
+            'seconds': round(seconds, 6),
+            'peak_mb': round(peak_mb, 2) if peak_mb is not None else None,
+            'child_peak_mb': round(child_peak_mb, 2) if child_peak_mb is not None else None,
+            'throughput': round(items / seconds, 2) if seconds > 0 else None,
+        })
+        peak = f"{peak_mb:>9.1f} MiB" if peak_mb is not None else f"{'-':>13}"
+        print(f"{scale:>7}x {stage:<28} {items:>12,} {unit:<8} {seconds:>9.3f}s {peak} "
+              f"{items / seconds if seconds > 0 else float('inf'):>14,.0f}/s")
+
+    n_rows = SUPERSTORE_ROWS * scale
+    csv_path = Path(args.work_dir) / f"orders_{n_rows}_{args.seed}.csv"
+    if not csv_path.exists():
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_orders(str(csv_path), n_rows, seed=args.seed)
+        print(f"   Generated {n_rows:,} orders -> {csv_path}")
+
+    df, *timing = timed(load_data, str(csv_path))
+    record('load_data', len(df), 'rows', *timing)
+
+    daily, *timing = timed(prepare_time_series_data, df)
+    record('prepare_time_series_data', len(df), 'rows', *timing)
+    del df
+
+    n_series = min(scale, args.max_series)
+    stores = make_store_series(daily, n_series, seed=args.seed)
+    feature_frames, *timing = timed(lambda: [create_all_features(s) for s in stores])
+    record('create_all_features', sum(len(s) for s in stores), 'rows', *timing)
+
+    predictions = {}
+    for name, (forecaster_cls, kwargs) in FORECASTERS.items():
+        if name not in args.models:
+            continue
+        fitted, *timing = timed(fit_all, forecaster_cls, kwargs, feature_frames)
+        record(f"{name}.fit", n_series, 'series', *timing)
+        predictions[name], *timing = timed(predict_all, fitted, feature_frames)
+        record(f"{name}.predict", n_series, 'series', *timing)
+
+    metrics, *timing = timed(evaluate_all, predictions, feature_frames)
+    record('evaluate_model', len(metrics), 'evals', *timing)
+
+    if 'linear_regression' in predictions:
+        comparison_df = pd.DataFrame(metrics).assign(
+            model=[name for name in predictions for _ in feature_frames]
+        ).groupby('model')[['RMSE', 'MAE', 'MAPE', 'R2']].mean()
+        n_plots = min(n_series, args.max_plots)
+        figures_dir = os.path.join(args.work_dir, 'figures', f"{scale}x")
+        _, *timing = timed(plot_all, predictions, feature_frames, comparison_df, n_plots, figures_dir,
+                           args.plot_jobs)
+        record('plots', 4 * n_plots, 'figures', *timing)
+
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_history(history, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+def report_regressions(results, history, threshold):
+    """Compare against the latest earlier run that measured the same scale and stage."""
+    previous = {}
+    for run in history:
+        for r in run['results']:
+            previous[(r['scale'], r['stage'])] = r['seconds']
+
+    regressions = []
+    for r in results:
+        before = previous.get((r['scale'], r['stage']))
+        if before and r['seconds'] > before * (1 + threshold):
+            regressions.append((r, before))
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} stage(s) slower than the previous run by more than {threshold:.0%}:")
+        for r, before in regressions:
+            print(f"   {r['scale']}x {r['stage']}: {before:.3f}s -> {r['seconds']:.3f}s")
+    else:
+        print("\n✅ No regressions against the previous run")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 100],
+                        help='Multiples of the Superstore row count (10000 = ~100M rows)')
+    parser.add_argument('--max-series', type=int, default=20, help='Cap on simulated stores for series-level stages')
+    parser.add_argument('--max-plots', type=int, default=3, help='Cap on series plotted per scale')
+    parser.add_argument('--plot-jobs', type=int, default=None,
+                        help='Processes used to render figures (default: all CPUs)')
+    parser.add_argument('--models', nargs='+', default=list(FORECASTERS), choices=list(FORECASTERS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-memory', action='store_true',
+                        help='Only time each stage; skip the separate memory run')
+    parser.add_argument('--work-dir', default=str(ROOT / 'outputs' / 'benchmarks' / 'data'),
+                        help='Where synthetic order files are written (and reused)')
+    parser.add_argument('--history', default=str(ROOT / 'outputs' / 'benchmarks' / 'history.json'))
+    parser.add_argument('--regression-threshold', type=float, default=0.2,
+                        help='Relative slowdown that is reported as a regression')
+    args = parser.parse_args()
+
+    print("="*100)
+    print("PIPELINE BENCHMARK")
+    print("="*100)
+    print(f"{'Scale':>8} {'Stage':<28} {'Items':>12} {'Unit':<8} {'Wall':>10} {'Peak':>13} {'Throughput':>16}")
+
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(scale, args))
+
+    history = load_history(args.history)
+    regressions = report_regressions(results, history, args.regression_threshold)
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'results': results,
+    })
+    save_history(history, args.history)
+    print(f"💾 Appended {len(results)} results to {args.history}")
+    print("="*100)
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+# joblib is imported where it is used so that fingerprint() (used by the
+# feature cache) does not pay its import cost
+
+def fingerprint(*parts):
+    """
+    Stable SHA-256 fingerprint of data, feature lists and parameters.
+    
+    DataFrames/Series are hashed by content (values, index, columns and
+    dtypes), arrays by bytes, shape and dtype, lists containing either
+    recursively, and everything else by its JSON (or repr) form.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (list, tuple)) and any(isinstance(p, (pd.DataFrame, pd.Series, np.ndarray)) for p in part):
+            h.update(fingerprint(*part).encode())
+        elif isinstance(part, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(part).values.tobytes())
+            if isinstance(part, pd.DataFrame):
+                h.update(json.dumps([list(map(str, part.columns)), list(map(str, part.dtypes))]).encode())
+            else:
+                h.update(f"{part.name}|{part.dtype}".encode())
+        elif isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+            h.update(f"{part.shape}|{part.dtype}".encode())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=repr).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+def forecaster_params(forecaster):
+    """Configuration of an (unfitted) forecaster, for use in artifact keys."""
+    params = {'class': type(forecaster).__name__}
+    for name, value in vars(forecaster).items():
+        if hasattr(value, 'get_params'):
+            params[name] = {'class': type(value).__name__, 'params': value.get_params()}
+        elif value is None or isinstance(value, (str, int, float, bool, tuple, list, dict)):
+            params[name] = value
+    return params
+
+class ArtifactStore:
+    """
+    Content-addressed store of fitted forecasters.
+    
+    Artifacts live in <root>/<key[:2]>/<key>/ as an uncompressed joblib
+    pickle plus a JSON manifest. Forecasters whose large arrays survive
+    unpickling as plain numpy arrays (the state-space matrices of a fitted
+    ARIMA) are memory-mapped on load.
+    
+    Tree ensembles are stored differently: the node and value arrays of
+    every fitted tree go to trees.nodes.npy / trees.values.npy and the
+    rest of the forecaster to a small model.pkl. On load the arrays are
+    memory-mapped and each sklearn Tree is rebuilt from its slice. Tree
+    copies the arrays into its own buffers, so the fitted model still
+    holds them in memory; tree_arrays() gives read-only mapped views for
+    code that only needs to inspect the nodes.
+    """
+    # Forecasters whose arrays stay memory-mapped after loading
+    MMAP_CLASSES = {'ARIMAForecaster'}
+
+    def __init__(self, root='outputs/models'):
+        self.root = root
+
+    def key_for(self, data, features=None, params=None):
+        """Artifact key for a model trained on data with the given features and parameters."""
+        return fingerprint(data, features, params)
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        return os.path.exists(os.path.join(self.path(key), 'manifest.json'))
+
+    def save(self, key, forecaster, metadata=None):
+        """
+        Save a fitted forecaster under key.
+        
+        Args:
+            key: Artifact key (see key_for)
+            forecaster: Fitted forecaster object
+            metadata: Optional JSON-serializable dict stored in the manifest
+        """
+        final_dir = self.path(key)
+        tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        
+        manifest = {
+            'key': key,
+            'class': type(forecaster).__name__,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'metadata': metadata or {},
+        }
+        trees = _fitted_trees(forecaster)
+        if trees:
+            _dump_trees(forecaster, trees, tmp_dir)
+            manifest['format'] = 'trees'
+        else:
+            import joblib
+            joblib.dump(forecaster, os.path.join(tmp_dir, 'model.joblib'))
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2, default=repr)
+        
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+        print(f"✅ Saved {manifest['class']} artifact {key[:12]}")
+
+    def load(self, key, mmap_mode='auto'):
+        """
+        Load a forecaster saved under key.
+        
+        Args:
+            key: Artifact key
+            mmap_mode: numpy memmap mode for large arrays. 'auto' uses
+                copy-on-write mapping (writable for compiled code) for the
+                classes in MMAP_CLASSES, read-only mapping for stored tree
+                arrays and a plain load otherwise; None always loads into
+                memory.
+        """
+        if not self.exists(key):
+            raise KeyError(f"No artifact {key} in {self.root}")
+        manifest = self.manifest(key)
+        if manifest.get('format') == 'trees':
+            return _load_trees(self.path(key), 'r' if mmap_mode == 'auto' else mmap_mode)
+        if mmap_mode == 'auto':
+            mmap_mode = 'c' if manifest['class'] in self.MMAP_CLASSES else None
+        import joblib
+        return joblib.load(os.path.join(self.path(key), 'model.joblib'), mmap_mode=mmap_mode)
+
+    def tree_arrays(self, key):
+        """
+        Read-only memory-mapped node and value arrays of a stored tree ensemble.
+        
+        Args:
+            key: Artifact key of a forecaster saved with tree arrays
+            
+        Returns:
+            list: (nodes, values) np.memmap pair per tree, in estimator order
+        """
+        if not self.exists(key) or self.manifest(key).get('format') != 'trees':
+            raise KeyError(f"No tree artifact {key} in {self.root}")
+        return _tree_arrays(self.path(key), 'r')[1]
+
+    def manifest(self, key):
+        with open(os.path.join(self.path(key), 'manifest.json')) as f:
+            return json.load(f)
+
+    def fit_or_load(self, forecaster, *fit_args, features=None, metadata=None):
+        """
+        Fit forecaster on fit_args, or load the stored result of an identical fit.
+        
+        The key covers the training data (fit_args), the feature names and the
+        forecaster's configuration, so unchanged inputs skip training.
+        
+        Args:
+            forecaster: Unfitted forecaster
+            *fit_args: Arguments for forecaster.fit (e.g. X, y or y)
+            features: Optional feature names to include in the key
+            metadata: Optional dict stored in the manifest
+            
+        Returns:
+            tuple: (fitted forecaster, artifact key)
+        """
+        if features is None and fit_args and isinstance(fit_args[0], pd.DataFrame):
+            features = list(map(str, fit_args[0].columns))
+        key = self.key_for(list(fit_args), features, forecaster_params(forecaster))
+        if self.exists(key):
+            print(f"✅ Loaded {type(forecaster).__name__} artifact {key[:12]} (training skipped)")
+            return self.load(key), key
+        
+        forecaster.fit(*fit_args)
+        self.save(key, forecaster, metadata)
+        return forecaster, key
+
+def _fitted_trees(forecaster):
+    """sklearn Tree objects of a fitted tree ensemble inside forecaster, or []."""
+    model = getattr(forecaster, 'model', None)
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None or not len(estimators):
+        return []
+    estimators = np.ravel(np.asarray(estimators, dtype=object))
+    trees = [getattr(est, 'tree_', None) for est in estimators]
+    if any(tree is None for tree in trees):
+        return []
+    value_shapes = {tree.__getstate__()['values'].shape[1:] for tree in trees}
+    return trees if len(value_shapes) == 1 else []
+
+class _TreePickler(pickle.Pickler):
+    """Pickles a forecaster with its trees replaced by references into the .npy files."""
+    def __init__(self, f, trees):
+        super().__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tree_ids = {id(tree): i for i, tree in enumerate(trees)}
+
+    def persistent_id(self, obj):
+        i = self.tree_ids.get(id(obj))
+        return None if i is None else ('tree', i)
+
+class _TreeUnpickler(pickle.Unpickler):
+    def __init__(self, f, trees):
+        super().__init__(f)
+        self.trees = trees
+
+    def persistent_load(self, pid):
+        kind, i = pid
+        if kind != 'tree':
+            raise pickle.UnpicklingError(f"Unknown persistent id {pid!r}")
+        return self.trees[i]
+
+def _dump_trees(forecaster, trees, directory):
+    """Write the trees' node/value arrays as .npy files and the rest as model.pkl."""
+    meta, nodes, values = [], [], []
+    for tree in trees:
+        cls, args, state = tree.__reduce__()
+        n_features, n_classes, n_outputs = args
+        meta.append({
+            'n_features': int(n_features),
+            'n_classes': np.asarray(n_classes).tolist(),
+            'n_outputs': int(n_outputs),
+            'max_depth': int(state['max_depth']),
+            'node_count': int(state['node_count']),
+        })
+        nodes.append(state['nodes'])
+        values.append(state['values'])
+    np.save(os.path.join(directory, 'trees.nodes.npy'), np.concatenate(nodes))
+    np.save(os.path.join(directory, 'trees.values.npy'), np.concatenate(values))
+    with open(os.path.join(directory, 'trees.json'), 'w') as f:
+        json.dump(meta, f)
+    with open(os.path.join(directory, 'model.pkl'), 'wb') as f:
+        _TreePickler(f, trees).dump(forecaster)
+
+def _tree_arrays(directory, mmap_mode):
+    """Per-tree metadata and (nodes, values) slices of the stored tree arrays."""
+    with open(os.path.join(directory, 'trees.json')) as f:
+        meta = json.load(f)
+    nodes = np.load(os.path.join(directory, 'trees.nodes.npy'), mmap_mode=mmap_mode)
+    values = np.load(os.path.join(directory, 'trees.values.npy'), mmap_mode=mmap_mode)
+    arrays, start = [], 0
+    for m in meta:
+        end = start + m['node_count']
+        arrays.append((nodes[start:end], values[start:end]))
+        start = end
+    return meta, arrays
+
+def _load_trees(directory, mmap_mode):
+    """Rebuild a forecaster saved by _dump_trees."""
+    from sklearn.tree._tree import Tree
+    meta, arrays = _tree_arrays(directory, mmap_mode)
+    trees = []
+    for m, (nodes, values) in zip(meta, arrays):
+        tree = Tree(m['n_features'], np.asarray(m['n_classes'], dtype=np.intp), m['n_outputs'])
+        tree.__setstate__({'max_depth': m['max_depth'], 'node_count': m['node_count'],
+                           'nodes': nodes, 'values': values})
+        trees.append(tree)
+    with open(os.path.join(directory, 'model.pkl'), 'rb') as f:
+        return _TreeUnpickler(f, trees).load()
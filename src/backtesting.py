@@ -0,0 +1,130 @@
+import pandas as pd
+import numpy as np
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .instrumentation import init_worker, run_collecting, merge
+    from .models import MLForecaster, batch_metrics, METRIC_NAMES
+except ImportError:
+    from instrumentation import init_worker, run_collecting, merge
+    from models import MLForecaster, batch_metrics, METRIC_NAMES
+
+# Feature frame shared with worker processes, set once per worker by _init_worker
+_FEATURES = None
+
+def _init_worker(features):
+    global _FEATURES
+    _FEATURES = features
+
+def _init_pool_worker(features):
+    init_worker()
+    _init_worker(features)
+
+def make_folds(n_rows, n_folds=5, horizon=30, step=None, min_train_size=None):
+    """
+    Rolling-origin folds as (train_end, test_end) row positions.
+    
+    The last fold ends at the last row; earlier origins move back by
+    `step` rows (default: horizon) each.
+    
+    Args:
+        n_rows: Number of rows in the (feature) frame
+        n_folds: Maximum number of folds
+        horizon: Test rows per fold
+        step: Rows between consecutive origins
+        min_train_size: Minimum training rows (default: 2 x horizon)
+    """
+    step = step or horizon
+    min_train_size = min_train_size or 2 * horizon
+    folds = []
+    for k in range(n_folds):
+        train_end = n_rows - horizon - k * step
+        if train_end < min_train_size:
+            break
+        folds.append((train_end, train_end + horizon))
+    return folds[::-1]
+
+def _run_fold(fold, model_name, forecaster_cls, forecaster_kwargs, train_end, test_end, target_column, feature_columns):
+    """Fit one model on one fold of the shared feature frame and forecast its test window."""
+    features = _FEATURES
+    train, test = features.iloc[:train_end], features.iloc[train_end:test_end]
+    y_test = test[target_column].to_numpy()
+    
+    start = time.perf_counter()
+    forecaster = forecaster_cls(**forecaster_kwargs)
+    if issubclass(forecaster_cls, MLForecaster):
+        forecaster.fit(train[feature_columns], train[target_column])
+        y_pred = forecaster.predict(test[feature_columns])
+    else:
+        forecaster.fit(train[target_column])
+        y_pred = forecaster.predict(test_end - train_end)
+    seconds = time.perf_counter() - start
+    
+    origin = features.index[train_end] if not isinstance(features.index, pd.RangeIndex) else train_end
+    return fold, origin, model_name, y_test, np.asarray(y_pred, dtype=np.float64), seconds
+
+def walk_forward_backtest(features, models, target_column='Sales', n_folds=5, horizon=30, step=None,
+                          min_train_size=None, n_jobs=None):
+    """
+    Rolling-origin backtest of several models over many folds in parallel.
+    
+    Features are computed once by the caller (e.g. with create_all_features)
+    and only sliced per fold. MLForecaster models are trained on the
+    numeric feature columns; all other forecasters are fitted on the target
+    series and asked for a horizon-length forecast.
+    
+    Args:
+        features: Feature frame ordered by date, including target_column
+        models: Dict of name -> (forecaster_cls, forecaster_kwargs)
+        target_column: Name of the target column
+        n_folds: Maximum number of folds
+        horizon: Test days per fold
+        step: Days between fold origins (default: horizon)
+        min_train_size: Minimum training days
+        n_jobs: Worker processes (1 runs in the calling process)
+        
+    Returns:
+        pd.DataFrame: Tidy table with columns fold, origin, model, metric, value.
+    """
+    folds = make_folds(len(features), n_folds, horizon, step, min_train_size)
+    feature_columns = [c for c in features.select_dtypes(include='number').columns if c != target_column]
+    tasks = [
+        (fold, name, cls, kwargs, train_end, test_end, target_column, feature_columns)
+        for fold, (train_end, test_end) in enumerate(folds)
+        for name, (cls, kwargs) in models.items()
+    ]
+    
+    if n_jobs == 1:
+        _init_worker(features)
+        outputs = [_run_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_pool_worker, initargs=(features,)) as executor:
+            outputs = []
+            for output, metrics in executor.map(run_collecting, itertools.repeat(_run_fold), *zip(*tasks)):
+                outputs.append(output)
+                merge(metrics)
+    
+    # Score every (fold, model) in one vectorized pass; each task is a row of
+    # the stacked arrays, and MASE is scaled by that fold's training target
+    target = features[target_column].to_numpy(dtype=np.float64)
+    y_true = np.full((len(tasks), horizon), np.nan)
+    y_pred = np.full((len(tasks), horizon), np.nan)
+    y_train = np.full((len(tasks), folds[-1][0] if folds else 0), np.nan)
+    for i, (task, output) in enumerate(zip(tasks, outputs)):
+        train_end = task[4]
+        y_true[i, :len(output[3])] = output[3]
+        y_pred[i, :len(output[4])] = output[4][:horizon]
+        y_train[i, :train_end] = target[:train_end]
+    scores = batch_metrics(y_true, y_pred, y_train=y_train)
+    scores['fit_predict_seconds'] = [output[5] for output in outputs]
+    
+    rows = [
+        (fold, origin, model_name, metric, value)
+        for (fold, origin, model_name, *_), values in zip(outputs, scores[METRIC_NAMES + ['fit_predict_seconds']].to_numpy())
+        for metric, value in zip(METRIC_NAMES + ['fit_predict_seconds'], values)
+    ]
+    results = pd.DataFrame(rows, columns=['fold', 'origin', 'model', 'metric', 'value'])
+    print(f"✅ Backtested {len(models)} models over {len(folds)} folds ({len(tasks)} fits)")
+    return results
@@ -1,27 +1,148 @@
 import pandas as pd
 import numpy as np
+import hashlib
+import json
+import os
+import pickle
+import shutil
 
-def load_data(filepath):
+try:
+    from .instrumentation import instrument
+except ImportError:
+    from instrumentation import instrument
+
+CACHE_FORMAT_VERSION = 1
+
+def _file_fingerprint(filepath, with_hash=True):
+    """
+    Compute the size, mtime and (optionally) SHA-256 of a file.
+    
+    Args:
+        filepath (str): Path to the file.
+        with_hash (bool): Whether to hash the file contents.
+        
+    Returns:
+        dict: Fingerprint with 'size', 'mtime_ns' and 'sha256' keys.
+    """
+    stat = os.stat(filepath)
+    digest = None
+    if with_hash:
+        h = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+                h.update(block)
+        digest = h.hexdigest()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+
+def _default_cache_dir(filepath):
+    return f"{filepath}.cache"
+
+def _read_cache(filepath, cache_dir):
+    """Return the cached dataframe for filepath, or None if the cache is missing or stale."""
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != CACHE_FORMAT_VERSION:
+        return None
+    
+    # Size and mtime are cheap to check; only hash when they disagree (e.g. after a touch or copy)
+    source = manifest['source']
+    current = _file_fingerprint(filepath, with_hash=False)
+    if current['size'] != source['size']:
+        return None
+    if current['mtime_ns'] != source['mtime_ns']:
+        current = _file_fingerprint(filepath)
+        if current['sha256'] != source['sha256']:
+            return None
+        manifest['source'] = current
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+    
+    columns = {}
+    for i, col in enumerate(manifest['columns']):
+        if col['kind'] == 'codes':
+            codes = np.load(os.path.join(cache_dir, f'{i}.codes.npy'), mmap_mode='c')
+            categories = np.load(os.path.join(cache_dir, f'{i}.categories.npy'))
+            values = pd.Categorical.from_codes(codes, categories)
+            columns[col['name']] = pd.Series(values).astype(col['dtype'])
+        else:
+            # Copy-on-write mapping: pages are shared until written, and writes stay private,
+            # so the frame behaves like one parsed from the CSV
+            columns[col['name']] = np.load(os.path.join(cache_dir, f'{i}.npy'), mmap_mode='c').view(np.ndarray)
+    return pd.DataFrame(columns, copy=False)
+
+def _write_cache(df, filepath, cache_dir, fingerprint):
+    """Write df as one .npy file per column; string columns are stored as category codes."""
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if series.dtype.kind in 'biufcmM':
+            np.save(os.path.join(tmp_dir, f'{i}.npy'), series.to_numpy())
+            columns.append({'name': name, 'kind': 'array', 'dtype': str(series.dtype)})
+        else:
+            codes, categories = pd.factorize(series)
+            np.save(os.path.join(tmp_dir, f'{i}.codes.npy'), codes.astype(np.int32))
+            np.save(os.path.join(tmp_dir, f'{i}.categories.npy'), np.asarray(categories, dtype=str))
+            columns.append({'name': name, 'kind': 'codes', 'dtype': str(series.dtype)})
+    
+    manifest = {'version': CACHE_FORMAT_VERSION, 'source': fingerprint, 'columns': columns}
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+@instrument('load')
+def load_data(filepath, cache=False, cache_dir=None):
     """
     Load data from a CSV file.
     
+    With cache=True, the parsed frame is also written to a typed columnar cache
+    (one NumPy file per column) keyed by the source file's size, mtime and
+    SHA-256. Later calls memory-map the cache (copy-on-write, so the returned
+    frame can be modified like a freshly parsed one) instead of parsing the CSV.
+    
     Args:
         filepath (str): Path to the CSV file.
+        cache (bool): Read from / write to the columnar cache.
+        cache_dir (str): Cache directory (defaults to '<filepath>.cache').
         
     Returns:
         pd.DataFrame: Loaded dataframe.
     """
+    if cache:
+        cache_dir = cache_dir or _default_cache_dir(filepath)
+        try:
+            df = _read_cache(filepath, cache_dir)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring unreadable cache {cache_dir}: {e}")
+            df = None
+        if df is not None:
+            print(f"✅ Successfully loaded data from cache: {df.shape[0]} rows, {df.shape[1]} columns")
+            return df
+        fingerprint = _file_fingerprint(filepath)
+    
     try:
         df = pd.read_csv(filepath, encoding='windows-1252') # Common encoding for superstore dataset
-        print(f"✅ Successfully loaded data: {df.shape[0]} rows, {df.shape[1]} columns")
-        return df
     except UnicodeDecodeError:
         df = pd.read_csv(filepath, encoding='utf-8')
-        print(f"✅ Successfully loaded data: {df.shape[0]} rows, {df.shape[1]} columns")
-        return df
     except Exception as e:
         print(f"Error loading data: {e}")
         raise e
+    print(f"✅ Successfully loaded data: {df.shape[0]} rows, {df.shape[1]} columns")
+    
+    if cache:
+        try:
+            _write_cache(df, filepath, cache_dir, fingerprint)
+        except OSError as e:
+            print(f"⚠️ Could not write cache {cache_dir}: {e}")
+    return df
 
 def explore_data(df):
     """
@@ -57,6 +178,7 @@ def explore_data(df):
     print("-"*60)
     print(df.describe())
 
+@instrument('clean')
 def validate_data_quality(df):
     """
     Check for data quality issues like duplicates.
@@ -88,6 +210,7 @@ def validate_data_quality(df):
     print("\n✅ Data quality check completed.")
     return True
 
+@instrument('clean')
 def handle_missing_values(df):
     """
     Handle missing values in the dataframe.
@@ -119,27 +242,70 @@ def handle_missing_values(df):
     
     return df_clean
 
-def prepare_time_series_data(df, date_column='Order Date', value_column='Sales', freq='D'):
+def _prepare_panel_data(df, group_columns, date_column, value_column, freq):
+    """Aggregate df into a long-format panel with one row per series and period."""
+    dates = df[date_column]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    frame = df[group_columns + [value_column]].assign(**{date_column: dates})
+    
+    # One grouped pass over all series at once
+    agg = frame.groupby(group_columns + [pd.Grouper(key=date_column, freq=freq)], observed=True, sort=True)[value_column].sum()
+    
+    # Align every series on the same date axis, filling empty periods with 0 like resample().sum()
+    periods = agg.index.get_level_values(-1)
+    all_periods = pd.date_range(periods.min(), periods.max(), freq=freq, name=date_column)
+    series_keys = agg.index.droplevel(-1).unique()
+    series_keys = series_keys.to_frame(index=False) if isinstance(series_keys, pd.MultiIndex) else pd.DataFrame({group_columns[0]: series_keys})
+    full_index = pd.MultiIndex.from_arrays(
+        [np.repeat(series_keys[c].to_numpy(), len(all_periods)) for c in group_columns]
+        + [np.tile(all_periods.to_numpy(), len(series_keys))],
+        names=group_columns + [date_column]
+    )
+    return agg.reindex(full_index, fill_value=0).reset_index()
+
+@instrument('aggregate')
+def prepare_time_series_data(df, date_column='Order Date', value_column='Sales', freq='D', group_columns=None):
     """
     Prepare time series data by aggregating by date.
     
+    With group_columns, builds a long-format panel with one series per
+    combination of group values (e.g. Category x Region) in a single
+    groupby pass. All series share the same date range, with 0 for periods
+    without orders.
+    
     Args:
         df (pd.DataFrame): Input dataframe.
         date_column (str): Name of the date column.
         value_column (str): Name of the value column to aggregate.
         freq (str): Frequency string (e.g. 'D' for daily).
+        group_columns (str or list): Optional columns identifying each series.
         
     Returns:
-        pd.DataFrame: Aggregated time series data.
+        pd.DataFrame: Aggregated time series data indexed by date, or, with
+            group_columns, a panel with columns group_columns + [date_column, value_column].
     """
     print("\n" + "-"*60)
     print("PREPARING TIME SERIES DATA")
     print("-"*60)
     
+    if group_columns is not None:
+        group_columns = [group_columns] if isinstance(group_columns, str) else list(group_columns)
+        panel = _prepare_panel_data(df, group_columns, date_column, value_column, freq)
+        n_series = panel[group_columns].drop_duplicates().shape[0]
+        
+        print(f"✅ Prepared panel data:")
+        print(f"   Series: {n_series} ({' x '.join(group_columns)})")
+        print(f"   Date range: {panel[date_column].min()} to {panel[date_column].max()}")
+        print(f"   Frequency: {freq}")
+        print(f"   Total rows: {panel.shape[0]}")
+        
+        return panel
+    
     df = df.copy()
     
     # Ensure date column is datetime
-    if df[date_column].dtype == 'object':
+    if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
         df[date_column] = pd.to_datetime(df[date_column])
         
     # Set index
@@ -157,3 +323,346 @@ def prepare_time_series_data(df, date_column='Order Date', value_column='Sales',
     print(f"   Total periods: {ts_data.shape[0]}")
     
     return ts_data
+
+class DailyAccumulator:
+    """
+    Fixed-size, date-indexed accumulator of per-day sums.
+    
+    Memory is proportional to the number of days covered, not to the number
+    of rows added, so arbitrarily long order histories can be aggregated in
+    chunks.
+    """
+    def __init__(self):
+        self.start = None   # day number (days since epoch) of sums[0]
+        self.first = None   # earliest day seen
+        self.last = None    # latest day seen
+        self.sums = np.zeros(0)
+
+    def _ensure_range(self, lo, hi):
+        if self.start is None:
+            self.start = lo
+            self.sums = np.zeros(max(hi - lo + 1, 366))
+            return
+        end = self.start + len(self.sums) - 1
+        if lo >= self.start and hi <= end:
+            return
+        # Grow geometrically in whichever direction is needed
+        pad = len(self.sums)
+        new_start = min(self.start, lo - pad) if lo < self.start else self.start
+        new_end = max(end, hi + pad) if hi > end else end
+        grown = np.zeros(new_end - new_start + 1)
+        offset = self.start - new_start
+        grown[offset:offset + len(self.sums)] = self.sums
+        self.start, self.sums = new_start, grown
+
+    def add(self, dates, values):
+        """
+        Add values to the buckets of their dates.
+        
+        Args:
+            dates: Datetime-like array of order dates.
+            values: Array of values to sum.
+        """
+        days = np.asarray(pd.to_datetime(dates).values.astype('datetime64[D]').astype(np.int64))
+        values = np.asarray(values, dtype=float)
+        valid = (days != np.iinfo(np.int64).min) & ~np.isnan(values)
+        days, values = days[valid], values[valid]
+        if len(days) == 0:
+            return
+        
+        # Only the buckets of dates present in this batch are touched
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        day_sums = np.bincount(inverse.ravel(), weights=values)
+        lo, hi = int(unique_days[0]), int(unique_days[-1])
+        self._ensure_range(lo, hi)
+        self.sums[unique_days - self.start] += day_sums
+        self.first = lo if self.first is None else min(self.first, lo)
+        self.last = hi if self.last is None else max(self.last, hi)
+
+    def save(self, path, batches=()):
+        """
+        Persist the accumulator state (and the ids of ingested batches) to an .npz file.
+        
+        Args:
+            path (str): Destination path.
+            batches (iterable): Ids of the batches already ingested.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        bounds = [-1 if v is None else v for v in (self.start, self.first, self.last)]
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, bounds=np.array(bounds, dtype=np.int64), sums=self.sums,
+                     batches=np.array(sorted(batches), dtype=str))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an accumulator saved with save().
+        
+        Args:
+            path (str): Path to the .npz state file.
+            
+        Returns:
+            tuple: (DailyAccumulator, set of ingested batch ids)
+        """
+        accumulator = cls()
+        with np.load(path) as state:
+            start, first, last = (None if v == -1 else int(v) for v in state['bounds'])
+            accumulator.start, accumulator.first, accumulator.last = start, first, last
+            accumulator.sums = state['sums']
+            batches = set(state['batches'].tolist())
+        return accumulator, batches
+
+    def to_frame(self, date_column='Order Date', value_column='Sales', freq='D'):
+        """
+        Return the accumulated sums as a time series frame.
+        
+        Args:
+            date_column (str): Name of the date index.
+            value_column (str): Name of the value column.
+            freq (str): Output frequency; coarser than daily is resampled.
+            
+        Returns:
+            pd.DataFrame: Aggregated time series data.
+        """
+        if self.first is None:
+            return pd.DataFrame({value_column: []}, index=pd.DatetimeIndex([], name=date_column))
+        values = self.sums[self.first - self.start:self.last - self.start + 1]
+        index = pd.date_range(pd.Timestamp(self.first, unit='D'), periods=len(values), freq='D', name=date_column)
+        ts_data = pd.DataFrame({value_column: values}, index=index)
+        if freq != 'D':
+            ts_data = ts_data.resample(freq).sum()
+        return ts_data
+
+@instrument('aggregate')
+def prepare_time_series_data_streaming(filepath, date_column='Order Date', value_column='Sales', freq='D',
+                                       chunksize=1_000_000, encoding='windows-1252', date_format=None):
+    """
+    Prepare time series data from an order file in one sequential, chunked pass.
+    
+    Equivalent to prepare_time_series_data(load_data(filepath)), but only
+    the date and value columns of one chunk are held in memory at a time.
+    Undecodable bytes are replaced rather than triggering a second read,
+    since only the (ASCII) date and value columns are used.
+    
+    Args:
+        filepath (str): Path to the order CSV file.
+        date_column (str): Name of the date column.
+        value_column (str): Name of the value column to aggregate.
+        freq (str): Frequency string (daily or coarser, e.g. 'D', 'W', 'MS').
+        chunksize (int): Number of rows to read per chunk.
+        encoding (str): File encoding.
+        date_format (str): Optional strptime format for the date column.
+        
+    Returns:
+        pd.DataFrame: Aggregated time series data.
+    """
+    print("\n" + "-"*60)
+    print("PREPARING TIME SERIES DATA (STREAMING)")
+    print("-"*60)
+    
+    accumulator = DailyAccumulator()
+    total_rows = 0
+    reader = pd.read_csv(filepath, usecols=[date_column, value_column], encoding=encoding,
+                         encoding_errors='replace', chunksize=chunksize)
+    for chunk in reader:
+        accumulator.add(pd.to_datetime(chunk[date_column], format=date_format), chunk[value_column])
+        total_rows += len(chunk)
+    
+    ts_data = accumulator.to_frame(date_column, value_column, freq)
+    
+    print(f"✅ Prepared time series data from {total_rows} rows:")
+    print(f"   Date range: {ts_data.index.min()} to {ts_data.index.max()}")
+    print(f"   Frequency: {freq}")
+    print(f"   Total periods: {ts_data.shape[0]}")
+    
+    return ts_data
+
+def _batch_id(batch):
+    if isinstance(batch, pd.DataFrame):
+        return 'frame:' + hashlib.sha256(pd.util.hash_pandas_object(batch, index=False).values.tobytes()).hexdigest()
+    return 'file:' + _file_fingerprint(batch)['sha256']
+
+@instrument('aggregate')
+def update_time_series_data(batches, state_path, date_column='Order Date', value_column='Sales', freq='D',
+                            output_path=None, encoding='windows-1252', date_format=None, chunksize=1_000_000):
+    """
+    Incrementally update an aggregated time series with new order batches.
+    
+    The per-day sums are persisted in state_path together with the content
+    hashes of every batch already ingested, so re-running over the same
+    batches is a no-op and only new orders are read. Late-arriving orders
+    for past dates simply add to their existing date buckets.
+    
+    Args:
+        batches (list): Order CSV paths and/or DataFrames to ingest.
+        state_path (str): Path of the persisted accumulator state (.npz).
+        date_column (str): Name of the date column.
+        value_column (str): Name of the value column to aggregate.
+        freq (str): Frequency of the returned series.
+        output_path (str): Optional CSV path to write the updated series to.
+        encoding (str): Encoding of the batch files.
+        date_format (str): Optional strptime format for the date column.
+        chunksize (int): Number of rows to read per chunk from batch files.
+        
+    Returns:
+        pd.DataFrame: The full aggregated time series after the update.
+    """
+    print("\n" + "-"*60)
+    print("UPDATING TIME SERIES DATA")
+    print("-"*60)
+    
+    if os.path.exists(state_path):
+        accumulator, ingested = DailyAccumulator.load(state_path)
+    else:
+        accumulator, ingested = DailyAccumulator(), set()
+    
+    new_rows = 0
+    skipped = 0
+    for batch in batches:
+        batch_id = _batch_id(batch)
+        if batch_id in ingested:
+            skipped += 1
+            continue
+        if isinstance(batch, pd.DataFrame):
+            chunks = [batch[[date_column, value_column]]]
+        else:
+            chunks = pd.read_csv(batch, usecols=[date_column, value_column], encoding=encoding,
+                                 encoding_errors='replace', chunksize=chunksize)
+        for chunk in chunks:
+            accumulator.add(pd.to_datetime(chunk[date_column], format=date_format), chunk[value_column])
+            new_rows += len(chunk)
+        ingested.add(batch_id)
+    
+    if new_rows or not os.path.exists(state_path):
+        accumulator.save(state_path, ingested)
+    
+    ts_data = accumulator.to_frame(date_column, value_column, freq)
+    if output_path:
+        ts_data.to_csv(output_path)
+    
+    print(f"✅ Ingested {new_rows} new rows ({skipped} batches already processed)")
+    print(f"   Date range: {ts_data.index.min()} to {ts_data.index.max()}")
+    print(f"   Total periods: {ts_data.shape[0]}")
+    
+    return ts_data
+
+PYRAMID_LEVELS = {'weekly': 'W', 'monthly': 'M', 'quarterly': 'Q'}
+
+@instrument('aggregate')
+def build_aggregate_pyramid(ts_data, date_column='Order Date', value_column='Sales', moving_averages=(7, 30)):
+    """
+    Pre-aggregate a daily series at daily/weekly/monthly/quarterly resolution.
+    
+    The daily level carries moving averages and running totals, so sums and
+    means over any date range are O(log n) lookups (see pyramid_range_totals)
+    instead of a fresh groupby over the filtered frame.
+    
+    Args:
+        ts_data (pd.DataFrame): Daily series, indexed by date or with a date column.
+        date_column (str): Name of the date column/index.
+        value_column (str): Name of the value column.
+        moving_averages (tuple): Moving-average windows to precompute (days).
+        
+    Returns:
+        dict: 'daily', 'weekly', 'monthly', 'quarterly' and 'dayofweek' DataFrames.
+    """
+    if date_column in ts_data.columns:
+        ts_data = ts_data.set_index(date_column)
+    values = ts_data[value_column].sort_index()
+    values.index = pd.DatetimeIndex(values.index, name=date_column)
+    
+    daily = values.to_frame()
+    for window in moving_averages:
+        daily[f'MA{window}'] = values.rolling(window=window).mean()
+    daily['cum_sum'] = values.cumsum()
+    
+    pyramid = {'daily': daily}
+    for level, freq in PYRAMID_LEVELS.items():
+        periods = values.index.to_period(freq)
+        agg = values.groupby(periods).agg(['sum', 'mean', 'count', 'max'])
+        agg.index.name = 'Period'
+        agg['start'] = agg.index.start_time
+        agg['end'] = agg.index.end_time.normalize()
+        pyramid[level] = agg
+    
+    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    pyramid['dayofweek'] = values.groupby(values.index.day_name()).agg(['mean', 'sum', 'count']).reindex(day_order)
+    return pyramid
+
+def _range_positions(daily, start, end):
+    index = daily.index
+    lo = index.searchsorted(pd.Timestamp(start), side='left')
+    hi = index.searchsorted(pd.Timestamp(end), side='right')
+    return lo, hi
+
+def pyramid_range(pyramid, start, end):
+    """Daily rows of the pyramid between start and end (inclusive), as a slice."""
+    lo, hi = _range_positions(pyramid['daily'], start, end)
+    return pyramid['daily'].iloc[lo:hi]
+
+def pyramid_range_totals(pyramid, start, end, level=None):
+    """
+    Sum, count and mean between start and end from the running totals.
+    
+    Args:
+        pyramid (dict): Output of build_aggregate_pyramid.
+        start, end: Inclusive date range.
+        level (str): Optional 'weekly'/'monthly'/'quarterly' to get per-period
+            totals clipped to the range instead of one overall total.
+            
+    Returns:
+        dict or pd.DataFrame: Overall totals, or per-period sum/count/mean.
+    """
+    daily = pyramid['daily']
+    cum = np.concatenate([[0.0], daily['cum_sum'].to_numpy()])
+    if level is None:
+        lo, hi = _range_positions(daily, start, end)
+        total, count = cum[hi] - cum[lo], hi - lo
+        return {'sum': total, 'count': count, 'mean': total / count if count else np.nan}
+    
+    periods = pyramid[level]
+    periods = periods[(periods['end'] >= pd.Timestamp(start)) & (periods['start'] <= pd.Timestamp(end))]
+    starts = np.maximum(periods['start'].to_numpy(), np.datetime64(pd.Timestamp(start)))
+    ends = np.minimum(periods['end'].to_numpy(), np.datetime64(pd.Timestamp(end)))
+    lo = daily.index.searchsorted(starts, side='left')
+    hi = daily.index.searchsorted(ends, side='right')
+    counts = hi - lo
+    sums = cum[hi] - cum[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return pd.DataFrame({'sum': sums, 'count': counts, 'mean': means}, index=periods.index)
+
+def save_aggregate_pyramid(pyramid, path, source=None):
+    """Save a pyramid (and the fingerprint of the file it was built from) as a pickle."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    pd.to_pickle({'source': source, 'levels': pyramid}, tmp_path)
+    os.replace(tmp_path, path)
+
+def load_aggregate_pyramid(source_path, pyramid_path, date_column='Order Date', value_column='Sales'):
+    """
+    Load the pyramid for a daily series CSV, rebuilding it if the CSV changed.
+    
+    Args:
+        source_path (str): Daily series CSV (e.g. daily_sales_simple.csv).
+        pyramid_path (str): Cached pyramid location.
+        
+    Returns:
+        dict: Pyramid levels (see build_aggregate_pyramid).
+    """
+    source = _file_fingerprint(source_path, with_hash=False)
+    if os.path.exists(pyramid_path):
+        try:
+            cached = pd.read_pickle(pyramid_path)
+            if cached.get('source') == source:
+                return cached['levels']
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, KeyError):
+            pass
+    
+    ts_data = pd.read_csv(source_path, parse_dates=[date_column])
+    pyramid = build_aggregate_pyramid(ts_data, date_column, value_column)
+    save_aggregate_pyramid(pyramid, pyramid_path, source)
+    return pyramid
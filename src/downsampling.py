@@ -0,0 +1,164 @@
+"""
+Downsampling Module for Sales Forecasting Project
+
+Shape-preserving reduction of long time series before they are handed to a
+plotting backend. A chart cannot show more distinct points than it has
+horizontal pixels, so traces are reduced to a point budget derived from the
+chart width.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def points_for_width(width_px, points_per_px=2):
+    """
+    Return the point budget for a chart of the given pixel width.
+
+    Args:
+        width_px (int): Plot area width in pixels
+        points_per_px (int): Points kept per horizontal pixel
+
+    Returns:
+        int: Maximum number of points worth sending to the browser
+    """
+    return max(int(width_px * points_per_px), 3)
+
+
+def _as_float(x):
+    """Return x as float64 (datetimes become nanoseconds) for geometry."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously selected point
+    and the mean of the next bucket, which preserves peaks and visual shape.
+
+    Args:
+        x (array-like): Monotonic x values (numeric or datetime64)
+        y (array-like): y values
+        n_out (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted integer positions into the input
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    xf = _as_float(x)
+    yf = np.asarray(y, dtype=np.float64)
+
+    # Gaps (e.g. the warm-up of a moving average) would poison the bucket
+    # cumsums; interpolate them for the geometry only
+    missing = np.isnan(yf)
+    if missing.all():
+        return np.linspace(0, n - 1, n_out).astype(np.int64)
+    if missing.any():
+        yf = yf.copy()
+        yf[missing] = np.interp(xf[missing], xf[~missing], yf[~missing])
+
+    # n - 2 interior points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Mean of each bucket (the "next" bucket for the one before it)
+    csum_x = np.concatenate(([0.0], np.cumsum(xf)))
+    csum_y = np.concatenate(([0.0], np.cumsum(yf)))
+    sizes = ends - starts
+    mean_x = (csum_x[ends] - csum_x[starts]) / sizes
+    mean_y = (csum_y[ends] - csum_y[starts]) / sizes
+    mean_x = np.append(mean_x[1:], xf[-1])
+    mean_y = np.append(mean_y[1:], yf[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for b, (lo, hi) in enumerate(zip(starts, ends)):
+        # Twice the triangle area for every candidate in the bucket
+        area = np.abs(
+            (xf[prev] - mean_x[b]) * (yf[lo:hi] - yf[prev])
+            - (xf[prev] - xf[lo:hi]) * (mean_y[b] - yf[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        selected[b + 1] = prev
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Select the minimum and maximum of each bucket (vectorized).
+
+    Cheaper than LTTB and guarantees every spike survives; well suited to
+    noisy daily sales where extremes matter more than the exact shape.
+
+    Args:
+        y (array-like): y values
+        n_out (int): Approximate number of points to keep
+
+    Returns:
+        np.ndarray: Sorted, unique integer positions into the input
+    """
+    yf = np.asarray(y, dtype=np.float64)
+    n = len(yf)
+    n_buckets = max(n_out // 2, 1)
+    if n_out >= n or n_buckets < 2:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    size = int(np.max(np.diff(edges)))
+
+    # Pad every bucket to the same length so argmin/argmax run in one call
+    pos = edges[:-1, None] + np.arange(size)[None, :]
+    valid = pos < edges[1:, None]
+    pos = np.where(valid, pos, edges[1:, None] - 1)
+    vals = yf[pos]
+
+    lo = np.where(valid, np.where(np.isnan(vals), np.inf, vals), np.inf)
+    hi = np.where(valid, np.where(np.isnan(vals), -np.inf, vals), -np.inf)
+    rows = np.arange(n_buckets)
+    keep = np.concatenate((pos[rows, lo.argmin(axis=1)], pos[rows, hi.argmax(axis=1)], [0, n - 1]))
+    return np.unique(keep)
+
+
+def downsample(x, y, n_out, method='lttb'):
+    """
+    Reduce a series to at most about n_out points.
+
+    Args:
+        x (array-like or pd.Index): x values, e.g. dates
+        y (array-like or pd.Series): y values
+        n_out (int): Point budget, e.g. from points_for_width
+        method (str): 'lttb' or 'minmax'
+
+    Returns:
+        tuple: (x, y) subsets of the same types as the inputs
+    """
+    if method == 'lttb':
+        idx = lttb_indices(x, y, n_out)
+    elif method == 'minmax':
+        idx = minmax_indices(y, n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    if len(idx) == len(y):
+        return x, y
+
+    return _take(x, idx), _take(y, idx)
+
+
+def _take(values, idx):
+    """Positional take that keeps pandas containers intact."""
+    if isinstance(values, pd.Series):
+        return values.iloc[idx]
+    if isinstance(values, pd.Index):
+        return values[idx]
+    return np.asarray(values)[idx]
@@ -1,5 +1,14 @@
 import pandas as pd
 import numpy as np
+import os
+import pickle
+
+try:
+    from .artifact_store import fingerprint
+    from .instrumentation import instrument
+except ImportError:
+    from artifact_store import fingerprint
+    from instrumentation import instrument
 
 def create_time_features(df, date_column='Order Date'):
     """Creates time-based features from datetime column."""
@@ -40,15 +49,115 @@ def create_lag_features(df, value_column='Sales', lags=[1, 7, 14, 30]):
     return df
 
 def create_rolling_features(df, value_column='Sales', windows=[7, 30]):
-    """Creates rolling mean and std features."""
+    """
+    Creates rolling mean and std features.
+    
+    Windows end on the previous row, so a row's own value never feeds its
+    features; this is also all that is known when forecasting that day.
+    """
     df = df.copy()
+    previous = df[value_column].shift(1)
     for window in windows:
-        df[f'rolling_mean_{window}'] = df[value_column].rolling(window=window).mean()
-        df[f'rolling_std_{window}'] = df[value_column].rolling(window=window).std()
+        df[f'rolling_mean_{window}'] = previous.rolling(window=window).mean()
+        df[f'rolling_std_{window}'] = previous.rolling(window=window).std()
     return df
 
-def create_all_features(df, date_column='Order Date', target_column='Sales', lag_periods=[1, 7, 14, 30], rolling_windows=[7, 30]):
-    """Wrapper to create all features."""
+# Part of every FeatureCache key; bump it whenever create_all_features changes
+# its output, so matrices cached by older code are never served
+# (2: rolling windows end on the previous row)
+FEATURE_VERSION = 2
+
+class FeatureCache:
+    """
+    On-disk cache of feature matrices with LRU, size-bounded eviction.
+    
+    Entries are pickled DataFrames (dtypes and index preserved) keyed by a
+    fingerprint of the input series, the feature parameters and
+    FEATURE_VERSION. A hit
+    refreshes the entry's mtime, which is used as its last-access time.
+    """
+    def __init__(self, cache_dir='data/cache/features', max_bytes=1024**3, max_entries=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def key_for(self, df, **params):
+        return fingerprint(df, params, FEATURE_VERSION)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            df = pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            # Truncated or corrupt entry: count it as a miss and drop it
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted or cleared meanwhile; the frame read is still good
+        return df
+
+    def put(self, key, df):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the size/count limits hold."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue  # removed by a concurrent evict or clear
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes or (self.max_entries and len(entries) > self.max_entries)):
+            _, size, name = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+
+@instrument('features')
+def create_all_features(df, date_column='Order Date', target_column='Sales', lag_periods=[1, 7, 14, 30], rolling_windows=[7, 30],
+                        cache=None):
+    """Wrapper to create all features. Pass a FeatureCache to reuse previously computed matrices."""
+    if cache is not None:
+        key = cache.key_for(df, date_column=date_column, target_column=target_column,
+                            lag_periods=list(lag_periods), rolling_windows=list(rolling_windows))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        result = create_all_features(df, date_column, target_column, lag_periods, rolling_windows)
+        cache.put(key, result)
+        return result
+    
     # Ensure sorted by date
     if date_column in df.columns:
         df = df.sort_values(date_column)
@@ -63,3 +172,218 @@ def create_all_features(df, date_column='Order Date', target_column='Sales', lag
     df = df.dropna()
     
     return df
+
+@instrument('features')
+def create_panel_features(panel, group_columns, date_column='Order Date', target_column='Sales',
+                          lag_periods=[1, 7, 14, 30], rolling_windows=[7, 30], dropna=True):
+    """
+    Creates time, lag and rolling features for every series of a long-format panel at once.
+    
+    Produces the same values as running create_all_features on each series
+    separately, but with one sort and grouped (cythonized) shift/rolling
+    calls instead of a Python loop over series.
+    
+    Args:
+        panel: Long-format DataFrame with group_columns, date_column and target_column
+        group_columns: Column(s) identifying each series
+        date_column: Name of date column
+        target_column: Name of value column
+        lag_periods: Lags to create
+        rolling_windows: Rolling mean/std windows to create
+        dropna: Drop rows without a full lag/rolling history
+    """
+    group_columns = [group_columns] if isinstance(group_columns, str) else list(group_columns)
+    
+    # The only full-frame copy: every feature below is added to this frame in place
+    df = panel.sort_values(group_columns + [date_column], kind='stable', ignore_index=True)
+    dates = pd.to_datetime(df[date_column])
+    df[date_column] = dates
+    
+    df['year'] = dates.dt.year
+    df['month'] = dates.dt.month
+    df['day'] = dates.dt.day
+    df['dayofweek'] = dates.dt.dayofweek
+    df['quarter'] = dates.dt.quarter
+    df['is_month_start'] = dates.dt.is_month_start.astype(int)
+    df['is_month_end'] = dates.dt.is_month_end.astype(int)
+    df['month_sin'] = np.sin(2 * np.pi * df['month']/12)
+    df['month_cos'] = np.cos(2 * np.pi * df['month']/12)
+    df['day_sin'] = np.sin(2 * np.pi * df['dayofweek']/7)
+    df['day_cos'] = np.cos(2 * np.pi * df['dayofweek']/7)
+    
+    # Groups come out in sorted key order, which is the row order after the sort above
+    grouped = df.groupby(group_columns, sort=True, observed=True, dropna=False)[target_column]
+    for lag in lag_periods:
+        df[f'lag_{lag}'] = grouped.shift(lag)
+    # Rolling windows end on the previous row, as in create_rolling_features
+    previous = grouped.shift(1).groupby([df[c] for c in group_columns], sort=True, observed=True, dropna=False)
+    for window in rolling_windows:
+        rolling = previous.rolling(window=window)
+        df[f'rolling_mean_{window}'] = rolling.mean().to_numpy()
+        df[f'rolling_std_{window}'] = rolling.std().to_numpy()
+    
+    if dropna:
+        df = df.dropna(ignore_index=True)
+    
+    return df
+
+def _calendar_features(date):
+    """Time features for a single date, matching create_time_features."""
+    date = pd.Timestamp(date)
+    return {
+        'year': date.year,
+        'month': date.month,
+        'day': date.day,
+        'dayofweek': date.dayofweek,
+        'quarter': date.quarter,
+        'is_month_start': int(date.is_month_start),
+        'is_month_end': int(date.is_month_end),
+        'month_sin': np.sin(2 * np.pi * date.month/12),
+        'month_cos': np.cos(2 * np.pi * date.month/12),
+        'day_sin': np.sin(2 * np.pi * date.dayofweek/7),
+        'day_cos': np.cos(2 * np.pi * date.dayofweek/7),
+    }
+
+class OnlineFeatureState:
+    """
+    Incremental lag/rolling feature state for one or many daily series.
+    
+    Keeps a ring buffer of recent values and running sums / sums of squares
+    per rolling window, so pushing one new observation per series costs
+    O(len(lag_periods) + len(rolling_windows)) regardless of history length.
+    The emitted rows have the same columns and values as create_all_features.
+    """
+    def __init__(self, lag_periods=[1, 7, 14, 30], rolling_windows=[7, 30], n_series=1,
+                 date_column='Order Date', target_column='Sales'):
+        self.lag_periods = list(lag_periods)
+        self.rolling_windows = list(rolling_windows)
+        self.n_series = n_series
+        self.date_column = date_column
+        self.target_column = target_column
+        
+        self.size = max(self.lag_periods + self.rolling_windows + [0]) + 1
+        self.buffer = np.full((n_series, self.size), np.nan)
+        self.pos = -1     # buffer slot of the latest value
+        self.count = 0    # number of values pushed
+        self.sums = {w: np.zeros(n_series) for w in self.rolling_windows}
+        self.sumsqs = {w: np.zeros(n_series) for w in self.rolling_windows}
+        self.last_date = None
+
+    @classmethod
+    def from_history(cls, history, lag_periods=[1, 7, 14, 30], rolling_windows=[7, 30],
+                     date_column='Order Date', target_column='Sales'):
+        """
+        Build a state from existing history without replaying it.
+        
+        Args:
+            history: Series indexed by date, or DataFrame indexed by date with one column per series
+            lag_periods: Lags to track
+            rolling_windows: Rolling windows to track
+        """
+        values = history.to_numpy(dtype=float)
+        values = values.reshape(-1, 1) if values.ndim == 1 else values
+        state = cls(lag_periods, rolling_windows, n_series=values.shape[1],
+                    date_column=date_column, target_column=target_column)
+        tail = values[-state.size:].T
+        state.buffer[:, :tail.shape[1]] = tail
+        state.pos = tail.shape[1] - 1
+        state.count = len(values)
+        state._resync()
+        state.last_date = pd.Timestamp(history.index[-1]) if len(history) else None
+        return state
+
+    @property
+    def is_ready(self):
+        """True once every lag and rolling window has a full history."""
+        return self.count >= self.size
+
+    def _value_at(self, k):
+        """Values k steps before the latest one (NaN if not yet seen)."""
+        if self.count <= k:
+            return np.full(self.n_series, np.nan)
+        return self.buffer[:, (self.pos - k) % self.size]
+
+    def _resync(self):
+        # Recompute running sums exactly from the buffer to stop floating-point drift
+        for w in self.rolling_windows:
+            window = np.stack([self._value_at(k) for k in range(min(w, self.count))] + [np.zeros(self.n_series)], axis=1)
+            self.sums[w] = window.sum(axis=1)
+            self.sumsqs[w] = (window ** 2).sum(axis=1)
+
+    def push(self, values):
+        """
+        Add one new observation per series without building a feature row.
+        
+        Args:
+            values: Scalar (single series) or array of shape (n_series,)
+        """
+        values = np.broadcast_to(np.asarray(values, dtype=float), (self.n_series,))
+        for w in self.rolling_windows:
+            if self.count >= w:
+                dropped = self._value_at(w - 1)
+                self.sums[w] = self.sums[w] - dropped
+                self.sumsqs[w] = self.sumsqs[w] - dropped ** 2
+            self.sums[w] = self.sums[w] + values
+            self.sumsqs[w] = self.sumsqs[w] + values ** 2
+        
+        self.pos = (self.pos + 1) % self.size
+        self.buffer[:, self.pos] = values
+        self.count += 1
+        if self.pos == 0:
+            self._resync()
+
+    def _rolling_features(self):
+        """Rolling mean/std over the windows ending at the latest value."""
+        features = {}
+        for w in self.rolling_windows:
+            if self.count >= w and w > 1:
+                mean = self.sums[w] / w
+                var = np.maximum(self.sumsqs[w] - self.sums[w] * mean, 0) / (w - 1)
+                features[f'rolling_mean_{w}'] = mean
+                features[f'rolling_std_{w}'] = np.sqrt(var)
+            else:
+                features[f'rolling_mean_{w}'] = self.sums[w] / w if self.count >= w else np.full(self.n_series, np.nan)
+                features[f'rolling_std_{w}'] = np.full(self.n_series, np.nan)
+        return features
+
+    def update(self, date, values):
+        """
+        Push the observation(s) for date and return that day's feature rows.
+        
+        Args:
+            date: Date of the observation
+            values: Scalar (single series) or array of shape (n_series,)
+            
+        Returns:
+            pd.DataFrame: One row per series, with the columns of create_all_features.
+        """
+        rolling = self._rolling_features()
+        self.push(values)
+        self.last_date = pd.Timestamp(date)
+        
+        row = {self.date_column: self.last_date, self.target_column: self._value_at(0)}
+        row.update(_calendar_features(date))
+        for lag in self.lag_periods:
+            row[f'lag_{lag}'] = self._value_at(lag)
+        row.update(rolling)
+        return pd.DataFrame(row, index=range(self.n_series))
+
+    def next_features(self, date):
+        """
+        Feature rows for the day after the latest observation, before its value is known.
+        
+        Lags and rolling windows refer to the same calendar offsets as in
+        update(): rolling statistics cover the window ending at the latest
+        known value, the day before date.
+        
+        Args:
+            date: Date to build features for
+            
+        Returns:
+            pd.DataFrame: One row per series with calendar, lag and rolling features.
+        """
+        row = _calendar_features(date)
+        for lag in self.lag_periods:
+            row[f'lag_{lag}'] = self._value_at(lag - 1)
+        row.update(self._rolling_features())
+        return pd.DataFrame(row, index=range(self.n_series))
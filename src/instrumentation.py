@@ -0,0 +1,375 @@
+"""
+Instrumentation Module for Sales Forecasting Project
+
+Lightweight per-stage timing and memory accounting for the pipeline. Stage
+functions in src are wrapped with @instrument('<stage>'); every call records
+wall time, CPU time, rows in/out and the process peak RSS (plus traced
+allocations when enabled). Records are aggregated in memory and can be
+written to a JSON-lines log and a Prometheus text-format file.
+
+Quiet mode silences prints per thread (through a stdout proxy installed
+once), so concurrent threads such as the serving process keep their output.
+
+Stages run in worker processes are recorded in those processes. Pools
+started with init_worker as (part of) their initializer and tasks wrapped in
+run_collecting send their aggregates back, where merge() adds them to the
+parent's; fit_predict_many, walk_forward_backtest, render_figures and the
+pipeline do this. Other process pools only reach the JSON-lines log.
+
+Peak RSS comes from the `resource` module; where it is unavailable (Windows)
+only traced allocations (trace_allocations=True) are reported.
+
+Usage:
+    from instrumentation import configure, summary
+    configure(log_path='outputs/metrics/stages.jsonl',
+              prometheus_path='outputs/metrics/pipeline.prom',
+              quiet=True)
+    ... run the pipeline ...
+    print(summary())
+
+The same settings can be given through the environment:
+SALES_METRICS_LOG, SALES_METRICS_PROM, SALES_QUIET=1 and
+SALES_TRACE_ALLOCATIONS=1.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ('load', 'clean', 'aggregate', 'features', 'fit', 'predict', 'evaluate', 'plot')
+
+# ru_maxrss is reported in KiB on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+_config = {
+    'enabled': True,
+    'quiet': os.environ.get('SALES_QUIET', '') not in ('', '0'),
+    'log_path': os.environ.get('SALES_METRICS_LOG'),
+    'prometheus_path': os.environ.get('SALES_METRICS_PROM'),
+    'trace_allocations': os.environ.get('SALES_TRACE_ALLOCATIONS', '') not in ('', '0'),
+    'flush_interval': 5.0,
+}
+
+_lock = threading.Lock()
+_local = threading.local()
+_totals = defaultdict(lambda: {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': 0,
+                               'rows_out': 0, 'max_wall_seconds': 0.0, 'peak_rss_bytes': 0,
+                               'peak_alloc_bytes': 0})
+_log_file = None
+_last_flush = 0.0
+
+def configure(log_path=None, prometheus_path=None, quiet=None, trace_allocations=None, enabled=None,
+              flush_interval=None):
+    """
+    Configure instrumentation sinks and output.
+
+    Args:
+        log_path (str): Append one JSON record per stage call to this file.
+        prometheus_path (str): Write aggregated stage metrics in Prometheus
+            text format to this file (e.g. for node_exporter's textfile collector).
+        quiet (bool): Suppress the progress prints of instrumented functions.
+        trace_allocations (bool): Track peak Python/NumPy allocations per stage
+            with tracemalloc (adds noticeable overhead).
+        enabled (bool): Turn recording on or off entirely.
+        flush_interval (float): Minimum seconds between Prometheus file rewrites.
+    """
+    global _log_file
+    with _lock:
+        if log_path is not None and log_path != _config['log_path'] and _log_file is not None:
+            _log_file.close()
+            _log_file = None
+        for key, value in [('log_path', log_path), ('prometheus_path', prometheus_path), ('quiet', quiet),
+                           ('trace_allocations', trace_allocations), ('enabled', enabled),
+                           ('flush_interval', flush_interval)]:
+            if value is not None:
+                _config[key] = value
+    if _config['trace_allocations'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def reset():
+    """Clear the in-memory aggregates."""
+    with _lock:
+        _totals.clear()
+
+def _count_rows(value):
+    shape = getattr(value, 'shape', None)
+    if shape:
+        return int(shape[0])
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return 0
+
+def _peak_rss_bytes():
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+class _Discard(io.TextIOBase):
+    def write(self, text):
+        return len(text)
+
+class _ThreadStdout:
+    """sys.stdout stand-in that lets a thread redirect its own prints without affecting other threads."""
+    def __init__(self, default):
+        self.default = default
+
+    def _target(self):
+        return getattr(_local, 'stdout', None) or self.default
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+@contextlib.contextmanager
+def redirect_thread_stdout(target=None):
+    """
+    Send the current thread's prints to target (discarded when None).
+
+    Unlike contextlib.redirect_stdout, other threads keep printing to the
+    real stdout.
+    """
+    with _lock:
+        if not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+    previous = getattr(_local, 'stdout', None)
+    _local.stdout = target if target is not None else _Discard()
+    try:
+        yield _local.stdout
+    finally:
+        _local.stdout = previous
+
+def _active_stages():
+    if not hasattr(_local, 'stages'):
+        _local.stages = []
+    return _local.stages
+
+@contextlib.contextmanager
+def stage(name, function=None, rows_in=0):
+    """
+    Record a block of code as one pipeline stage.
+
+    Nested blocks of the same stage (e.g. a cached wrapper calling itself)
+    are only recorded once, by the outermost block.
+
+    Args:
+        name (str): Stage name, normally one of STAGES.
+        function (str): Label for the code being measured.
+        rows_in (int): Rows the stage consumes.
+
+    Yields:
+        dict: The record; set record['rows_out'] inside the block.
+    """
+    active = _active_stages()
+    if not _config['enabled'] or name in active:
+        yield {}
+        return
+
+    record = {'stage': name, 'function': function or name, 'rows_in': rows_in, 'rows_out': 0}
+    trace = _config['trace_allocations'] and tracemalloc.is_tracing() and not active
+    if trace:
+        tracemalloc.reset_peak()
+    quiet = redirect_thread_stdout() if _config['quiet'] and not active else contextlib.nullcontext()
+
+    active.append(name)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        with quiet:
+            yield record
+    finally:
+        record['wall_seconds'] = time.perf_counter() - wall_start
+        record['cpu_seconds'] = time.process_time() - cpu_start
+        active.pop()
+        record['peak_rss_bytes'] = _peak_rss_bytes()
+        record['peak_alloc_bytes'] = tracemalloc.get_traced_memory()[1] if trace else 0
+        _record(record)
+
+def instrument(name, rows_out=True):
+    """
+    Decorator that records every call of a function as a pipeline stage.
+
+    Rows in are taken from the first argument with a shape (a DataFrame,
+    Series or array; `self` is skipped) and rows out from the result.
+
+    Args:
+        name (str): Stage name, normally one of STAGES.
+        rows_out (bool): Count rows of the return value.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _config['enabled']:
+                return func(*args, **kwargs)
+            rows_in = next((_count_rows(a) for a in args if getattr(a, 'shape', None)), 0)
+            with stage(name, func.__qualname__, rows_in) as record:
+                result = func(*args, **kwargs)
+                if rows_out and record:
+                    record['rows_out'] = _count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+def _record(record):
+    global _log_file, _last_flush
+    record['timestamp'] = time.time()
+    with _lock:
+        totals = _totals[(record['stage'], record['function'])]
+        totals['calls'] += 1
+        totals['wall_seconds'] += record['wall_seconds']
+        totals['cpu_seconds'] += record['cpu_seconds']
+        totals['rows_in'] += record['rows_in']
+        totals['rows_out'] += record['rows_out']
+        totals['max_wall_seconds'] = max(totals['max_wall_seconds'], record['wall_seconds'])
+        totals['peak_rss_bytes'] = max(totals['peak_rss_bytes'], record['peak_rss_bytes'])
+        totals['peak_alloc_bytes'] = max(totals['peak_alloc_bytes'], record['peak_alloc_bytes'])
+
+        if _config['log_path']:
+            if _log_file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(_config['log_path'])), exist_ok=True)
+                _log_file = open(_config['log_path'], 'a', buffering=1)
+            _log_file.write(json.dumps(record) + '\n')
+
+        due = record['timestamp'] - _last_flush >= _config['flush_interval']
+    if _config['prometheus_path'] and due:
+        write_prometheus()
+
+def _add(key, totals):
+    """Fold one set of aggregates into _totals; caller holds the lock."""
+    current = _totals[key]
+    for name, value in totals.items():
+        if name.startswith(('max_', 'peak_')):
+            current[name] = max(current[name], value)
+        else:
+            current[name] += value
+
+def init_worker():
+    """
+    Process-pool initializer: start the worker with empty aggregates.
+
+    Forked workers inherit the parent's aggregates, which would otherwise be
+    sent back and counted twice; the Prometheus file is left to the parent.
+    """
+    reset()
+    _config['prometheus_path'] = None
+
+def collect():
+    """Return and clear the aggregates recorded in this process (for merge() in the parent)."""
+    with _lock:
+        collected = [(key, dict(totals)) for key, totals in _totals.items()]
+        _totals.clear()
+    return collected
+
+def run_collecting(func, *args, **kwargs):
+    """Call func in a worker process; returns (result, collect()) for the parent to merge."""
+    result = func(*args, **kwargs)
+    return result, collect()
+
+def merge(collected):
+    """
+    Add aggregates recorded in a worker process (see collect).
+
+    Stages that are active in the calling thread are skipped, matching the
+    in-process rule that nested calls of the same stage are recorded once.
+    """
+    active = _active_stages()
+    with _lock:
+        for key, totals in collected:
+            if key[0] not in active:
+                _add(key, totals)
+
+def summary():
+    """
+    Aggregated metrics per stage and function.
+
+    Returns:
+        pd.DataFrame: One row per (stage, function) with call counts, total
+            and max wall time, CPU time, rows and peak memory, slowest first.
+    """
+    with _lock:
+        rows = [{'stage': stage_name, 'function': function, **totals}
+                for (stage_name, function), totals in _totals.items()]
+    if not rows:
+        return pd.DataFrame(columns=['stage', 'function', 'calls', 'wall_seconds', 'cpu_seconds'])
+    df = pd.DataFrame(rows).sort_values('wall_seconds', ascending=False, ignore_index=True)
+    df['rows_per_second'] = df['rows_in'] / df['wall_seconds'].where(df['wall_seconds'] > 0)
+    return df
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+def write_prometheus(path=None):
+    """
+    Write aggregated stage metrics in Prometheus text exposition format.
+
+    Args:
+        path (str): Output file (defaults to the configured prometheus_path).
+    """
+    global _last_flush
+    path = path or _config['prometheus_path']
+    if not path:
+        return
+    metrics = [
+        ('calls', 'pipeline_stage_calls_total', 'counter', 'Calls of each pipeline stage'),
+        ('wall_seconds', 'pipeline_stage_wall_seconds_total', 'counter', 'Wall-clock seconds spent in each stage'),
+        ('cpu_seconds', 'pipeline_stage_cpu_seconds_total', 'counter', 'CPU seconds spent in each stage'),
+        ('rows_in', 'pipeline_stage_rows_in_total', 'counter', 'Rows consumed by each stage'),
+        ('rows_out', 'pipeline_stage_rows_out_total', 'counter', 'Rows produced by each stage'),
+        ('max_wall_seconds', 'pipeline_stage_max_wall_seconds', 'gauge', 'Slowest single call of each stage'),
+        ('peak_rss_bytes', 'pipeline_stage_peak_rss_bytes', 'gauge', 'Process peak RSS observed after each stage'),
+        ('peak_alloc_bytes', 'pipeline_stage_peak_alloc_bytes', 'gauge', 'Peak traced allocations during each stage'),
+    ]
+    with _lock:
+        items = sorted(_totals.items())
+        lines = []
+        for key, metric, kind, help_text in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for (stage_name, function), totals in items:
+                lines.append(f'{metric}{{stage="{_escape(stage_name)}",function="{_escape(function)}"}} {totals[key]}')
+        _last_flush = time.time()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+def report():
+    """Print the per-stage summary table."""
+    df = summary()
+    print("\n" + "="*60)
+    print("PIPELINE STAGE TIMINGS")
+    print("="*60)
+    if df.empty:
+        print("No stages recorded")
+    else:
+        print(df[['stage', 'function', 'calls', 'wall_seconds', 'cpu_seconds', 'rows_in', 'rows_out']]
+              .to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print("="*60 + "\n")
+    return df
+
+@atexit.register
+def _flush_at_exit():
+    if _config['prometheus_path']:
+        write_prometheus()
+    if _log_file is not None:
+        _log_file.close()
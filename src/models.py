@@ -1,54 +1,394 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-from statsmodels.tsa.arima.model import ARIMA
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
+import hashlib
+import itertools
+import json
+import os
+import signal
+import threading
+import time
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+# scikit-learn, statsmodels and joblib are imported where they are used so
+# that preprocessing-only jobs do not pay their import cost at startup
+
+try:
+    from .feature_engineering import OnlineFeatureState
+    from .instrumentation import instrument, init_worker, run_collecting, merge
+except ImportError:
+    from feature_engineering import OnlineFeatureState
+    from instrumentation import instrument, init_worker, run_collecting, merge
 
 class BaselineForecaster:
     def __init__(self, method='naive'):
         self.method = method
         self.value = None
 
+    @instrument('fit')
     def fit(self, y):
         if self.method == 'naive':
             self.value = y.iloc[-1]
         elif self.method == 'mean':
             self.value = y.mean()
 
+    @instrument('predict')
     def predict(self, horizon):
         return pd.Series([self.value] * horizon)
 
 class ARIMAForecaster:
-    def __init__(self, order=(1, 1, 1), seasonal_order=None):
+    def __init__(self, order=(1, 1, 1), seasonal_order=None, cache_dir=None, search_kwargs=None, refit_every=None):
         self.order = order
         self.seasonal_order = seasonal_order
+        self.cache_dir = cache_dir
+        self.search_kwargs = search_kwargs or {}
+        self.refit_every = refit_every
+        self.search_results = None
         self.model = None
         self.model_fit = None
+        self._fitted_y = None
+        self._pending = []
+        self.updates_since_fit = 0
+
+    @property
+    def history(self):
+        """Fitted series followed by every update since, concatenated on access."""
+        if not self._pending:
+            return self._fitted_y
+        if isinstance(self._fitted_y, pd.Series):
+            return pd.concat([self._fitted_y, *self._pending])
+        return np.concatenate([self._fitted_y, *self._pending])
 
+    @instrument('fit')
     def fit(self, y):
-        self.model = ARIMA(y, order=self.order, seasonal_order=self.seasonal_order)
-        self.model_fit = self.model.fit()
+        # order='auto' selects the order with select_arima_order before fitting
+        if self.order == 'auto':
+            self.order, self.seasonal_order, self.search_results = select_arima_order(
+                y, cache_dir=self.cache_dir, **self.search_kwargs
+            )
+        self.model_fit = _fit_arima(y, self.order, self.seasonal_order, self.cache_dir)
+        self.model = self.model_fit.model
+        self._fitted_y = y
+        self._pending = []
+        self.updates_since_fit = 0
+
+    @instrument('fit')
+    def update(self, new_y):
+        """
+        Add new observations without re-estimating the parameters.
+        
+        The fitted state-space model is extended with new_y (a Kalman filter
+        pass over the new points only). Once refit_every observations have
+        been added since the last fit, the parameters are re-estimated on
+        the full history instead.
+        
+        The filter state lives in model_fit; new_y is only appended to a
+        list of pending chunks, so an update costs O(len(new_y)) and the
+        history is concatenated once, when a refit needs it.
+        
+        Args:
+            new_y: Observations following the end of the fitted series
+        """
+        self._pending.append(new_y)
+        self.updates_since_fit += len(new_y)
+        if self.refit_every is not None and self.updates_since_fit >= self.refit_every:
+            self.fit(self.history)
+        else:
+            self.model_fit = self.model_fit.extend(new_y)
 
+    @instrument('predict')
     def predict(self, horizon):
         return self.model_fit.forecast(steps=horizon)
 
+def _series_fingerprint(y):
+    return hashlib.sha256(pd.util.hash_pandas_object(pd.Series(y)).values.tobytes()).hexdigest()
+
+def _fit_arima(y, order, seasonal_order=None, cache_dir=None):
+    """
+    Fit an ARIMA model, reusing cached parameters when available.
+    
+    Fit results are cached as JSON keyed by the data fingerprint and the
+    orders; a cache hit only runs the Kalman filter with the stored
+    parameters instead of re-estimating them.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    seasonal = tuple(seasonal_order) if seasonal_order else (0, 0, 0, 0)
+    model = ARIMA(y, order=order, seasonal_order=seasonal)
+    
+    cache_path = None
+    if cache_dir:
+        key = hashlib.sha256(f"{_series_fingerprint(y)}|{tuple(order)}|{seasonal}".encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"arima-{key}.json")
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                cached = json.load(f)
+            model_fit = model.filter(np.array(cached['params']))
+            model_fit.mle_retvals = {'converged': cached['converged']}
+            return model_fit
+    
+    model_fit = model.fit()
+    
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        converged = bool((getattr(model_fit, 'mle_retvals', None) or {}).get('converged', True))
+        tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({'params': np.asarray(model_fit.params).tolist(), 'converged': converged}, f)
+        os.replace(tmp_path, cache_path)
+    return model_fit
+
+def _score_arima_candidate(y, order, seasonal_order, criterion, holdout, cache_dir):
+    """Score one candidate order; failures and non-converged fits score inf."""
+    start = time.perf_counter()
+    result = {'order': tuple(order), 'seasonal_order': seasonal_order, 'score': np.inf,
+              'aic': np.nan, 'status': 'ok', 'seconds': np.nan}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            if criterion == 'aic':
+                model_fit = _fit_arima(y, order, seasonal_order, cache_dir)
+            else:
+                model_fit = _fit_arima(y.iloc[:-holdout], order, seasonal_order, cache_dir)
+        
+        if not (getattr(model_fit, 'mle_retvals', None) or {}).get('converged', True):
+            result['status'] = 'not_converged'
+        else:
+            result['aic'] = model_fit.aic
+            if criterion == 'aic':
+                result['score'] = model_fit.aic
+            else:
+                forecast = np.asarray(model_fit.forecast(steps=holdout))
+                result['score'] = np.sqrt(np.mean((y.iloc[-holdout:].to_numpy() - forecast) ** 2))
+    except Exception as e:
+        result['status'] = f"failed: {type(e).__name__}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+@instrument('fit')
+def select_arima_order(y, d=1, max_p=3, max_q=3, seasonal_period=None, D=1, max_P=1, max_Q=1,
+                       criterion='aic', holdout=30, search='stepwise', n_jobs=None, cache_dir=None,
+                       max_rounds=10, early_stopping=1):
+    """
+    Select ARIMA/SARIMA orders by AIC or holdout RMSE, fitting candidates in parallel.
+    
+    search='stepwise' starts from a few standard orders and repeatedly
+    evaluates the +/-1 neighbours of the best one until nothing improves.
+    search='grid' evaluates the grid in order of increasing complexity
+    (p + q + P + Q). This is early stopping, not pruning: once
+    `early_stopping` consecutive levels bring no improvement the remaining
+    levels are skipped, so a better higher-order candidate can be missed;
+    early_stopping=None evaluates the full grid. Candidates that fail or do
+    not converge are dropped. With cache_dir,
+    fit results are cached so repeated searches are nearly free.
+    
+    Args:
+        y: Time series to fit (Series, array or list)
+        d, D: Fixed non-seasonal and seasonal differencing orders
+        max_p, max_q, max_P, max_Q: Upper bounds for the AR/MA orders
+        seasonal_period: Seasonal period (e.g. 7); None for non-seasonal ARIMA
+        criterion: 'aic' or 'holdout' (RMSE on the last `holdout` points)
+        holdout: Holdout length for criterion='holdout'
+        search: 'stepwise' or 'grid'
+        n_jobs: Worker processes for evaluating candidates
+        cache_dir: Directory for cached fit results
+        max_rounds: Maximum stepwise rounds
+        early_stopping: Grid complexity levels without improvement before stopping (None: never)
+        
+    Returns:
+        tuple: (order, seasonal_order, results DataFrame sorted by score)
+    """
+    if criterion not in ('aic', 'holdout'):
+        raise ValueError(f"Unknown criterion: {criterion}")
+    # Candidates slice with .iloc, so arrays and lists are wrapped once here
+    if not isinstance(y, pd.Series):
+        y = pd.Series(np.asarray(y, dtype=float))
+    
+    def make_candidate(p, q, P=0, Q=0):
+        seasonal = (P, D, Q, seasonal_period) if seasonal_period else None
+        return ((p, d, q), seasonal)
+    
+    def in_bounds(p, q, P, Q):
+        return 0 <= p <= max_p and 0 <= q <= max_q and 0 <= P <= max_P and 0 <= Q <= max_Q
+    
+    evaluated = {}
+    
+    def evaluate(executor, candidates):
+        candidates = [c for c in dict.fromkeys(candidates) if c not in evaluated]
+        scores = executor.map(_score_arima_candidate, itertools.repeat(y), *zip(*candidates),
+                              itertools.repeat(criterion), itertools.repeat(holdout),
+                              itertools.repeat(cache_dir)) if candidates else []
+        for candidate, result in zip(candidates, scores):
+            evaluated[candidate] = result
+    
+    def best():
+        return min(evaluated, key=lambda c: evaluated[c]['score'])
+    
+    seasonal_grid = [(P, Q) for P in range(max_P + 1) for Q in range(max_Q + 1)] if seasonal_period else [(0, 0)]
+    
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        if search == 'stepwise':
+            starts = [(2, 2, 1, 1), (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)]
+            evaluate(executor, [make_candidate(*c) for c in starts if in_bounds(*c)] or [make_candidate(0, 0)])
+            for _ in range(max_rounds):
+                current = best()
+                (p, _, q), seasonal = current
+                P, Q = (seasonal[0], seasonal[2]) if seasonal else (0, 0)
+                steps = [(dp, dq, 0, 0) for dp in (-1, 0, 1) for dq in (-1, 0, 1)]
+                if seasonal_period:
+                    steps += [(0, 0, dP, dQ) for dP in (-1, 0, 1) for dQ in (-1, 0, 1)]
+                neighbours = [make_candidate(p + a, q + b, P + c, Q + e) for a, b, c, e in steps
+                              if in_bounds(p + a, q + b, P + c, Q + e)]
+                evaluate(executor, neighbours)
+                if best() == current:
+                    break
+        elif search == 'grid':
+            grid = sorted(
+                (make_candidate(p, q, P, Q) for p in range(max_p + 1) for q in range(max_q + 1) for P, Q in seasonal_grid),
+                key=lambda c: c[0][0] + c[0][2] + (c[1][0] + c[1][2] if c[1] else 0)
+            )
+            best_score, stale = np.inf, 0
+            for _, level in itertools.groupby(grid, key=lambda c: c[0][0] + c[0][2] + (c[1][0] + c[1][2] if c[1] else 0)):
+                evaluate(executor, list(level))
+                score = evaluated[best()]['score']
+                stale = 0 if score < best_score else stale + 1
+                best_score = min(best_score, score)
+                if early_stopping is not None and stale >= early_stopping:
+                    break
+        else:
+            raise ValueError(f"Unknown search: {search}")
+    
+    results = pd.DataFrame(evaluated.values()).sort_values('score', ignore_index=True)
+    order, seasonal_order = best()
+    if not np.isfinite(evaluated[(order, seasonal_order)]['score']):
+        raise ValueError("No candidate ARIMA order could be fitted")
+    
+    print(f"✅ Selected ARIMA{order}" + (f"{seasonal_order}" if seasonal_order else "")
+          + f" by {criterion} ({len(results)} candidates evaluated)")
+    return order, seasonal_order, results
+
+def _fit_clone(model, X, Y):
+    from sklearn.base import clone
+    
+    model = clone(model)
+    model.fit(X, Y[:, 0] if Y.shape[1] == 1 else Y)
+    return model
+
 class MLForecaster:
     def __init__(self, model_type='linear_regression', **kwargs):
         self.model_type = model_type
         if model_type == 'linear_regression':
+            from sklearn.linear_model import LinearRegression
             self.model = LinearRegression(**kwargs)
         elif model_type == 'random_forest':
+            from sklearn.ensemble import RandomForestRegressor
             self.model = RandomForestRegressor(**kwargs)
         else:
             raise ValueError(f"Unknown model type: {model_type}")
 
+    @instrument('fit')
     def fit(self, X, y):
         self.model.fit(X, y)
 
+    @instrument('predict')
     def predict(self, X):
         return self.model.predict(X)
 
+    @instrument('predict')
+    def forecast_recursive(self, history, horizon, lag_periods=[1, 7, 14, 30], rolling_windows=[7, 30]):
+        """
+        Forecast horizon days ahead by feeding each prediction back into the features.
+        
+        Lag and rolling features are maintained incrementally with
+        OnlineFeatureState, and all series are predicted with one batched
+        predict call per step. Rolling windows for a forecast day end on the
+        previous day, the same alignment create_all_features uses in training.
+        
+        Args:
+            history: Series indexed by date, or DataFrame indexed by date with one column per series
+            horizon: Number of days to forecast
+            lag_periods: Lags the model was trained with
+            rolling_windows: Rolling windows the model was trained with
+            
+        Returns:
+            Forecast Series (or DataFrame with one column per series) indexed by the future dates.
+        """
+        state = OnlineFeatureState.from_history(history, lag_periods, rolling_windows)
+        feature_names = getattr(self.model, 'feature_names_in_', None)
+        dates = pd.date_range(pd.Timestamp(history.index[-1]) + pd.Timedelta(days=1), periods=horizon, freq='D')
+        
+        forecasts = np.empty((horizon, state.n_series))
+        for step, date in enumerate(dates):
+            X = state.next_features(date)
+            if feature_names is not None:
+                X = X[list(feature_names)]
+            forecasts[step] = self.model.predict(X)
+            state.push(forecasts[step])
+        
+        if isinstance(history, pd.DataFrame):
+            return pd.DataFrame(forecasts, index=dates, columns=history.columns)
+        return pd.Series(forecasts[:, 0], index=dates, name=history.name)
+
+    @instrument('fit')
+    def fit_direct(self, X, y, horizon, groups=None, n_buckets=1, n_jobs=None):
+        """
+        Fit the direct multi-horizon strategy: one target column per step ahead.
+        
+        The features of day t only use values up to t-1, so each row is
+        paired with the values of days t..t+horizon-1: step h = 1 is the
+        row's own target, exactly what predict learns. A clone of the model
+        is trained on the resulting multi-output matrix. With n_buckets > 1
+        the horizons are split into contiguous buckets, each with its own
+        model, trained in parallel.
+        
+        Args:
+            X: Feature matrix, one row per consecutive day (per series)
+            y: Target aligned with X
+            horizon: Number of days ahead to forecast
+            groups: Optional series ids aligned with X, so targets never cross series
+            n_buckets: Number of horizon-bucket models (at most horizon)
+            n_jobs: Parallel jobs for fitting the buckets
+        """
+        if not 1 <= n_buckets <= horizon:
+            raise ValueError(f"n_buckets must be between 1 and horizon ({horizon}), got {n_buckets}")
+        y = pd.Series(np.asarray(y, dtype=float))
+        shifter = y.groupby(np.asarray(groups)) if groups is not None else y
+        Y = np.column_stack([shifter.shift(-h).to_numpy() for h in range(horizon)])
+        valid = ~np.isnan(Y).any(axis=1)
+        X_valid = X[valid] if isinstance(X, np.ndarray) else X.iloc[np.flatnonzero(valid)]
+        Y_valid = Y[valid]
+        
+        from joblib import Parallel, delayed
+        
+        buckets = np.array_split(np.arange(horizon), n_buckets)
+        models = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_clone)(self.model, X_valid, Y_valid[:, bucket]) for bucket in buckets
+        )
+        self.direct_models = list(zip(buckets, models))
+        self.horizon = horizon
+
+    @instrument('predict')
+    def predict_direct(self, X):
+        """
+        Predict the full 1..horizon path for every row of X.
+        
+        Each row holds the features of the first forecast day, built from
+        values up to the last known day (e.g. OnlineFeatureState.next_features),
+        so column h - 1 forecasts h days after the last known value.
+        
+        Args:
+            X: Feature rows of the first day to forecast, one per origin
+            
+        Returns:
+            np.ndarray of shape (len(X), horizon)
+        """
+        forecasts = np.empty((len(X), self.horizon))
+        for bucket, model in self.direct_models:
+            forecasts[:, bucket] = np.asarray(model.predict(X)).reshape(len(X), -1)
+        return forecasts
+
     def get_feature_importance(self, feature_names):
         if self.model_type == 'random_forest':
             importances = self.model.feature_importances_
@@ -56,15 +396,260 @@ class MLForecaster:
         else:
             raise NotImplementedError("Feature importance only available for Random Forest")
 
-def evaluate_model(y_true, y_pred, model_name):
-    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-    mae = mean_absolute_error(y_true, y_pred)
+class _TaskTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise _TaskTimeout()
+
+def _fit_predict_task(series_id, data, forecaster_cls, forecaster_kwargs, horizon, timeout, seed, keep_model):
+    """Fit and predict one series; never raises, failures are reported in the result."""
+    np.random.seed((seed + zlib.crc32(str(series_id).encode())) % 2**32)
+    use_alarm = timeout is not None and hasattr(signal, 'SIGALRM')
+    previous = None
+    
+    result = {'series_id': series_id, 'status': 'ok', 'fit_seconds': np.nan,
+              'predict_seconds': np.nan, 'error': None, 'model': None, 'prediction': None}
+    try:
+        if use_alarm:
+            previous = signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        forecaster = forecaster_cls(**forecaster_kwargs)
+        start = time.perf_counter()
+        if isinstance(data, tuple):
+            X, y, X_pred = data
+            forecaster.fit(X, y)
+            result['fit_seconds'] = time.perf_counter() - start
+            start = time.perf_counter()
+            result['prediction'] = forecaster.predict(X_pred)
+        else:
+            forecaster.fit(data)
+            result['fit_seconds'] = time.perf_counter() - start
+            start = time.perf_counter()
+            result['prediction'] = forecaster.predict(horizon)
+        result['predict_seconds'] = time.perf_counter() - start
+        if keep_model:
+            result['model'] = forecaster
+    except _TaskTimeout:
+        result['status'] = 'timeout'
+        result['error'] = f"exceeded {timeout}s"
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            if previous is not None:
+                signal.signal(signal.SIGALRM, previous)
+    return result
+
+def _failed_result(series_id, error):
+    return {'series_id': series_id, 'status': 'failed', 'fit_seconds': np.nan, 'predict_seconds': np.nan,
+            'error': f"{type(error).__name__}: {error}", 'model': None, 'prediction': None}
+
+@instrument('fit')
+def fit_predict_many(tasks, forecaster_cls, forecaster_kwargs=None, horizon=None, n_jobs=None,
+                     timeout=None, max_pending=None, seed=0, keep_models=True):
+    """
+    Fit and predict one forecaster per series across a process pool.
+    
+    Args:
+        tasks: Dict or iterable of (series_id, data) pairs with unique series
+            ids. data is a Series y
+            for univariate forecasters (fit(y), predict(horizon)) or a tuple
+            (X_train, y_train, X_pred) for MLForecaster.
+        forecaster_cls: Forecaster class, e.g. ARIMAForecaster
+        forecaster_kwargs: Constructor arguments for every forecaster
+        horizon: Forecast horizon for univariate forecasters
+        n_jobs: Number of worker processes (1 runs in the calling process)
+        timeout: Per-series time limit in seconds (POSIX only; with n_jobs=1
+            only from the main thread)
+        max_pending: Maximum tasks submitted at once, bounding memory (default 2 x n_jobs)
+        seed: Base seed; each series gets a seed derived from it and its id
+        keep_models: Return the fitted forecasters (otherwise only predictions)
+        
+    Returns:
+        dict: 'models' and 'predictions' keyed by series id (in input order,
+            successful series only) and 'report', a DataFrame with status and
+            fit/predict timings per series.
+    """
+    forecaster_kwargs = forecaster_kwargs or {}
+    if timeout is not None and n_jobs == 1 and threading.current_thread() is not threading.main_thread():
+        raise ValueError("timeout with n_jobs=1 needs the main thread (it relies on SIGALRM); "
+                         "use n_jobs > 1 or call fit_predict_many from the main thread")
+    items = tasks.items() if isinstance(tasks, dict) else tasks
+    args = (forecaster_cls, forecaster_kwargs, horizon, timeout, seed, keep_models)
+    results = {}
+    order = []
+    seen = set()
+    
+    def add(series_id):
+        if series_id in seen:
+            raise ValueError(f"Duplicate series_id: {series_id!r}")
+        seen.add(series_id)
+        order.append(series_id)
+    
+    if n_jobs == 1:
+        for series_id, data in items:
+            add(series_id)
+            results[series_id] = _fit_predict_task(series_id, data, *args)
+    else:
+        n_workers = n_jobs or os.cpu_count() or 1
+        max_pending = max_pending or 2 * n_workers
+        pending = {}
+        executor = None
+        
+        def submit(series_id, data):
+            nonlocal executor
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker)
+            future = executor.submit(run_collecting, _fit_predict_task, series_id, data, *args)
+            pending[future] = (series_id, data)
+            return future
+        
+        def restart():
+            nonlocal executor
+            if executor is not None:
+                executor.shutdown(wait=False)
+                executor = None
+        
+        def finish(future):
+            """Record a finished future; returns its (series_id, data) if its worker pool broke."""
+            series_id, data = pending.pop(future)
+            try:
+                results[series_id], metrics = future.result()
+                merge(metrics)
+            except BrokenProcessPool:
+                return series_id, data
+            except Exception as e:
+                results[series_id] = _failed_result(series_id, e)
+            return None
+        
+        def collect(done):
+            broken = [task for task in map(finish, done) if task is not None]
+            if not broken:
+                return
+            # A dead worker takes the whole pool down with every series in flight.
+            # Rerun those one at a time on a fresh pool, so only a series that
+            # crashes a worker on its own is reported as failed.
+            broken += [task for task in map(finish, wait(pending).done) if task is not None]
+            restart()
+            for series_id, data in broken:
+                future = submit(series_id, data)
+                wait([future])
+                if finish(future) is not None:
+                    results[series_id] = _failed_result(series_id, future.exception())
+                    restart()
+        
+        try:
+            for series_id, data in items:
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                add(series_id)
+                try:
+                    submit(series_id, data)
+                except BrokenProcessPool:
+                    # The pool broke since the last collect: recover, then submit again
+                    collect(wait(pending).done)
+                    restart()
+                    submit(series_id, data)
+            collect(wait(pending).done)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    ordered = [results[series_id] for series_id in order]
+    report = pd.DataFrame(ordered, columns=['series_id', 'status', 'fit_seconds', 'predict_seconds', 'error'])
+    ok = [r for r in ordered if r['status'] == 'ok']
+    
+    n_failed = len(ordered) - len(ok)
+    print(f"✅ Fitted {len(ok)}/{len(ordered)} series ({n_failed} failed or timed out), "
+          f"total fit time {report['fit_seconds'].sum():.1f}s")
+    
+    return {
+        'models': {r['series_id']: r['model'] for r in ok} if keep_models else {},
+        'predictions': {r['series_id']: r['prediction'] for r in ok},
+        'report': report,
+    }
+
+METRIC_NAMES = ['RMSE', 'MAE', 'MAPE', 'sMAPE', 'MASE', 'R2']
+
+def _as_rows(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[None, :] if values.ndim == 1 else values
+
+@instrument('evaluate')
+def batch_metrics(y_true, y_pred, y_train=None, season=1, series_ids=None, model_names=None):
+    """
+    Score many series x models in one vectorized pass.
+    
+    NaNs in either array are treated as missing and skipped, so ragged
+    series can be stacked with NaN padding. MAPE is averaged over non-zero
+    actuals only (NaN when every actual is zero) and sMAPE counts a zero
+    forecast of a zero actual as a perfect hit, so neither returns inf.
+    
+    Args:
+        y_true: Actuals, shape (n_series, T) or (T,)
+        y_pred: Forecasts, shape (n_models, n_series, T), (n_series, T) or (T,)
+        y_train: In-sample history per series, shape (n_series, T_train) or
+            (T_train,), used to scale MASE; MASE is NaN without it
+        season: Seasonal period of the naive forecast used by MASE
+        series_ids: Labels for the series axis (default: 0..n_series-1)
+        model_names: Labels for the model axis (default: 0..n_models-1)
+        
+    Returns:
+        pd.DataFrame: One row per (model, series) with columns model, series,
+        RMSE, MAE, MAPE, sMAPE, MASE, R2 and n (number of scored points).
+    """
+    actual = _as_rows(y_true)
+    pred = np.asarray(y_pred, dtype=np.float64)
+    pred = pred.reshape((1,) * (3 - pred.ndim) + pred.shape)
+    actual = np.broadcast_to(actual, pred.shape)
+    n_models, n_series, _ = pred.shape
+    
+    valid = ~(np.isnan(actual) | np.isnan(pred))
+    n = valid.sum(axis=-1)
+    err = np.where(valid, pred - actual, 0.0)
+    abs_err = np.abs(err)
+    sse = (err ** 2).sum(axis=-1)
     
-    # Avoid division by zero for MAPE
     with np.errstate(divide='ignore', invalid='ignore'):
-        mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+        rmse = np.sqrt(sse / n)
+        mae = abs_err.sum(axis=-1) / n
+        
+        nonzero = valid & (actual != 0)
+        mape = 100 * np.where(nonzero, abs_err / np.abs(actual), 0.0).sum(axis=-1) / nonzero.sum(axis=-1)
+        
+        denom = np.abs(actual) + np.abs(pred)
+        smape = 100 * np.where(valid & (denom > 0), 2 * abs_err / denom, 0.0).sum(axis=-1) / n
         
-    r2 = r2_score(y_true, y_pred)
+        mean_actual = np.where(valid, actual, 0.0).sum(axis=-1) / n
+        sst = np.where(valid, (actual - mean_actual[..., None]) ** 2, 0.0).sum(axis=-1)
+        r2 = np.where(sst > 0, 1 - sse / sst, np.nan)
+        
+        mase = np.full(mae.shape, np.nan)
+        if y_train is not None:
+            train = _as_rows(y_train)
+            diff = np.abs(train[:, season:] - train[:, :-season])
+            diff_valid = ~np.isnan(diff)
+            scale = np.where(diff_valid, diff, 0.0).sum(axis=-1) / diff_valid.sum(axis=-1)
+            mase = np.where(scale > 0, mae / scale, np.nan)
+    
+    metrics = np.stack([rmse, mae, mape, smape, mase, r2], axis=-1).reshape(-1, len(METRIC_NAMES))
+    results = pd.DataFrame(metrics, columns=METRIC_NAMES)
+    results.insert(0, 'model', np.repeat(model_names if model_names is not None else np.arange(n_models), n_series))
+    results.insert(1, 'series', np.tile(series_ids if series_ids is not None else np.arange(n_series), n_models))
+    results['n'] = n.reshape(-1)
+    return results
+
+@instrument('evaluate')
+def evaluate_model(y_true, y_pred, model_name, verbose=True):
+    scores = batch_metrics(y_true, y_pred).iloc[0]
+    rmse, mae, mape, r2 = (float(scores[m]) for m in ['RMSE', 'MAE', 'MAPE', 'R2'])
+    
+    if not verbose:
+        return {'RMSE': rmse, 'MAE': mae, 'MAPE': mape, 'R2': r2}
     
     print(f"\n📊 {model_name} Performance:")
     print("-" * 50)
@@ -0,0 +1,591 @@
+"""
+Pipeline Module for Sales Forecasting Project
+
+Headless, incremental version of notebooks 01-05. The pipeline is a DAG of
+stages over the src functions:
+
+    ingest -> aggregate -> features -> train ----> forecast -> figures
+                              |                       |   \\
+                              +------> backtest ------+----> report
+
+Every stage writes its outputs to <work_dir>/<stage>/ (and publishes the
+CSVs the dashboard reads to data/processed and outputs/forecasts). A stage's
+fingerprint combines its code, the source of the src modules it uses, its
+parameters and the content hashes of its upstream outputs, so a stage only
+reruns when one of those changed or one of its own outputs was modified or
+removed; stages whose dependencies are satisfied run concurrently in a
+process pool. Manifests record output paths relative to the checkout.
+
+Usage:
+    python src/pipeline.py                    # run everything that is stale
+    python src/pipeline.py --dry-run          # show what would run
+    python src/pipeline.py --stages forecast  # forecast and its upstream stages
+    python src/pipeline.py --force train      # rerun train even if unchanged
+"""
+
+import argparse
+import ast
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .artifact_store import fingerprint
+    from .backtesting import walk_forward_backtest
+    from .data_preprocessing import load_data, handle_missing_values, prepare_time_series_data, _file_fingerprint
+    from .feature_engineering import create_all_features
+    from .instrumentation import stage as instrument_stage, init_worker, run_collecting, merge
+    from .models import BaselineForecaster, ARIMAForecaster, MLForecaster, batch_metrics
+except ImportError:
+    from artifact_store import fingerprint
+    from backtesting import walk_forward_backtest
+    from data_preprocessing import load_data, handle_missing_values, prepare_time_series_data, _file_fingerprint
+    from feature_engineering import create_all_features
+    from instrumentation import stage as instrument_stage, init_worker, run_collecting, merge
+    from models import BaselineForecaster, ARIMAForecaster, MLForecaster, batch_metrics
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = Path(__file__).resolve().parent
+
+FORECASTERS = {cls.__name__: cls for cls in (BaselineForecaster, ARIMAForecaster, MLForecaster)}
+
+DEFAULT_CONFIG = {
+    'raw_path': str(ROOT / 'data' / 'processed' / 'Sample - Superstore.csv'),
+    'date_format': '%m/%d/%Y',
+    'processed_dir': str(ROOT / 'data' / 'processed'),
+    'outputs_dir': str(ROOT / 'outputs'),
+    'work_dir': str(ROOT / 'outputs' / 'pipeline'),
+    'lag_periods': [1, 7, 14, 30],
+    'rolling_windows': [7, 14, 30],
+    'test_fraction': 0.2,
+    'horizon': 90,
+    # (class name, kwargs) per model compared on the holdout, as in notebook 03
+    'models': {
+        'Naive Baseline': ['BaselineForecaster', {'method': 'naive'}],
+        'Mean Baseline': ['BaselineForecaster', {'method': 'mean'}],
+        'ARIMA': ['ARIMAForecaster', {'order': [2, 1, 2]}],
+        'SARIMA': ['ARIMAForecaster', {'order': [1, 1, 1], 'seasonal_order': [1, 1, 1, 7]}],
+        'Linear Regression': ['MLForecaster', {'model_type': 'linear_regression'}],
+        'Random Forest': ['MLForecaster', {'model_type': 'random_forest', 'n_estimators': 200,
+                                           'max_depth': 15, 'random_state': 42}],
+    },
+    'final_model': {'model_type': 'random_forest', 'n_estimators': 200, 'max_depth': 15, 'random_state': 42},
+    'backtest': {'n_folds': 5, 'horizon': 30},
+}
+
+# ---------------------------------------------------------------------------
+# Stages. Each takes a context with the config, its own output directory and
+# the output paths of its dependencies, and returns the paths it wrote.
+# ---------------------------------------------------------------------------
+
+def _read(ctx, stage_name, filename):
+    path = next(p for p in ctx['inputs'][stage_name] if os.path.basename(p) == filename)
+    return pd.read_pickle(path)
+
+def _out(ctx, filename):
+    return os.path.join(ctx['stage_dir'], filename)
+
+def _feature_matrix(features):
+    X = features.drop(columns=['Sales', 'Order Date'], errors='ignore')
+    return X.select_dtypes(include='number')
+
+def stage_ingest(ctx):
+    config = ctx['config']
+    df = load_data(config['raw_path'])
+    df = handle_missing_values(df)
+    df['Order Date'] = pd.to_datetime(df['Order Date'], format=config['date_format'])
+    df.to_pickle(_out(ctx, 'orders.pkl'))
+    return [_out(ctx, 'orders.pkl')]
+
+def stage_aggregate(ctx):
+    config = ctx['config']
+    orders = _read(ctx, 'ingest', 'orders.pkl')
+    daily = prepare_time_series_data(orders)
+    category_shares = orders.groupby('Category')['Sales'].sum() / orders['Sales'].sum()
+
+    daily.to_pickle(_out(ctx, 'daily.pkl'))
+    category_shares.to_pickle(_out(ctx, 'category_shares.pkl'))
+    os.makedirs(config['processed_dir'], exist_ok=True)
+    published = os.path.join(config['processed_dir'], 'daily_sales_simple.csv')
+    daily.to_csv(published)
+    return [_out(ctx, 'daily.pkl'), _out(ctx, 'category_shares.pkl'), published]
+
+def stage_features(ctx):
+    config = ctx['config']
+    daily = _read(ctx, 'aggregate', 'daily.pkl')
+    features = create_all_features(daily.reset_index(), lag_periods=config['lag_periods'],
+                                   rolling_windows=config['rolling_windows'])
+    features.to_pickle(_out(ctx, 'features.pkl'))
+    os.makedirs(config['processed_dir'], exist_ok=True)
+    published = os.path.join(config['processed_dir'], 'daily_sales_features.csv')
+    features.to_csv(published)
+    return [_out(ctx, 'features.pkl'), published]
+
+def stage_train(ctx):
+    import joblib
+
+    features = _read(ctx, 'features', 'features.pkl')
+    model = MLForecaster(**ctx['config']['final_model'])
+    model.fit(_feature_matrix(features), features['Sales'])
+    joblib.dump(model, _out(ctx, 'model.joblib'))
+    return [_out(ctx, 'model.joblib')]
+
+def stage_backtest(ctx):
+    config = ctx['config']
+    daily = _read(ctx, 'aggregate', 'daily.pkl')['Sales']
+    features = _read(ctx, 'features', 'features.pkl').set_index('Order Date')
+    X = _feature_matrix(features)
+
+    # Holdout comparison (notebook 03): the last test_fraction of feature days
+    split = int(len(features) * (1 - config['test_fraction']))
+    test_index = features.index[split:]
+    y_test = features['Sales'].iloc[split:]
+    train_series = daily.loc[:test_index[0]].iloc[:-1]
+
+    predictions = {}
+    for name, (class_name, kwargs) in config['models'].items():
+        forecaster = FORECASTERS[class_name](**kwargs)
+        if isinstance(forecaster, MLForecaster):
+            forecaster.fit(X.iloc[:split], features['Sales'].iloc[:split])
+            predictions[name] = np.asarray(forecaster.predict(X.iloc[split:]))
+        else:
+            forecaster.fit(train_series)
+            predictions[name] = np.asarray(forecaster.predict(len(test_index)))
+
+    names = list(predictions)
+    scores = batch_metrics(y_test.to_numpy(), np.stack([predictions[n] for n in names])[:, None, :], model_names=names)
+    comparison = scores.set_index('model')[['RMSE', 'MAE', 'MAPE', 'R2']]
+    comparison.index.name = None
+    best = comparison['RMSE'].idxmin()
+    test_predictions = pd.DataFrame({'Date': test_index, 'Actual': y_test.to_numpy(), 'Predicted': predictions[best]})
+
+    # Rolling-origin backtest of the ML models on the shared feature frame
+    ml_models = {name: (MLForecaster, kwargs) for name, (class_name, kwargs) in config['models'].items()
+                 if class_name == 'MLForecaster'}
+    backtest = walk_forward_backtest(features[['Sales']].join(X), ml_models, n_jobs=1, **config['backtest'])
+
+    forecasts_dir = os.path.join(config['outputs_dir'], 'forecasts')
+    os.makedirs(forecasts_dir, exist_ok=True)
+    paths = [os.path.join(forecasts_dir, name) for name in
+             ['model_comparison.csv', 'test_predictions.csv', 'backtest_results.csv']]
+    comparison.to_csv(paths[0])
+    test_predictions.to_csv(paths[1], index=False)
+    backtest.to_csv(paths[2], index=False)
+    return paths
+
+def stage_forecast(ctx):
+    import joblib
+
+    config = ctx['config']
+    model = joblib.load(ctx['inputs']['train'][0])
+    if not isinstance(model, MLForecaster):
+        raise TypeError(f"Expected a fitted MLForecaster, got {type(model).__name__}")
+    daily = _read(ctx, 'aggregate', 'daily.pkl')['Sales']
+    category_shares = _read(ctx, 'aggregate', 'category_shares.pkl')
+
+    forecast = model.forecast_recursive(daily, config['horizon'], config['lag_periods'], config['rolling_windows'])
+    forecast_df = pd.DataFrame({'Date': forecast.index, 'Predicted_Sales': forecast.to_numpy()})
+
+    monthly = forecast.groupby(forecast.index.to_period('M')).agg(['sum', 'size'])
+    monthly_df = pd.DataFrame({
+        'Month': monthly.index.strftime('%B %Y'),
+        'Predicted Sales': monthly['sum'].to_numpy(),
+        'Days': monthly['size'].to_numpy(),
+    })
+    monthly_df['Avg Daily Sales'] = monthly_df['Predicted Sales'] / monthly_df['Days']
+
+    category_df = pd.DataFrame({
+        'Category': category_shares.index,
+        'Total Forecast': forecast.sum() * category_shares.to_numpy(),
+        'Avg Daily Sales': forecast.mean() * category_shares.to_numpy(),
+        'Proportion': category_shares.to_numpy() * 100,
+    }).sort_values('Total Forecast', ascending=False)
+
+    forecasts_dir = os.path.join(config['outputs_dir'], 'forecasts')
+    os.makedirs(forecasts_dir, exist_ok=True)
+    paths = [os.path.join(forecasts_dir, name) for name in
+             ['90day_forecast.csv', 'monthly_forecast.csv', 'category_forecast.csv']]
+    forecast_df.to_csv(paths[0], index=False)
+    monthly_df.to_csv(paths[1], index=False)
+    category_df.to_csv(paths[2], index=False)
+    return paths
+
+def stage_figures(ctx):
+    try:
+        from .visualization import render_figures
+    except ImportError:
+        from visualization import render_figures
+
+    config = ctx['config']
+    figures_dir = os.path.join(config['outputs_dir'], 'figures')
+    daily = _read(ctx, 'aggregate', 'daily.pkl')['Sales']
+    comparison = pd.read_csv(ctx['inputs']['backtest'][0], index_col=0)
+    test = pd.read_csv(ctx['inputs']['backtest'][1], parse_dates=['Date']).set_index('Date')
+    forecast = pd.read_csv(ctx['inputs']['forecast'][0], parse_dates=['Date']).set_index('Date')['Predicted_Sales']
+
+    jobs = [
+        ('plot_forecast', {'historical': daily.loc[:test.index[0]].iloc[:-1], 'forecast': test['Predicted'],
+                           'actuals': test['Actual'], 'title': 'Sales Forecast - Test Period',
+                           'save_path': os.path.join(figures_dir, 'best_model_forecast.png')}),
+        ('plot_error_analysis', {'y_true': test['Actual'], 'y_pred': test['Predicted'], 'title': 'Forecast Errors',
+                                 'save_path': os.path.join(figures_dir, 'error_analysis.png')}),
+        ('plot_model_comparison', {'df': comparison,
+                                   'save_path': os.path.join(figures_dir, 'model_comparison_rmse.png')}),
+        ('plot_forecast', {'historical': daily.tail(365), 'forecast': forecast,
+                           'title': f"{config['horizon']}-Day Sales Forecast",
+                           'save_path': os.path.join(figures_dir, 'future_forecast.png')}),
+        ('create_dashboard', {'historical': daily.tail(365), 'forecast': forecast, 'comparison_df': comparison,
+                              'save_path': os.path.join(figures_dir, 'forecast_dashboard.png')}),
+    ]
+    # Stages already run in a process pool, so render inline rather than nesting pools
+    paths = render_figures(jobs, n_jobs=1)
+    failed = [kwargs['save_path'] for (_, kwargs), path in zip(jobs, paths) if path is None]
+    if failed:
+        raise RuntimeError(f"Could not render {failed}")
+    return paths
+
+def stage_report(ctx):
+    config = ctx['config']
+    comparison = pd.read_csv(ctx['inputs']['backtest'][0], index_col=0)
+    backtest = pd.read_csv(ctx['inputs']['backtest'][2])
+    forecast = pd.read_csv(ctx['inputs']['forecast'][0], parse_dates=['Date'])
+    monthly = pd.read_csv(ctx['inputs']['forecast'][1])
+
+    def table(df, index_name):
+        df = df.reset_index().rename(columns={'index': index_name})
+        lines = ['| ' + ' | '.join(map(str, df.columns)) + ' |', '|' + '---|' * len(df.columns)]
+        for row in df.itertuples(index=False):
+            lines.append('| ' + ' | '.join(f"{v:,.2f}" if isinstance(v, float) else str(v) for v in row) + ' |')
+        return '\n'.join(lines)
+
+    backtest_summary = backtest.pivot_table(index='model', columns='metric', values='value', aggfunc='mean')
+    best = comparison['RMSE'].idxmin()
+    report = [
+        '# Pipeline Forecast Report',
+        '',
+        f"Generated {pd.Timestamp.now():%Y-%m-%d %H:%M} from `{os.path.basename(config['raw_path'])}`.",
+        '',
+        '## Holdout model comparison',
+        '',
+        table(comparison, 'Model'),
+        '',
+        f"Best model on the holdout: **{best}**.",
+        '',
+        f"## Walk-forward backtest ({config['backtest']['n_folds']} folds x {config['backtest']['horizon']} days, mean)",
+        '',
+        table(backtest_summary[[c for c in ['RMSE', 'MAE', 'sMAPE', 'MASE', 'R2'] if c in backtest_summary]], 'Model'),
+        '',
+        f"## {config['horizon']}-day forecast",
+        '',
+        f"{forecast['Date'].min():%Y-%m-%d} to {forecast['Date'].max():%Y-%m-%d}: "
+        f"total ${forecast['Predicted_Sales'].sum():,.0f}, average ${forecast['Predicted_Sales'].mean():,.0f} per day.",
+        '',
+        table(monthly.set_index('Month'), 'Month'),
+        '',
+    ]
+    path = os.path.join(config['outputs_dir'], 'pipeline_report.md')
+    with open(path, 'w') as f:
+        f.write('\n'.join(report))
+    return [path]
+
+# name -> (dependencies, stage function, config keys the stage depends on)
+STAGES = {
+    'ingest': ([], stage_ingest, ['raw_path', 'date_format']),
+    'aggregate': (['ingest'], stage_aggregate, ['processed_dir']),
+    'features': (['aggregate'], stage_features, ['processed_dir', 'lag_periods', 'rolling_windows']),
+    'train': (['features'], stage_train, ['final_model']),
+    'backtest': (['aggregate', 'features'], stage_backtest, ['outputs_dir', 'test_fraction', 'models', 'backtest']),
+    'forecast': (['aggregate', 'train'], stage_forecast, ['outputs_dir', 'horizon', 'lag_periods', 'rolling_windows']),
+    'figures': (['aggregate', 'backtest', 'forecast'], stage_figures, ['outputs_dir', 'horizon']),
+    'report': (['backtest', 'forecast'], stage_report, ['outputs_dir', 'raw_path', 'horizon', 'backtest']),
+}
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+def _manifest_path(config, name):
+    return os.path.join(config['work_dir'], name, 'manifest.json')
+
+def _read_manifest(config, name):
+    try:
+        with open(_manifest_path(config, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _relative(path):
+    """Manifest form of a path: relative to the checkout, so moving it keeps manifests valid."""
+    try:
+        return os.path.relpath(path, ROOT)
+    except ValueError:  # another drive on Windows
+        return os.path.abspath(path)
+
+def _absolute(path):
+    return os.path.normpath(os.path.join(ROOT, path))
+
+def _src_file(obj):
+    """Source file of obj if it is defined in a src module."""
+    try:
+        path = inspect.getsourcefile(inspect.unwrap(obj))  # past @instrument wrappers
+    except (TypeError, ValueError):
+        return None
+    return str(Path(path).resolve()) if path and Path(path).resolve().parent == SRC_DIR else None
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+@functools.lru_cache(maxsize=None)
+def _module_imports(path):
+    """src modules imported anywhere in a source file, including imports inside functions."""
+    names = set()
+    for node in ast.walk(ast.parse(Path(path).read_text())):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.rsplit('.', 1)[-1] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.add(node.module.rsplit('.', 1)[-1])
+    return {str(SRC_DIR / f"{name}.py") for name in names if (SRC_DIR / f"{name}.py").exists()}
+
+def _code_dependencies(func):
+    """
+    Source a stage depends on: the pipeline helpers it calls and the src
+    modules (with everything they import) whose functions it uses.
+    """
+    this_file = str(Path(__file__).resolve())
+    helpers, files, pending = {}, set(), [func]
+    while pending:
+        for name in _code_names(pending.pop().__code__):
+            obj = globals().get(name)
+            path = _src_file(obj) if obj is not None else None
+            if path == this_file and inspect.isfunction(obj):
+                if name not in helpers:
+                    helpers[name] = inspect.getsource(obj)
+                    pending.append(obj)
+            elif path is not None:
+                files.add(path)
+            elif (SRC_DIR / f"{name}.py").exists():  # lazy `from .module import ...`
+                files.add(str(SRC_DIR / f"{name}.py"))
+
+    pending = list(files)
+    while pending:
+        for path in _module_imports(pending.pop()) - files:
+            files.add(path)
+            pending.append(path)
+    files.discard(this_file)
+    modules = {os.path.basename(path): hashlib.sha256(Path(path).read_bytes()).hexdigest() for path in sorted(files)}
+    return {'helpers': helpers, 'modules': modules}
+
+def _stage_fingerprint(config, name, manifests):
+    """Fingerprint of a stage's code (and the src code it uses), parameters and upstream output content."""
+    deps, func, keys = STAGES[name]
+    params = {key: _relative(config[key]) if key.endswith(('_dir', '_path')) else config[key] for key in keys}
+    parts = {
+        'stage': name,
+        'code': inspect.getsource(func),
+        'dependencies': _code_dependencies(func),
+        'params': params,
+        'inputs': {dep: manifests[dep]['output_fingerprint'] for dep in deps},
+    }
+    if name == 'ingest':
+        parts['raw'] = _file_fingerprint(config['raw_path'])['sha256']
+    return fingerprint(parts)
+
+def _output_digest(path):
+    """Content hash of a stage output; pickled frames are hashed by value, not bytes."""
+    if path.endswith('.pkl'):
+        return fingerprint(pd.read_pickle(path))
+    return _file_fingerprint(path)['sha256']
+
+def _describe_output(path):
+    stat = os.stat(path)
+    return {'path': _relative(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': _output_digest(path)}
+
+def _output_unchanged(entry):
+    """Whether an output still has the recorded content; only rehashed when size or mtime moved."""
+    path = _absolute(entry['path'])
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+        return True
+    try:
+        return _output_digest(path) == entry['digest']
+    except Exception:
+        return False
+
+def _output_paths(manifest):
+    return [_absolute(entry['path']) for entry in manifest['outputs']]
+
+def _is_current(manifest, stage_fingerprint):
+    return (manifest is not None and manifest['fingerprint'] == stage_fingerprint
+            and all(isinstance(entry, dict) and _output_unchanged(entry) for entry in manifest['outputs']))
+
+def _run_stage(name, config, inputs):
+    """Run one stage (in a worker process) and return its manifest."""
+    stage_dir = os.path.join(config['work_dir'], name)
+    os.makedirs(stage_dir, exist_ok=True)
+    ctx = {'config': config, 'stage_dir': stage_dir, 'inputs': inputs}
+
+    start = time.perf_counter()
+    with instrument_stage(name, f'pipeline.{name}'):
+        outputs = STAGES[name][1](ctx)
+    seconds = time.perf_counter() - start
+
+    described = [_describe_output(str(p)) for p in outputs]
+    output_fingerprint = fingerprint([entry['digest'] for entry in described])
+    return {'outputs': described, 'output_fingerprint': output_fingerprint,
+            'seconds': round(seconds, 3), 'finished': pd.Timestamp.now().isoformat(timespec='seconds')}
+
+def _required_stages(targets):
+    required = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(STAGES[name][0])
+    return [name for name in STAGES if name in required]
+
+def run_pipeline(config=None, targets=None, force=(), n_jobs=None, dry_run=False):
+    """
+    Run the stale stages of the pipeline DAG.
+
+    Args:
+        config (dict): Overrides for DEFAULT_CONFIG.
+        targets (list): Stages to bring up to date, with their upstream
+            stages (default: all).
+        force (list): Stages to rerun even if their fingerprint is unchanged.
+        n_jobs (int): Worker processes for independent stages (1 runs inline).
+        dry_run (bool): Only report which stages are stale.
+
+    Returns:
+        dict: Stage name -> 'skipped', 'ran', 'stale' (dry run) or 'failed'.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    names = _required_stages(targets or list(STAGES))
+    unknown = set(force) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+    print("\n" + "="*60)
+    print("SALES FORECASTING PIPELINE")
+    print("="*60)
+
+    manifests, status, running = {}, {}, {}
+    executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=init_worker) if n_jobs != 1 and not dry_run else None
+    try:
+        while len(status) < len(names):
+            for name in names:
+                if name in status or name in running.values():
+                    continue
+                deps = STAGES[name][0]
+                dep_status = [status.get(d) for d in deps]
+                if any(s in ('failed', 'blocked', 'stale') for s in dep_status):
+                    if dry_run:
+                        status[name] = 'stale'
+                        print(f"🔁 {name}: would run if upstream output changes")
+                    else:
+                        status[name] = 'blocked'
+                        print(f"⛔ {name}: blocked by a failed upstream stage")
+                    continue
+                if not all(s in ('skipped', 'ran') for s in dep_status):
+                    continue
+
+                stage_fingerprint = _stage_fingerprint(config, name, manifests)
+                manifest = _read_manifest(config, name)
+                if name not in force and _is_current(manifest, stage_fingerprint):
+                    manifests[name], status[name] = manifest, 'skipped'
+                    print(f"⏭️  {name}: up to date")
+                    continue
+                if dry_run:
+                    status[name] = 'stale'
+                    print(f"🔁 {name}: would run")
+                    continue
+
+                inputs = {dep: _output_paths(manifests[dep]) for dep in deps}
+                print(f"▶️  {name}: running")
+                if executor is None:
+                    running[_InlineFuture(_run_stage, name, config, inputs)] = name
+                else:
+                    running[executor.submit(run_collecting, _run_stage, name, config, inputs)] = name
+                manifests[name] = {'fingerprint': stage_fingerprint}
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED) if executor else (list(running), None)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                    if executor is not None:
+                        result, metrics = result
+                        merge(metrics)
+                    manifest = {'fingerprint': manifests[name]['fingerprint'], **result}
+                except Exception as e:
+                    status[name] = 'failed'
+                    print(f"❌ {name}: {type(e).__name__}: {e}")
+                    continue
+                with open(_manifest_path(config, name), 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                manifests[name], status[name] = manifest, 'ran'
+                print(f"✅ {name}: finished in {manifest['seconds']:.1f}s")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    ran = sum(s == 'ran' for s in status.values())
+    print("-"*60)
+    print(f"{ran} stage(s) ran, {sum(s == 'skipped' for s in status.values())} up to date"
+          + (f", {sum(s in ('failed', 'blocked') for s in status.values())} failed or blocked"
+             if any(s in ('failed', 'blocked') for s in status.values()) else ''))
+    print("="*60 + "\n")
+    return status
+
+class _InlineFuture:
+    """Runs a stage immediately; mimics the part of Future the scheduler uses."""
+    def __init__(self, func, *args):
+        try:
+            self._result, self._error = func(*args), None
+        except Exception as e:
+            self._result, self._error = None, e
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the sales forecasting pipeline incrementally.')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), help='Target stages (default: all)')
+    parser.add_argument('--force', nargs='+', default=[], choices=list(STAGES), help='Rerun these stages regardless')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (1 runs stages inline)')
+    parser.add_argument('--dry-run', action='store_true', help='Only show which stages are stale')
+    parser.add_argument('--raw', help='Raw orders CSV (default: Sample - Superstore.csv)')
+    parser.add_argument('--work-dir', help='Directory for stage outputs and manifests')
+    parser.add_argument('--processed-dir', help='Where daily_sales_*.csv are published')
+    parser.add_argument('--outputs-dir', help='Where forecasts, figures and the report are published')
+    parser.add_argument('--horizon', type=int, help='Forecast horizon in days')
+    args = parser.parse_args()
+
+    overrides = {key: value for key, value in
+                 [('raw_path', args.raw), ('work_dir', args.work_dir), ('processed_dir', args.processed_dir),
+                  ('outputs_dir', args.outputs_dir), ('horizon', args.horizon)] if value is not None}
+    status = run_pipeline(overrides, targets=args.stages, force=args.force, n_jobs=args.jobs, dry_run=args.dry_run)
+    return 1 if any(s in ('failed', 'blocked') for s in status.values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
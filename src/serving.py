@@ -0,0 +1,533 @@
+"""
+Local forecast-serving process.
+
+Keeps fitted forecasters resident in memory and serves them over HTTP.
+Concurrent requests are coalesced by a micro-batcher into one predict call
+per model, and request latencies are tracked for p50/p99 reporting.
+Horizon forecasts can be cached in a ForecastCache keyed by model version.
+
+Usage:
+    python src/serving.py --store outputs/models --model rf=<artifact key> --port 8000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict, deque, defaultdict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .models import MLForecaster
+    from .artifact_store import ArtifactStore
+except ImportError:
+    from models import MLForecaster
+    from artifact_store import ArtifactStore
+
+class LatencyTracker:
+    """Rolling window of request latencies."""
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds * 1000)
+            self.count += 1
+
+    def summary(self):
+        with self.lock:
+            values = np.array(self.latencies)
+            count = self.count
+        if len(values) == 0:
+            return {'requests': count, 'p50_ms': None, 'p99_ms': None}
+        return {'requests': count,
+                'p50_ms': float(np.percentile(values, 50)),
+                'p99_ms': float(np.percentile(values, 99))}
+
+class ForecastCache:
+    """
+    LRU cache of forecasts keyed by (series_id, horizon, model_version).
+    
+    Entries expire after ttl seconds (if set). With disk_dir, entries are
+    also written to disk and survive restarts; the disk tier is an LRU too
+    (by file mtime, refreshed on every hit), capped at max_disk_entries.
+    Concurrent requests for the same key share one in-flight computation.
+    Registering a new version for a series drops that series' entries for
+    every other version.
+    
+    The lock only guards the in-memory entries, counters and in-flight
+    bookkeeping; disk reads, writes and scans happen outside it, so a slow
+    disk never blocks memory hits. Disk writes are atomic (write, then rename).
+    """
+    def __init__(self, max_entries=4096, ttl=None, disk_dir=None, max_disk_entries=None):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_entries if max_disk_entries is None else max_disk_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.evict_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0  # requests that waited on another request's computation
+        self.disk_evictions = 0
+        self.disk_entries = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self.disk_entries = len(self._disk_files())
+            self._evict_disk()
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.sha256(repr(value).encode()).hexdigest()[:16]
+
+    def _disk_prefix(self, series_id):
+        return self._digest(series_id) + '-'
+
+    def _disk_path(self, key):
+        # Series and version are encoded in the name, so invalidate() never has to open a file
+        name = f"{self._disk_prefix(key[0])}{self._digest(key[2])}-{hashlib.sha256(repr(key).encode()).hexdigest()}.pkl"
+        return os.path.join(self.disk_dir, name)
+
+    def _disk_files(self):
+        return [name for name in os.listdir(self.disk_dir) if name.endswith('.pkl')]
+
+    def _remove_disk(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            self.disk_entries -= 1
+        return True
+
+    def _evict_disk(self):
+        """Trim the disk tier to 90% of its cap, least recently used first."""
+        if self.disk_entries <= self.max_disk_entries or not self.evict_lock.acquire(blocking=False):
+            return
+        try:
+            files = []
+            for name in self._disk_files():
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    files.append((os.stat(path).st_mtime_ns, path))
+                except OSError:
+                    continue
+            files.sort()
+            # Evicting below the cap keeps the directory scan off the common write path
+            excess = max(len(files) - int(self.max_disk_entries * 0.9), 0)
+            evicted = 0
+            for _, path in files[:excess]:
+                try:
+                    os.remove(path)
+                    evicted += 1
+                except OSError:
+                    pass
+            with self.lock:
+                self.disk_evictions += evicted
+                self.disk_entries = len(files) - evicted
+        finally:
+            self.evict_lock.release()
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _memory_lookup(self, key):
+        """In-memory lookup; caller holds the lock."""
+        if key in self.entries:
+            created, value = self.entries[key]
+            if not self._expired(created):
+                self.entries.move_to_end(key)
+                return True, value
+            del self.entries[key]
+        return False, None
+
+    def _disk_lookup(self, key):
+        """Disk lookup, without the lock; returns (found, created, value)."""
+        if not self.disk_dir:
+            return False, None, None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                _, created, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return False, None, None
+        if self._expired(created):
+            self._remove_disk(path)
+            return False, None, None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted meanwhile; the value read is still good
+        return True, created, value
+
+    def _remember(self, key, created, value):
+        """Add an entry to the memory tier; caller holds the lock."""
+        self.entries[key] = (created, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _write_disk(self, key, created, value):
+        """Atomically write an entry to the disk tier, without the lock."""
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, created, value), f)
+        existed = os.path.exists(path)
+        os.replace(tmp_path, path)
+        if not existed:
+            with self.lock:
+                self.disk_entries += 1
+        self._evict_disk()
+
+    def get_or_compute(self, series_id, horizon, version, compute):
+        """
+        Return the cached forecast for the key, computing it at most once.
+        
+        Args:
+            series_id: Series (or model) identifier
+            horizon: Forecast horizon
+            version: Model artifact version
+            compute: Zero-argument callable producing the forecast on a miss
+        """
+        key = (series_id, horizon, version)
+        with self.lock:
+            found, value = self._memory_lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            owner = key not in self.inflight
+            if owner:
+                self.inflight[key] = Future()
+            else:
+                self.shared += 1
+            future = self.inflight[key]
+        
+        if not owner:
+            return future.result()
+        try:
+            found, created, value = self._disk_lookup(key)
+            if not found:
+                created, value = time.time(), compute()
+                if self.disk_dir:
+                    self._write_disk(key, created, value)
+        except Exception as e:
+            with self.lock:
+                del self.inflight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._remember(key, created, value)
+            del self.inflight[key]
+        future.set_result(value)
+        return value
+
+    def invalidate(self, series_id, keep_version=None):
+        """Drop the series' entries (memory and disk), except those for keep_version."""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == series_id and k[2] != keep_version]:
+                del self.entries[key]
+        if not self.disk_dir:
+            return
+        prefix = self._disk_prefix(series_id)
+        keep = prefix + self._digest(keep_version) + '-'
+        for name in self._disk_files():
+            if name.startswith(prefix) and not name.startswith(keep):
+                self._remove_disk(os.path.join(self.disk_dir, name))
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'disk_entries': self.disk_entries, 'hits': self.hits,
+                    'misses': self.misses, 'shared': self.shared, 'disk_evictions': self.disk_evictions}
+
+def _content_version(forecaster):
+    """Version label derived from a forecaster's state."""
+    try:
+        return 'sha256:' + hashlib.sha256(pickle.dumps(forecaster, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()[:16]
+    except Exception:
+        # Unpicklable state: fall back to a label that is unique to this registration
+        return f"unversioned-{time.time_ns()}"
+
+def _fail(items, error):
+    """Set error on every (request, future) item not yet resolved."""
+    for _, future in items:
+        if not future.done():
+            future.set_exception(error)
+
+class ForecastService:
+    """
+    Resident forecasters behind a micro-batching request queue.
+    
+    Requests are dicts: {'model': name, 'horizon': h} for ARIMA/baseline
+    forecasters, or {'model': name, 'features': rows} for MLForecaster
+    (rows as lists in training column order or as dicts). Requests that
+    arrive within max_wait_ms of each other are answered from one predict
+    call per model.
+    """
+    def __init__(self, max_batch=256, max_wait_ms=2, cache=None):
+        self.cache = cache
+        self.models = {}
+        self.versions = {}
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.latency = LatencyTracker()
+        self.batches = 0
+        self.batched_requests = 0
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def register(self, name, forecaster, version=None):
+        """
+        Make a fitted forecaster available under name, invalidating forecasts of older versions.
+        
+        Args:
+            name: Model name used in requests
+            forecaster: Fitted forecaster
+            version: Version label (e.g. the artifact key); by default derived
+                from the forecaster's pickled content, so re-registering a
+                retrained model never serves forecasts of the previous one
+        """
+        if version is None:
+            version = _content_version(forecaster)
+        self.models[name] = forecaster
+        self.versions[name] = version
+        if self.cache is not None:
+            self.cache.invalidate(name, keep_version=version)
+
+    @staticmethod
+    def _check_request(request):
+        if not isinstance(request, dict):
+            raise TypeError(f"Request must be a JSON object, got {type(request).__name__}")
+        if not isinstance(request.get('model'), str):
+            raise TypeError(f"'model' must be a string, got {type(request.get('model')).__name__}")
+
+    def submit(self, request):
+        """Queue a request; returns a Future resolving to its forecast list."""
+        self._check_request(request)
+        future = Future()
+        self.queue.put((request, future))
+        return future
+
+    def forecast(self, request, timeout=None):
+        """Answer one request synchronously (through the cache when possible) and record its latency."""
+        started = time.perf_counter()
+        self._check_request(request)
+        name = request['model']
+        # Only horizon requests are cached: a features payload is not part of the key
+        if self.cache is not None and 'horizon' in request and 'features' not in request and name in self.models:
+            result = self.cache.get_or_compute(name, int(request['horizon']), self.versions[name],
+                                               lambda: self.submit(request).result(timeout))
+        else:
+            result = self.submit(request).result(timeout)
+        self.latency.record(time.perf_counter() - started)
+        return result
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # The batching thread must outlive any request; whatever escapes fails this batch only
+            try:
+                self._process(batch)
+            except Exception as e:
+                _fail(batch, e)
+
+    def _process(self, batch):
+        self.batches += 1
+        self.batched_requests += len(batch)
+        by_model = defaultdict(list)
+        for item in batch:
+            try:
+                by_model[item[0].get('model')].append(item)
+            except Exception as e:
+                _fail([item], e)
+        
+        for name, items in by_model.items():
+            try:
+                self._process_model(name, items)
+            except Exception as e:
+                _fail(items, e)
+
+    def _process_model(self, name, items):
+        forecaster = self.models.get(name)
+        if forecaster is None:
+            _fail(items, KeyError(f"Unknown model: {name}"))
+            return
+        
+        # Validate every request on its own so a malformed one only fails itself
+        prepared = []
+        for request, future in items:
+            try:
+                prepared.append((self._prepare(forecaster, request), future))
+            except Exception as e:
+                future.set_exception(e)
+        if not prepared:
+            return
+        
+        try:
+            results = self._predict_batch(forecaster, [inputs for inputs, _ in prepared])
+        except Exception:
+            # Fall back to one call per request so errors stay per request
+            for inputs, future in prepared:
+                try:
+                    result = self._predict_batch(forecaster, [inputs])[0]
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            return
+        for (_, future), result in zip(prepared, results):
+            future.set_result(result)
+
+    def _prepare(self, forecaster, request):
+        """Validate one request; returns its horizon or its feature frame."""
+        if not isinstance(forecaster, MLForecaster):
+            if 'horizon' not in request:
+                raise KeyError("Request needs a 'horizon'")
+            horizon = int(request['horizon'])
+            if horizon < 1:
+                raise ValueError(f"horizon must be positive, got {horizon}")
+            return horizon
+        
+        if 'features' not in request:
+            raise KeyError("Request needs 'features'")
+        rows = request['features']
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("'features' must be a non-empty list of rows")
+        columns = getattr(forecaster.model, 'feature_names_in_', None)
+        if isinstance(rows[0], dict):
+            frame = pd.DataFrame(rows)
+            if columns is not None:
+                missing = [c for c in columns if c not in frame.columns]
+                if missing:
+                    raise KeyError(f"Missing feature columns: {missing}")
+                frame = frame[list(columns)]
+        else:
+            frame = pd.DataFrame(rows, columns=columns)
+        return frame.astype(float)
+
+    def _predict_batch(self, forecaster, inputs):
+        if not isinstance(forecaster, MLForecaster):
+            path = np.asarray(forecaster.predict(max(inputs)), dtype=float)
+            return [path[:h].tolist() for h in inputs]
+        
+        # Stack every request's rows into one matrix, predict once, then split
+        predictions = forecaster.predict(pd.concat(inputs, ignore_index=True))
+        bounds = np.cumsum([0] + [len(frame) for frame in inputs])
+        return [np.asarray(predictions[start:end], dtype=float).tolist() for start, end in zip(bounds[:-1], bounds[1:])]
+
+    def metrics(self):
+        summary = self.latency.summary()
+        summary['batches'] = self.batches
+        summary['mean_batch_size'] = self.batched_requests / self.batches if self.batches else None
+        summary['models'] = {name: self.versions[name] for name in self.models}
+        if self.cache is not None:
+            summary['cache'] = self.cache.stats()
+        return summary
+
+def _make_handler(service, timeout):
+    class ForecastHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send(200, service.metrics())
+            elif self.path == '/health':
+                self._send(200, {'status': 'ok'})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/forecast':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length))
+                forecast = service.forecast(request, timeout)
+                self._send(200, {'model': request['model'], 'forecast': forecast})
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                self._send(500, {'error': f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ForecastHandler
+
+class ForecastHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default backlog of 5 drops bursts of concurrent clients
+
+def serve(service, host='127.0.0.1', port=8000, timeout=30):
+    """Serve service over HTTP until interrupted."""
+    server = ForecastHTTPServer((host, port), _make_handler(service, timeout))
+    print(f"✅ Serving {len(service.models)} models on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fitted forecasters over HTTP.")
+    parser.add_argument('--store', default='outputs/models', help="Artifact store root")
+    parser.add_argument('--model', action='append', default=[], metavar='NAME=KEY',
+                        help="Model to serve, by artifact key (repeatable)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2)
+    parser.add_argument('--cache-entries', type=int, default=4096, help="Forecast cache size (0 disables)")
+    parser.add_argument('--cache-ttl', type=float, default=None, help="Forecast cache TTL in seconds")
+    parser.add_argument('--cache-dir', default=None, help="Optional on-disk forecast cache directory")
+    parser.add_argument('--cache-disk-entries', type=int, default=None,
+                        help="Cap on on-disk forecast entries (default: --cache-entries)")
+    args = parser.parse_args()
+    
+    store = ArtifactStore(args.store)
+    cache = ForecastCache(args.cache_entries, args.cache_ttl, args.cache_dir,
+                          args.cache_disk_entries) if args.cache_entries else None
+    service = ForecastService(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, cache=cache)
+    for spec in args.model:
+        name, key = spec.split('=', 1)
+        service.register(name, store.load(key), version=key)
+    serve(service, args.host, args.port)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
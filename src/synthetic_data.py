@@ -0,0 +1,257 @@
+"""
+Synthetic Data Module for Sales Forecasting Project
+
+Generates order lines with the Superstore schema (Order Date, Ship Mode,
+Segment, Region, Category, Sub-Category, Product ID, Sales, Quantity,
+Discount, Profit) at any scale. Marginal distributions, seasonality and the
+Category > Sub-Category > Product hierarchy are calibrated on the
+9,994-row Sample - Superstore.csv.
+
+Daily order counts for the whole date range are drawn first, so chunks come
+out sorted by date and the output is a deterministic function of the seed
+and chunk size, regardless of how many rows are generated.
+
+Usage:
+    python src/synthetic_data.py data/synthetic/orders.csv --rows 100000000
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# (Category, Sub-Category, product code, order lines, mean list price, products, profit margin)
+SUBCATEGORIES = [
+    ('Furniture', 'Bookcases', 'FUR-BO', 228, 166.94, 49, -0.03),
+    ('Furniture', 'Chairs', 'FUR-CH', 617, 167.49, 87, 0.08),
+    ('Furniture', 'Furnishings', 'FUR-FU', 957, 30.11, 182, 0.14),
+    ('Furniture', 'Tables', 'FUR-TA', 319, 224.16, 57, -0.09),
+    ('Office Supplies', 'Appliances', 'OFF-AP', 466, 72.39, 98, 0.17),
+    ('Office Supplies', 'Art', 'OFF-AR', 796, 9.57, 163, 0.24),
+    ('Office Supplies', 'Binders', 'OFF-BI', 1523, 56.41, 210, 0.15),
+    ('Office Supplies', 'Envelopes', 'OFF-EN', 254, 20.38, 54, 0.42),
+    ('Office Supplies', 'Fasteners', 'OFF-FA', 217, 3.59, 43, 0.31),
+    ('Office Supplies', 'Labels', 'OFF-LA', 364, 8.88, 70, 0.44),
+    ('Office Supplies', 'Paper', 'OFF-PA', 1370, 16.78, 276, 0.43),
+    ('Office Supplies', 'Storage', 'OFF-ST', 846, 76.14, 131, 0.10),
+    ('Office Supplies', 'Supplies', 'OFF-SU', 190, 75.54, 38, -0.03),
+    ('Technology', 'Accessories', 'TEC-AC', 775, 59.47, 144, 0.25),
+    ('Technology', 'Copiers', 'TEC-CO', 68, 705.87, 13, 0.37),
+    ('Technology', 'Machines', 'TEC-MA', 115, 641.25, 63, 0.02),
+    ('Technology', 'Phones', 'TEC-PH', 889, 120.91, 184, 0.13),
+]
+
+SHIP_MODES = {'Standard Class': 0.597, 'Second Class': 0.195, 'First Class': 0.154, 'Same Day': 0.054}
+SEGMENTS = {'Consumer': 0.519, 'Corporate': 0.302, 'Home Office': 0.178}
+REGIONS = {'West': 0.320, 'East': 0.285, 'Central': 0.232, 'South': 0.162}
+
+# Share of discounted lines per region (Central and South discount more often)
+REGION_DISCOUNT_RATE = {'West': 0.45, 'East': 0.47, 'Central': 0.62, 'South': 0.53}
+DISCOUNT_LEVELS = np.array([0.1, 0.15, 0.2, 0.3, 0.32, 0.4, 0.45, 0.5, 0.6, 0.7, 0.8])
+DISCOUNT_WEIGHTS = np.array([9, 5, 366, 23, 3, 21, 1, 7, 14, 42, 30], dtype=float)
+PRICE_SIGMA = 0.6
+
+# Order lines per calendar month (Jan..Dec) and weekday (Mon..Sun) in the sample
+MONTH_WEIGHTS = np.array([381, 300, 696, 668, 735, 717, 710, 706, 1383, 819, 1471, 1408], dtype=float)
+WEEKDAY_WEIGHTS = np.array([1871, 1106, 371, 1463, 1818, 1655, 1710], dtype=float)
+
+def _normalize(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+def _draw(rng, probabilities, size):
+    """Vectorized categorical draw: codes into probabilities."""
+    return np.searchsorted(np.cumsum(probabilities), rng.random(size), side='right').clip(0, len(probabilities) - 1)
+
+def daily_order_weights(dates, annual_growth=0.18):
+    """
+    Relative order intensity per day: trend x month seasonality x weekday pattern.
+
+    Args:
+        dates (pd.DatetimeIndex): Days to weight.
+        annual_growth (float): Year-over-year growth of order volume.
+
+    Returns:
+        np.ndarray: Weights normalised to sum to 1.
+    """
+    years = (dates - dates[0]).days.to_numpy() / 365.25
+    trend = (1 + annual_growth) ** years
+    month = _normalize(MONTH_WEIGHTS)[dates.month.to_numpy() - 1]
+    weekday = _normalize(WEEKDAY_WEIGHTS)[dates.dayofweek.to_numpy()]
+    return _normalize(trend * month * weekday)
+
+def build_catalog(n_products=1862, seed=42, zipf_exponent=1.1):
+    """
+    Build the product hierarchy with popularity, price and margin per product.
+
+    Products are split over sub-categories in proportion to the sample.
+    Popularity inside a sub-category follows a Zipf law, so a few products
+    sell daily while the long tail is intermittent at daily granularity.
+
+    Args:
+        n_products (int): Total number of products.
+        seed (int): Random seed.
+        zipf_exponent (float): Skew of product popularity.
+
+    Returns:
+        pd.DataFrame: One row per product with Category, Sub-Category,
+            Product ID, weight (share of all order lines), price and margin.
+    """
+    rng = np.random.default_rng([seed, 0])
+    table = pd.DataFrame(SUBCATEGORIES, columns=['Category', 'Sub-Category', 'code', 'lines', 'price', 'products', 'margin'])
+    counts = np.maximum(np.round(_normalize(table['products']) * n_products).astype(int), 1)
+
+    sub = np.repeat(np.arange(len(table)), counts)
+    rank = np.concatenate([np.arange(1, c + 1) for c in counts])
+    popularity = rank ** -zipf_exponent
+    # Normalise popularity within each sub-category, then weight by its share of lines
+    within = popularity / np.bincount(sub, weights=popularity)[sub]
+    weight = within * _normalize(table['lines'])[sub]
+
+    numbers = rng.choice(np.arange(10_000_000, 10_005_000 + 10 * n_products), size=len(sub), replace=False)
+    product_ids = table['code'].to_numpy()[sub] + '-' + numbers.astype(str)
+
+    return pd.DataFrame({
+        'Category': table['Category'].to_numpy()[sub],
+        'Sub-Category': table['Sub-Category'].to_numpy()[sub],
+        'Product ID': product_ids,
+        'weight': weight,
+        # Mean-preserving lognormal spread of list prices around the sub-category mean
+        'price': table['price'].to_numpy()[sub] * rng.lognormal(-PRICE_SIGMA ** 2 / 2, PRICE_SIGMA, len(sub)),
+        'margin': table['margin'].to_numpy()[sub] + rng.normal(0.0, 0.08, len(sub)),
+    })
+
+def iter_order_chunks(n_rows, seed=42, start_date='2014-01-01', end_date='2017-12-31', n_products=1862,
+                      annual_growth=0.18, chunk_rows=1_000_000):
+    """
+    Generate synthetic orders chunk by chunk.
+
+    Args:
+        n_rows (int): Total order lines to generate.
+        seed (int): Random seed; the same seed and chunk_rows give the same rows.
+        start_date (str): First order date.
+        end_date (str): Last order date.
+        n_products (int): Size of the product catalogue.
+        annual_growth (float): Year-over-year growth of order volume.
+        chunk_rows (int): Rows per yielded chunk.
+
+    Yields:
+        pd.DataFrame: Chunks in Superstore schema, sorted by Order Date.
+    """
+    dates = pd.date_range(start_date, end_date, freq='D')
+    day_counts = np.random.default_rng([seed, 1]).multinomial(n_rows, daily_order_weights(dates, annual_growth))
+    day_ends = np.cumsum(day_counts)
+
+    catalog = build_catalog(n_products, seed)
+    product_p = _normalize(catalog['weight'])
+    product_ids = pd.Categorical(catalog['Product ID'])
+    categories = pd.Categorical(catalog['Category'])
+    subcategories = pd.Categorical(catalog['Sub-Category'])
+    price = catalog['price'].to_numpy()
+    margin = catalog['margin'].to_numpy()
+
+    region_names = list(REGIONS)
+    discount_rate = np.array([REGION_DISCOUNT_RATE[r] for r in region_names])
+    discount_p = _normalize(DISCOUNT_WEIGHTS)
+    # Sub-category margins are averages over the sample's discounts; lines
+    # discounted more than average earn less, and deep discounts make losses
+    mean_discount = (_normalize(list(REGIONS.values())) * discount_rate).sum() * (discount_p * DISCOUNT_LEVELS).sum()
+
+    for chunk_index, start in enumerate(range(0, n_rows, chunk_rows)):
+        size = min(chunk_rows, n_rows - start)
+        rng = np.random.default_rng([seed, 2, chunk_index])
+
+        day = np.searchsorted(day_ends, np.arange(start, start + size), side='right')
+        product = _draw(rng, product_p, size)
+        region = _draw(rng, _normalize(list(REGIONS.values())), size)
+
+        quantity = np.minimum(1 + rng.poisson(2.8, size), 14)
+        discounted = rng.random(size) < discount_rate[region]
+        discount = np.where(discounted, DISCOUNT_LEVELS[_draw(rng, discount_p, size)], 0.0)
+
+        sales = price[product] * quantity * (1 - discount) * rng.lognormal(0.0, 0.05, size)
+        line_margin = margin[product] + 1.2 * (mean_discount - discount) + rng.normal(0.0, 0.05, size)
+
+        yield pd.DataFrame({
+            'Order Date': dates[day],
+            'Ship Mode': pd.Categorical.from_codes(_draw(rng, _normalize(list(SHIP_MODES.values())), size), list(SHIP_MODES)),
+            'Segment': pd.Categorical.from_codes(_draw(rng, _normalize(list(SEGMENTS.values())), size), list(SEGMENTS)),
+            'Region': pd.Categorical.from_codes(region, region_names),
+            'Category': pd.Categorical.from_codes(categories.codes[product], categories.categories),
+            'Sub-Category': pd.Categorical.from_codes(subcategories.codes[product], subcategories.categories),
+            'Product ID': pd.Categorical.from_codes(product_ids.codes[product], product_ids.categories),
+            'Sales': sales.round(4),
+            'Quantity': quantity,
+            'Discount': discount,
+            'Profit': (sales * line_margin).round(4),
+        })
+
+def generate_orders(n_rows, seed=42, **kwargs):
+    """
+    Generate synthetic orders in memory.
+
+    Args:
+        n_rows (int): Total order lines to generate.
+        seed (int): Random seed.
+        **kwargs: Passed to iter_order_chunks.
+
+    Returns:
+        pd.DataFrame: Orders in Superstore schema.
+    """
+    return pd.concat(iter_order_chunks(n_rows, seed, **kwargs), ignore_index=True)
+
+def write_orders(path, n_rows, seed=42, chunk_rows=1_000_000, **kwargs):
+    """
+    Write synthetic orders to a CSV file chunk by chunk.
+
+    Dates use the Superstore m/d/Y format; a .gz suffix compresses the
+    output. The file is written to a temporary name and moved into place
+    when complete.
+
+    Args:
+        path (str): Output CSV path.
+        n_rows (int): Total order lines to generate.
+        seed (int): Random seed.
+        chunk_rows (int): Rows generated and written per chunk.
+        **kwargs: Passed to iter_order_chunks.
+
+    Returns:
+        str: The output path.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    compression = 'gzip' if path.endswith('.gz') else None
+    start = time.perf_counter()
+    written = 0
+
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter_order_chunks(n_rows, seed, chunk_rows=chunk_rows, **kwargs):
+            chunk.to_csv(f, header=written == 0, index=False, date_format='%m/%d/%Y',
+                         compression=compression, mode='ab')
+            written += len(chunk)
+            if written < n_rows:
+                print(f"   {written:,}/{n_rows:,} rows ({written / (time.perf_counter() - start):,.0f} rows/s)")
+    os.replace(tmp_path, path)
+
+    print(f"✅ Wrote {written:,} synthetic orders to {path} in {time.perf_counter() - start:.1f}s")
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate Superstore-schema synthetic orders.')
+    parser.add_argument('output', help='Output CSV path (.csv or .csv.gz)')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', default='2014-01-01', help='First order date')
+    parser.add_argument('--end', default='2017-12-31', help='Last order date')
+    parser.add_argument('--products', type=int, default=1862, help='Number of products in the catalogue')
+    parser.add_argument('--growth', type=float, default=0.18, help='Annual growth of order volume')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    write_orders(args.output, args.rows, seed=args.seed, chunk_rows=args.chunk_rows, start_date=args.start,
+                 end_date=args.end, n_products=args.products, annual_growth=args.growth)
+
+if __name__ == '__main__':
+    main()
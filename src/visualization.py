@@ -1,54 +1,112 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 import os
+import io
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 
-# Set style
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 12
+try:
+    from .instrumentation import instrument, init_worker, run_collecting, merge, redirect_thread_stdout
+except ImportError:
+    from instrumentation import instrument, init_worker, run_collecting, merge, redirect_thread_stdout
 
-def plot_forecast(historical, forecast, title=None, save_path=None, actuals=None):
-    plt.figure(figsize=(14, 7))
+# matplotlib and seaborn are imported when the first figure is drawn (seaborn
+# alone takes about a second), so importing this module stays cheap
+
+_style_applied = False
+
+def _apply_style():
+    """Set the project plot style once, on first use."""
+    global _style_applied
+    if not _style_applied:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        sns.set_theme(style="whitegrid")
+        plt.rcParams['figure.figsize'] = (12, 6)
+        plt.rcParams['font.size'] = 12
+        _style_applied = True
+
+def _new_figure(show, **kwargs):
+    """
+    Create the figure for one plot.
+
+    Figures that will be shown are registered with pyplot so notebooks display
+    them; figures that are only saved are standalone Figure objects, which
+    render with Agg, leave no global pyplot state behind and are freed as
+    soon as they go out of scope.
+    """
+    _apply_style()
+    if show:
+        import matplotlib.pyplot as plt
+        return plt.figure(**kwargs)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _finish(fig, save_path=None, show=True, dpi=None, label='plot'):
+    """
+    Lay out, optionally save and show a figure.
+
+    Interactive callers (show=True) get None, as before, so a notebook cell
+    ending in a plot call does not display the figure a second time, and
+    only a message when saving fails. Batch callers (show=False) get the
+    figure, and the exception when saving fails, so a failed save is never
+    mistaken for a rendered file.
+    """
+    fig.tight_layout()
+
+    if save_path:
+        try:
+            os.makedirs(os.path.dirname(save_path) or '.', exist_ok=True)
+            fig.savefig(save_path, dpi=dpi or 'figure')
+            print(f"Saved {label} to {save_path}")
+        except Exception as e:
+            print(f"Error saving {label}: {e}")
+            if not show:
+                raise
+
+    if show:
+        import matplotlib.pyplot as plt
+        plt.show()
+        return None
+    return fig
+
+@instrument('plot')
+def plot_forecast(historical, forecast, title=None, save_path=None, actuals=None, show=True, dpi=None):
+    fig = _new_figure(show, figsize=(14, 7))
+    ax = fig.add_subplot()
     
     # Plot historical data
     if historical is not None:
         idx = historical.index if hasattr(historical, 'index') else np.arange(len(historical))
-        plt.plot(idx, historical, label='Historical', color='gray', alpha=0.5)
+        ax.plot(idx, historical, label='Historical', color='gray', alpha=0.5)
     
     # Plot forecast
     if forecast is not None:
         idx = forecast.index if hasattr(forecast, 'index') else np.arange(len(forecast))
-        if historical is not None and hasattr(historical, 'index') and not hasattr(forecast, 'index'):
-             # Try to align if forecast follows historical
-             pass 
-        plt.plot(idx, forecast, label='Forecast', color='blue', linewidth=2)
+        ax.plot(idx, forecast, label='Forecast', color='blue', linewidth=2)
     
     if actuals is not None:
         idx = actuals.index if hasattr(actuals, 'index') else np.arange(len(actuals))
-        plt.plot(idx, actuals, label='Actual', color='green', linestyle='--')
+        ax.plot(idx, actuals, label='Actual', color='green', linestyle='--')
 
     if title:
-        plt.title(title, fontsize=16)
+        ax.set_title(title, fontsize=16)
         
-    plt.xlabel('Date')
-    plt.ylabel('Sales')
-    plt.legend()
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        try:
-            plt.savefig(save_path)
-            print(f"Saved plot to {save_path}")
-        except Exception as e:
-            print(f"Error saving plot: {e}")
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Sales')
+    ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.7)
     
-    plt.show()
+    return _finish(fig, save_path, show, dpi)
 
-def plot_error_analysis(y_true, y_pred, title=None, save_path=None):
+@instrument('plot')
+def plot_error_analysis(y_true, y_pred, title=None, save_path=None, show=True, dpi=None):
+    import seaborn as sns
+    
     # Ensure y_pred is array/series
     if not isinstance(y_pred, pd.Series):
         if hasattr(y_true, 'index'):
@@ -58,7 +116,8 @@ def plot_error_analysis(y_true, y_pred, title=None, save_path=None):
     
     residuals = y_true - y_pred
     
-    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    fig = _new_figure(show, figsize=(16, 6))
+    axes = fig.subplots(1, 2)
     
     # Residuals over time
     if hasattr(residuals, 'index'):
@@ -77,51 +136,40 @@ def plot_error_analysis(y_true, y_pred, title=None, save_path=None):
     axes[1].set_title('Residual Distribution')
     
     if title:
-        plt.suptitle(title, fontsize=16)
+        fig.suptitle(title, fontsize=16)
         
-    plt.tight_layout()
+    return _finish(fig, save_path, show, dpi)
+
+@instrument('plot')
+def plot_model_comparison(df, metric='RMSE', title=None, save_path=None, show=True, dpi=None):
+    import seaborn as sns
     
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        try:
-            plt.savefig(save_path)
-            print(f"Saved plot to {save_path}")
-        except Exception as e:
-            print(f"Error saving plot: {e}")
-        
-    plt.show()
+    if metric not in df.columns:
+        print(f"Column {metric} not found in model comparison data.")
+        return None
 
-def plot_model_comparison(df, metric='RMSE', title=None, save_path=None):
-    plt.figure(figsize=(10, 6))
+    fig = _new_figure(show, figsize=(10, 6))
+    ax = fig.add_subplot()
     
-    if metric in df.columns:
-        sns.barplot(x=df.index, y=df[metric], palette="viridis")
-        if title:
-            plt.title(title, fontsize=16)
-        else:
-            plt.title(f"Model Comparison - {metric} (Lower is Better)", fontsize=16)
-        plt.ylabel(metric)
-        plt.xlabel("Model")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        if save_path:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            try:
-                plt.savefig(save_path)
-                print(f"Saved plot to {save_path}")
-            except Exception as e:
-                print(f"Error saving plot: {e}")
-            
-        plt.show()
+    sns.barplot(x=df.index, y=df[metric], palette="viridis", ax=ax)
+    if title:
+        ax.set_title(title, fontsize=16)
     else:
-        print(f"Column {metric} not found in model comparison data.")
+        ax.set_title(f"Model Comparison - {metric} (Lower is Better)", fontsize=16)
+    ax.set_ylabel(metric)
+    ax.set_xlabel("Model")
+    ax.tick_params(axis='x', rotation=45)
+    
+    return _finish(fig, save_path, show, dpi)
 
-def create_dashboard(historical, forecast, actuals=None, comparison_df=None, save_path=None):
+@instrument('plot')
+def create_dashboard(historical, forecast, actuals=None, comparison_df=None, save_path=None, show=True, dpi=None):
     """
     Creates a summary dashboard of the forecasting results.
     """
-    fig = plt.figure(figsize=(18, 12))
+    import seaborn as sns
+    
+    fig = _new_figure(show, figsize=(18, 12))
     gs = fig.add_gridspec(2, 2)
     
     # 1. Main Forecast Plot
@@ -160,19 +208,10 @@ def create_dashboard(historical, forecast, actuals=None, comparison_df=None, sav
         sns.histplot(forecast, kde=True, ax=ax3, color='blue')
         ax3.set_title('Forecast Distribution', fontsize=12)
     
-    plt.tight_layout()
-    
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        try:
-            plt.savefig(save_path)
-            print(f"Saved dashboard to {save_path}")
-        except Exception as e:
-            print(f"Error saving dashboard: {e}")
-            
-    plt.show()
+    return _finish(fig, save_path, show, dpi, label='dashboard')
 
-def plot_forecast_comparison(historical, forecasts_dict, title=None, save_path=None):
+@instrument('plot')
+def plot_forecast_comparison(historical, forecasts_dict, title=None, save_path=None, show=True, dpi=None):
     """
     Compare multiple forecasts on the same plot.
     
@@ -181,13 +220,16 @@ def plot_forecast_comparison(historical, forecasts_dict, title=None, save_path=N
         forecasts_dict: Dictionary of forecasts {name: forecast_data}
         title: Plot title
         save_path: Path to save the plot
+        show: Display the figure (set False for batch rendering)
+        dpi: Resolution of the saved file (default: matplotlib's savefig.dpi)
     """
-    plt.figure(figsize=(14, 7))
+    fig = _new_figure(show, figsize=(14, 7))
+    ax = fig.add_subplot()
     
     # Plot historical data
     if historical is not None:
         idx = historical.index if hasattr(historical, 'index') else np.arange(len(historical))
-        plt.plot(idx, historical, label='Historical', color='gray', alpha=0.5, linewidth=2)
+        ax.plot(idx, historical, label='Historical', color='gray', alpha=0.5, linewidth=2)
     
     # Plot each forecast with different colors
     colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
@@ -195,30 +237,22 @@ def plot_forecast_comparison(historical, forecasts_dict, title=None, save_path=N
         if forecast is not None:
             idx = forecast.index if hasattr(forecast, 'index') else np.arange(len(forecast))
             color = colors[i % len(colors)]
-            plt.plot(idx, forecast, label=name, color=color, linewidth=2, linestyle='--')
+            ax.plot(idx, forecast, label=name, color=color, linewidth=2, linestyle='--')
     
     if title:
-        plt.title(title, fontsize=16)
+        ax.set_title(title, fontsize=16)
     else:
-        plt.title('Forecast Comparison', fontsize=16)
+        ax.set_title('Forecast Comparison', fontsize=16)
         
-    plt.xlabel('Date')
-    plt.ylabel('Sales')
-    plt.legend()
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        try:
-            plt.savefig(save_path)
-            print(f"Saved plot to {save_path}")
-        except Exception as e:
-            print(f"Error saving plot: {e}")
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Sales')
+    ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.7)
     
-    plt.show()
+    return _finish(fig, save_path, show, dpi)
 
-def plot_seasonal_decomposition(data, period=7, title=None, save_path=None):
+@instrument('plot')
+def plot_seasonal_decomposition(data, period=7, title=None, save_path=None, show=True, dpi=None):
     """
     Plot seasonal decomposition of time series data.
     
@@ -227,6 +261,8 @@ def plot_seasonal_decomposition(data, period=7, title=None, save_path=None):
         period: Seasonal period (default 7 for weekly)
         title: Plot title
         save_path: Path to save the plot
+        show: Display the figure (set False for batch rendering)
+        dpi: Resolution of the saved file (default: matplotlib's savefig.dpi)
     """
     from statsmodels.tsa.seasonal import seasonal_decompose
     
@@ -234,7 +270,8 @@ def plot_seasonal_decomposition(data, period=7, title=None, save_path=None):
         # Perform seasonal decomposition
         decomposition = seasonal_decompose(data, model='additive', period=period)
         
-        fig, axes = plt.subplots(4, 1, figsize=(14, 10))
+        fig = _new_figure(show, figsize=(14, 10))
+        axes = fig.subplots(4, 1)
         
         # Original
         axes[0].plot(data.index if hasattr(data, 'index') else range(len(data)), 
@@ -262,27 +299,18 @@ def plot_seasonal_decomposition(data, period=7, title=None, save_path=None):
         axes[3].grid(True, alpha=0.3)
         
         if title:
-            plt.suptitle(title, fontsize=16, y=0.995)
+            fig.suptitle(title, fontsize=16, y=0.995)
         else:
-            plt.suptitle('Seasonal Decomposition', fontsize=16, y=0.995)
+            fig.suptitle('Seasonal Decomposition', fontsize=16, y=0.995)
             
-        plt.tight_layout()
-        
-        if save_path:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            try:
-                plt.savefig(save_path)
-                print(f"Saved plot to {save_path}")
-            except Exception as e:
-                print(f"Error saving plot: {e}")
-        
-        plt.show()
+        return _finish(fig, save_path, show, dpi)
     except Exception as e:
         print(f"Error in seasonal decomposition: {e}")
         print("Make sure data has enough observations for the specified period.")
 
+@instrument('plot')
 def plot_category_forecast(data, category_col='Category', sales_col='Sales', date_col='Date', 
-                           top_n=5, title=None, save_path=None):
+                           top_n=5, title=None, save_path=None, show=True, dpi=None):
     """
     Plot forecasts by category.
     
@@ -294,45 +322,42 @@ def plot_category_forecast(data, category_col='Category', sales_col='Sales', dat
         top_n: Number of top categories to show
         title: Plot title
         save_path: Path to save the plot
+        show: Display the figure (set False for batch rendering)
+        dpi: Resolution of the saved file (default: matplotlib's savefig.dpi)
     """
     try:
         # Get top N categories by total sales
         top_categories = data.groupby(category_col)[sales_col].sum().nlargest(top_n).index
         
-        plt.figure(figsize=(14, 7))
+        groups = data.groupby(category_col)
+        
+        fig = _new_figure(show, figsize=(14, 7))
+        ax = fig.add_subplot()
         
         for category in top_categories:
-            cat_data = data[data[category_col] == category]
+            cat_data = groups.get_group(category)
             if date_col in cat_data.columns:
-                plt.plot(cat_data[date_col], cat_data[sales_col], label=category, linewidth=2)
+                ax.plot(cat_data[date_col], cat_data[sales_col], label=category, linewidth=2)
             else:
-                plt.plot(cat_data[sales_col], label=category, linewidth=2)
+                ax.plot(cat_data[sales_col], label=category, linewidth=2)
         
         if title:
-            plt.title(title, fontsize=16)
+            ax.set_title(title, fontsize=16)
         else:
-            plt.title(f'Top {top_n} Categories - Sales Forecast', fontsize=16)
+            ax.set_title(f'Top {top_n} Categories - Sales Forecast', fontsize=16)
             
-        plt.xlabel('Date')
-        plt.ylabel('Sales')
-        plt.legend()
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.tight_layout()
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Sales')
+        ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.7)
         
-        if save_path:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            try:
-                plt.savefig(save_path)
-                print(f"Saved plot to {save_path}")
-            except Exception as e:
-                print(f"Error saving plot: {e}")
-        
-        plt.show()
+        return _finish(fig, save_path, show, dpi)
     except Exception as e:
         print(f"Error plotting category forecast: {e}")
 
+@instrument('plot')
 def plot_region_forecast(data, region_col='Region', sales_col='Sales', date_col='Date', 
-                        title=None, save_path=None):
+                        title=None, save_path=None, show=True, dpi=None):
     """
     Plot forecasts by region.
     
@@ -343,38 +368,119 @@ def plot_region_forecast(data, region_col='Region', sales_col='Sales', date_col=
         date_col: Name of date column
         title: Plot title
         save_path: Path to save the plot
+        show: Display the figure (set False for batch rendering)
+        dpi: Resolution of the saved file (default: matplotlib's savefig.dpi)
     """
     try:
-        regions = data[region_col].unique()
+        fig = _new_figure(show, figsize=(14, 7))
+        ax = fig.add_subplot()
         
-        plt.figure(figsize=(14, 7))
-        
-        for region in regions:
-            region_data = data[data[region_col] == region]
+        for region, region_data in data.groupby(region_col, sort=False):
             if date_col in region_data.columns:
-                plt.plot(region_data[date_col], region_data[sales_col], label=region, linewidth=2)
+                ax.plot(region_data[date_col], region_data[sales_col], label=region, linewidth=2)
             else:
-                plt.plot(region_data[sales_col], label=region, linewidth=2)
+                ax.plot(region_data[sales_col], label=region, linewidth=2)
         
         if title:
-            plt.title(title, fontsize=16)
+            ax.set_title(title, fontsize=16)
         else:
-            plt.title('Regional Sales Forecast', fontsize=16)
+            ax.set_title('Regional Sales Forecast', fontsize=16)
             
-        plt.xlabel('Date')
-        plt.ylabel('Sales')
-        plt.legend()
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.tight_layout()
-        
-        if save_path:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            try:
-                plt.savefig(save_path)
-                print(f"Saved plot to {save_path}")
-            except Exception as e:
-                print(f"Error saving plot: {e}")
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Sales')
+        ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.7)
         
-        plt.show()
+        return _finish(fig, save_path, show, dpi)
     except Exception as e:
         print(f"Error plotting region forecast: {e}")
+
+PLOT_FUNCTIONS = {
+    func.__name__: func for func in (
+        plot_forecast, plot_error_analysis, plot_model_comparison, create_dashboard,
+        plot_forecast_comparison, plot_seasonal_decomposition, plot_category_forecast,
+        plot_region_forecast,
+    )
+}
+
+def _init_render_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+    init_worker()
+
+def _render_job(job, dpi=None):
+    """Render one job; returns (save path, None) or (None, error message)."""
+    name, kwargs = job
+    kwargs = {'dpi': dpi, **kwargs, 'show': False}
+    # Progress prints and library deprecation notices would repeat once per figure
+    output = io.StringIO()
+    try:
+        with redirect_thread_stdout(output), warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            fig = PLOT_FUNCTIONS[name](**kwargs)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    if fig is None:
+        # The plot caught its own error and printed it
+        return None, output.getvalue().strip() or 'no figure produced'
+    return kwargs.get('save_path'), None
+
+def _render_chunk(jobs, dpi=None):
+    return [_render_job(job, dpi) for job in jobs]
+
+@instrument('plot')
+def render_figures(jobs, n_jobs=None, dpi=None):
+    """
+    Render many figures to files without displaying them.
+
+    Every job draws onto its own standalone Figure (no pyplot state, no
+    plt.show()), and jobs are spread over a process pool, so the figure set
+    for hundreds of series renders in parallel instead of one at a time.
+
+    Args:
+        jobs: List of (function name, kwargs) pairs, e.g.
+            ('plot_forecast', {'historical': h, 'forecast': f, 'save_path': '...png'}).
+            The name is any key of PLOT_FUNCTIONS; kwargs should include save_path.
+        n_jobs (int): Worker processes (default: all CPUs; 1 renders in this process)
+        dpi (int): Resolution for jobs that do not set their own (e.g. 300 for print)
+
+    Returns:
+        list: Saved path per job, in job order (None where a plot failed)
+    """
+    jobs = list(jobs)
+    unknown = {name for name, _ in jobs} - set(PLOT_FUNCTIONS)
+    if unknown:
+        raise ValueError(f"Unknown plot function(s): {sorted(unknown)}")
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(jobs))
+    start = time.perf_counter()
+
+    if n_jobs <= 1:
+        results = _render_chunk(jobs, dpi)
+    else:
+        # Contiguous chunks (a few per worker) amortise pickling of the shared inputs
+        n_chunks = min(len(jobs), n_jobs * 4)
+        bounds = np.linspace(0, len(jobs), n_chunks + 1).astype(int)
+        chunks = [jobs[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        results = []
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_render_worker) as executor:
+            futures = [executor.submit(run_collecting, _render_chunk, chunk, dpi) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    chunk_results, metrics = future.result()
+                    results.extend(chunk_results)
+                    merge(metrics)
+                except Exception as e:
+                    # A worker died (or the chunk could not be pickled); only its jobs fail
+                    results.extend((None, f"{type(e).__name__}: {e}") for _ in chunk)
+
+    paths = [path for path, _ in results]
+    errors = [(kwargs.get('save_path', name), error)
+              for (name, kwargs), (_, error) in zip(jobs, results) if error is not None]
+    print(f"🖼️ Rendered {len(paths) - len(errors)}/{len(paths)} figures with {max(n_jobs, 1)} worker(s) "
+          f"in {time.perf_counter() - start:.1f}s")
+    for target, error in errors[:5]:
+        print(f"⚠️ {target}: {error}")
+    if len(errors) > 5:
+        print(f"⚠️ ... and {len(errors) - 5} more failed figure(s)")
+    return paths
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+SUPERSTORE_CSV = os.path.join(ROOT, 'data', 'processed', 'Sample - Superstore.csv')
+
+@pytest.fixture
+def orders_csv(tmp_path):
+    """A 2,000-row copy of the Superstore sample in a scratch directory."""
+    path = tmp_path / 'orders.csv'
+    pd.read_csv(SUPERSTORE_CSV, encoding='windows-1252', nrows=2000).to_csv(path, index=False)
+    return str(path)
+
+@pytest.fixture
+def daily_sales():
+    """Two years of daily sales with weekly seasonality and a trend."""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-01', periods=730, freq='D')
+    t = np.arange(len(dates))
+    sales = 200 + 0.2 * t + 40 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 10, len(t))
+    return pd.DataFrame({'Order Date': dates, 'Sales': sales})
@@ -0,0 +1,79 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from artifact_store import ArtifactStore, fingerprint
+from models import ARIMAForecaster, MLForecaster
+
+def memmapped_bytes(obj, seen=None, depth=0):
+    seen = set() if seen is None else seen
+    if id(obj) in seen or depth > 8:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.memmap):
+        return obj.nbytes
+    children = obj if isinstance(obj, dict) else getattr(obj, '__dict__', None)
+    if isinstance(obj, (list, tuple)):
+        return sum(memmapped_bytes(v, seen, depth + 1) for v in obj)
+    if not children:
+        return 0
+    return sum(memmapped_bytes(v, seen, depth + 1) for v in list(children.values()))
+
+def test_fingerprint_is_content_based():
+    a = pd.DataFrame({'x': [1.0, 2.0]})
+    assert fingerprint(a, ['x'], {'p': 1}) == fingerprint(a.copy(), ['x'], {'p': 1})
+    assert fingerprint(a, ['x'], {'p': 1}) != fingerprint(a, ['x'], {'p': 2})
+    assert fingerprint(a) != fingerprint(a.assign(x=[1.0, 3.0]))
+
+def test_fit_or_load_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((200, 3)), columns=['a', 'b', 'c'])
+    y = pd.Series(rng.random(200))
+    store = ArtifactStore(str(tmp_path))
+
+    fitted, key = store.fit_or_load(MLForecaster(model_type='random_forest', n_estimators=5, random_state=0), X, y)
+    loaded, same_key = store.fit_or_load(MLForecaster(model_type='random_forest', n_estimators=5, random_state=0), X, y)
+
+    assert same_key == key
+    np.testing.assert_allclose(loaded.predict(X), fitted.predict(X))
+    np.testing.assert_allclose(store.load(key, mmap_mode=None).predict(X), fitted.predict(X))
+
+def test_forest_trees_are_stored_as_mapped_arrays(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((200, 3)), columns=['a', 'b', 'c'])
+    y = pd.Series(rng.random(200))
+    store = ArtifactStore(str(tmp_path))
+    fitted, key = store.fit_or_load(MLForecaster(model_type='random_forest', n_estimators=5, random_state=0), X, y)
+
+    arrays = store.tree_arrays(key)
+    assert len(arrays) == 5
+    for (nodes, values), est in zip(arrays, fitted.model.estimators_):
+        assert isinstance(nodes, np.memmap) and isinstance(values, np.memmap)
+        assert not nodes.flags.writeable
+        np.testing.assert_array_equal(values, est.tree_.value)
+        np.testing.assert_array_equal(nodes['threshold'], est.tree_.threshold)
+
+def test_linear_models_have_no_tree_arrays(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((50, 2)), columns=['a', 'b'])
+    store = ArtifactStore(str(tmp_path))
+    _, key = store.fit_or_load(MLForecaster(model_type='linear_regression'), X, pd.Series(rng.random(50)))
+    with pytest.raises(KeyError):
+        store.tree_arrays(key)
+
+def test_arima_artifacts_are_memory_mapped(tmp_path):
+    y = pd.Series(np.random.default_rng(0).random(500).cumsum())
+    store = ArtifactStore(str(tmp_path))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        fitted, key = store.fit_or_load(ARIMAForecaster(order=(1, 1, 1)), y)
+        loaded = store.load(key)
+        np.testing.assert_allclose(loaded.predict(5), fitted.predict(5))
+    assert memmapped_bytes(loaded) > 0
+    assert memmapped_bytes(store.load(key, mmap_mode=None)) == 0
+
+def test_missing_artifact_raises(tmp_path):
+    with pytest.raises(KeyError):
+        ArtifactStore(str(tmp_path)).load('0' * 64)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from backtesting import make_folds, walk_forward_backtest
+from feature_engineering import create_all_features
+from models import BaselineForecaster, MLForecaster, evaluate_model
+
+MODELS = {
+    'naive': (BaselineForecaster, {'method': 'naive'}),
+    'linear_regression': (MLForecaster, {'model_type': 'linear_regression'}),
+}
+
+def test_make_folds_roll_forward_to_the_last_row():
+    folds = make_folds(200, n_folds=4, horizon=30, step=20)
+    assert folds == [(110, 140), (130, 160), (150, 180), (170, 200)]
+    # Origins that would leave less than min_train_size rows are dropped
+    assert make_folds(100, n_folds=5, horizon=30) == [(70, 100)]
+
+def test_backtest_matches_evaluate_model_per_fold(daily_sales):
+    features = create_all_features(daily_sales, lag_periods=[1, 7], rolling_windows=[7]).set_index('Order Date')
+    results = walk_forward_backtest(features, MODELS, n_folds=3, horizon=14, n_jobs=1)
+    scores = results.pivot_table(index=['fold', 'model'], columns='metric', values='value')
+
+    assert len(scores) == 3 * len(MODELS)
+    numeric = features.select_dtypes(include='number')
+    X, y = numeric.drop(columns='Sales'), numeric['Sales']
+    for fold, (train_end, test_end) in enumerate(make_folds(len(features), 3, 14)):
+        model = MLForecaster('linear_regression')
+        model.fit(X.iloc[:train_end], y.iloc[:train_end])
+        expected = evaluate_model(y.iloc[train_end:test_end], model.predict(X.iloc[train_end:test_end]),
+                                  'linear_regression', verbose=False)
+        naive = evaluate_model(y.iloc[train_end:test_end], np.full(test_end - train_end, y.iloc[train_end - 1]),
+                               'naive', verbose=False)
+        for metric in ('RMSE', 'MAE', 'MAPE', 'R2'):
+            np.testing.assert_allclose(scores.loc[(fold, 'linear_regression'), metric], expected[metric])
+            np.testing.assert_allclose(scores.loc[(fold, 'naive'), metric], naive[metric])
+
+def test_parallel_backtest_matches_serial(daily_sales):
+    features = create_all_features(daily_sales, lag_periods=[1, 7], rolling_windows=[7])
+    serial = walk_forward_backtest(features, MODELS, n_folds=2, horizon=14, n_jobs=1)
+    parallel = walk_forward_backtest(features, MODELS, n_folds=2, horizon=14, n_jobs=2)
+
+    scored = lambda r: r[r['metric'] != 'fit_predict_seconds'].reset_index(drop=True)
+    pd.testing.assert_frame_equal(scored(parallel), scored(serial))
@@ -0,0 +1,41 @@
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+
+spec = importlib.util.spec_from_file_location('benchmark_pipeline', os.path.join(ROOT, 'scripts', 'benchmark_pipeline.py'))
+benchmark_pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(benchmark_pipeline)
+
+def allocate(n_bytes):
+    return np.ones(n_bytes // 8).sum()
+
+def allocate_in_worker(n_bytes):
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(allocate, n_bytes).result()
+
+def test_measure_returns_result_and_traced_peak():
+    result, seconds, peak_mb, child_mb = benchmark_pipeline.measure(allocate, 64 * 2**20)
+    assert result == 8 * 2**20
+    assert seconds > 0
+    assert peak_mb >= 60 and child_mb == 0
+
+def test_measure_skips_memory_run():
+    _, _, peak_mb, child_mb = benchmark_pipeline.measure(allocate, 2**20, trace_memory=False)
+    assert peak_mb is None and child_mb is None
+
+@pytest.mark.skipif(benchmark_pipeline.resource is None, reason='needs RUSAGE_CHILDREN')
+def test_measure_counts_worker_processes():
+    _, _, peak_mb, child_mb = benchmark_pipeline.measure(allocate_in_worker, 128 * 2**20)
+    assert child_mb >= 128
+    assert peak_mb >= child_mb
+
+def test_regressions_compare_against_the_previous_run():
+    history = [{'results': [{'scale': 1, 'stage': 'load_data', 'seconds': 1.0}]}]
+    results = [{'scale': 1, 'stage': 'load_data', 'seconds': 1.5}, {'scale': 1, 'stage': 'plots', 'seconds': 9.0}]
+    regressions = benchmark_pipeline.report_regressions(results, history, threshold=0.2)
+    assert [(r['stage'], before) for r, before in regressions] == [('load_data', 1.0)]
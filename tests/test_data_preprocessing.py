@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from data_preprocessing import load_data
+
+def test_cached_load_matches_cold_load(orders_csv, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    cold = load_data(orders_csv)
+    first = load_data(orders_csv, cache=True, cache_dir=cache_dir)
+    cached = load_data(orders_csv, cache=True, cache_dir=cache_dir)
+
+    tm.assert_frame_equal(cold, first)
+    tm.assert_frame_equal(cold, cached)
+
+def test_cached_frame_is_mutable(orders_csv, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    load_data(orders_csv, cache=True, cache_dir=cache_dir)
+    cached = load_data(orders_csv, cache=True, cache_dir=cache_dir)
+
+    cached.loc[0, 'Sales'] = -1.0
+    cached['Quantity'] = cached['Quantity'].where(cached['Quantity'] > 1, 0)
+    cached.loc[cached.index[:3], 'Region'] = 'North'
+    assert cached.loc[0, 'Sales'] == -1.0
+    assert (cached.loc[cached.index[:3], 'Region'] == 'North').all()
+
+    # Writes stay private to the frame; the cache on disk is unchanged
+    reloaded = load_data(orders_csv, cache=True, cache_dir=cache_dir)
+    tm.assert_frame_equal(reloaded, load_data(orders_csv))
+
+def same_unit(ts_data, reference):
+    """Accumulated dates are rebuilt from day numbers; only their resolution may differ."""
+    return ts_data.set_axis(ts_data.index.as_unit(reference.index.unit))
+
+def test_streaming_matches_batch_aggregation(orders_csv):
+    from data_preprocessing import prepare_time_series_data, prepare_time_series_data_streaming
+
+    batch = prepare_time_series_data(load_data(orders_csv))
+    for chunksize in (97, 10_000):
+        streamed = prepare_time_series_data_streaming(orders_csv, chunksize=chunksize)
+        tm.assert_frame_equal(same_unit(streamed, batch), batch, check_freq=False)
+
+def test_streaming_resamples_to_coarser_frequencies(orders_csv):
+    from data_preprocessing import prepare_time_series_data, prepare_time_series_data_streaming
+
+    batch = prepare_time_series_data(load_data(orders_csv), freq='W')
+    streamed = prepare_time_series_data_streaming(orders_csv, freq='W', chunksize=500)
+    tm.assert_frame_equal(same_unit(streamed, batch), batch, check_freq=False)
+
+def test_incremental_update_matches_full_aggregation(orders_csv, tmp_path):
+    from data_preprocessing import prepare_time_series_data, update_time_series_data
+
+    orders = load_data(orders_csv)
+    state_path = str(tmp_path / 'state' / 'daily.npz')
+    # Batches out of date order, so the second one adds late orders to past days
+    shuffled = orders.sample(frac=1, random_state=0)
+    first, second = shuffled.iloc[:1200], shuffled.iloc[1200:]
+
+    update_time_series_data([first], state_path)
+    updated = update_time_series_data([first, second], state_path)
+    expected = prepare_time_series_data(orders)
+    tm.assert_frame_equal(same_unit(updated, expected), expected, check_freq=False)
+
+    # Re-running over ingested batches is a no-op
+    rerun = update_time_series_data([first, second], state_path)
+    tm.assert_frame_equal(rerun, updated)
+
+def test_incremental_update_from_files(orders_csv, tmp_path):
+    from data_preprocessing import prepare_time_series_data, update_time_series_data
+
+    state_path = str(tmp_path / 'daily.npz')
+    output_path = str(tmp_path / 'daily.csv')
+    updated = update_time_series_data([orders_csv], state_path, output_path=output_path, chunksize=300)
+    batch = prepare_time_series_data(load_data(orders_csv))
+
+    tm.assert_frame_equal(same_unit(updated, batch), batch, check_freq=False)
+    written = pd.read_csv(output_path, index_col='Order Date', parse_dates=True)
+    np.testing.assert_allclose(written['Sales'].to_numpy(), batch['Sales'].to_numpy())
+
+def test_panel_matches_per_series_aggregation(orders_csv):
+    from data_preprocessing import prepare_time_series_data
+
+    orders = load_data(orders_csv)
+    panel = prepare_time_series_data(orders, group_columns=['Category', 'Region'])
+
+    assert list(panel.columns) == ['Category', 'Region', 'Order Date', 'Sales']
+    assert panel.groupby(['Category', 'Region']).size().nunique() == 1
+    np.testing.assert_allclose(panel['Sales'].sum(), orders['Sales'].sum())
+
+    for (category, region), series in panel.groupby(['Category', 'Region']):
+        subset = orders[(orders['Category'] == category) & (orders['Region'] == region)]
+        expected = prepare_time_series_data(subset)['Sales']
+        actual = series.set_index('Order Date')['Sales']
+        # Each series spans the panel's common date range, with 0 for days without orders
+        inside = (actual.index >= expected.index.min()) & (actual.index <= expected.index.max())
+        np.testing.assert_allclose(actual[inside].to_numpy(), expected.to_numpy())
+        assert actual[~inside].eq(0).all()
+
+def test_pyramid_levels_and_range_totals(daily_sales):
+    from data_preprocessing import build_aggregate_pyramid, pyramid_range, pyramid_range_totals
+
+    pyramid = build_aggregate_pyramid(daily_sales)
+    sales = daily_sales.set_index('Order Date')['Sales']
+
+    monthly = sales.resample('MS').sum()
+    np.testing.assert_allclose(pyramid['monthly']['sum'].to_numpy(), monthly.to_numpy())
+    np.testing.assert_allclose(pyramid['daily']['MA7'].to_numpy(), sales.rolling(7).mean().to_numpy())
+
+    start, end = '2020-02-10', '2020-05-03'
+    window = sales.loc[start:end]
+    totals = pyramid_range_totals(pyramid, start, end)
+    assert totals['count'] == len(window)
+    np.testing.assert_allclose([totals['sum'], totals['mean']], [window.sum(), window.mean()])
+    tm.assert_series_equal(pyramid_range(pyramid, start, end)['Sales'], window)
+
+    # Per-period totals are clipped to the range
+    weekly = pyramid_range_totals(pyramid, start, end, level='weekly')
+    assert weekly['count'].sum() == len(window)
+    np.testing.assert_allclose(weekly['sum'].to_numpy(), window.resample('W').sum().to_numpy())
+
+def test_pyramid_cache_rebuilds_when_stale(daily_sales, tmp_path):
+    import os
+    from data_preprocessing import load_aggregate_pyramid
+
+    source = str(tmp_path / 'daily.csv')
+    cache = str(tmp_path / 'cache' / 'pyramid.pkl')
+    daily_sales.to_csv(source, index=False)
+    first = load_aggregate_pyramid(source, cache)
+    assert os.path.exists(cache)
+
+    daily_sales.assign(Sales=daily_sales['Sales'] * 2).to_csv(source, index=False)
+    os.utime(source, ns=(os.stat(cache).st_mtime_ns + 10**9,) * 2)
+    doubled = load_aggregate_pyramid(source, cache)
+    np.testing.assert_allclose(doubled['monthly']['sum'], first['monthly']['sum'] * 2)
+
+    with open(cache, 'wb') as f:
+        f.write(b'\x80\x04 truncated')
+    tm.assert_frame_equal(load_aggregate_pyramid(source, cache)['monthly'], doubled['monthly'])
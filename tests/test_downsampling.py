@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsampling import downsample, lttb_indices, minmax_indices, points_for_width
+
+@pytest.fixture
+def spiky_series():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2015-01-01', periods=5000, freq='D')
+    values = rng.normal(100, 5, len(dates))
+    values[1234] = 1000
+    values[4321] = -500
+    return pd.Series(values, index=dates)
+
+def brute_force_lttb(x, y, n_out):
+    """Reference LTTB with the same bucket edges, one point at a time."""
+    n = len(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected, prev = [0], 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < n_out - 2:
+            nxt = slice(edges[b + 1], edges[b + 2])
+            mx, my = x[nxt].mean(), y[nxt].mean()
+        else:
+            mx, my = x[-1], y[-1]
+        areas = [abs((x[prev] - mx) * (y[i] - y[prev]) - (x[prev] - x[i]) * (my - y[prev])) for i in range(lo, hi)]
+        prev = lo + int(np.argmax(areas))
+        selected.append(prev)
+    return np.array(selected + [n - 1])
+
+def test_lttb_matches_reference(spiky_series):
+    x = np.arange(len(spiky_series), dtype=float)
+    y = spiky_series.to_numpy()
+    np.testing.assert_array_equal(lttb_indices(x, y, 200), brute_force_lttb(x, y, 200))
+
+def test_downsampling_keeps_extremes_and_endpoints(spiky_series):
+    for method in ('lttb', 'minmax'):
+        x, y = downsample(spiky_series.index, spiky_series, 400, method=method)
+        assert len(y) <= 402
+        assert isinstance(x, pd.DatetimeIndex) and isinstance(y, pd.Series)
+        assert x.is_monotonic_increasing
+        assert y.max() == 1000 and y.min() == -500
+        assert x[0] == spiky_series.index[0] and x[-1] == spiky_series.index[-1]
+
+def test_short_series_are_returned_unchanged(spiky_series):
+    short = spiky_series.iloc[:100]
+    x, y = downsample(short.index, short, points_for_width(800))
+    assert x is short.index and y is short
+    np.testing.assert_array_equal(minmax_indices(short.to_numpy(), 500), np.arange(100))
+
+def test_gaps_do_not_break_lttb(spiky_series):
+    y = spiky_series.rolling(30).mean()
+    idx = lttb_indices(spiky_series.index.to_numpy(), y.to_numpy(), 300)
+    assert len(idx) == 300 and np.all(np.diff(idx) > 0)
+
+def test_unknown_method_raises(spiky_series):
+    with pytest.raises(ValueError):
+        downsample(spiky_series.index, spiky_series, 100, method='average')
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import FeatureCache, OnlineFeatureState, create_all_features, create_panel_features
+
+LAGS = [1, 7, 14]
+WINDOWS = [3, 7, 30]
+
+def make_panel(daily_sales, n_series=3):
+    rng = np.random.default_rng(1)
+    return pd.concat([
+        daily_sales.assign(Store=f's{i}', Sales=daily_sales['Sales'] * rng.lognormal(0, 0.2, len(daily_sales)))
+        for i in range(n_series)
+    ], ignore_index=True)
+
+def test_feature_cache_round_trip(tmp_path, daily_sales):
+    cache = FeatureCache(cache_dir=str(tmp_path / 'features'))
+    first = create_all_features(daily_sales, cache=cache)
+    second = create_all_features(daily_sales, cache=cache)
+
+    pd.testing.assert_frame_equal(second, first)
+    pd.testing.assert_frame_equal(first, create_all_features(daily_sales))
+    assert len(os.listdir(cache.cache_dir)) == 1
+
+def test_feature_cache_corrupt_entry_is_a_miss(tmp_path, daily_sales):
+    cache = FeatureCache(cache_dir=str(tmp_path / 'features'))
+    key = cache.key_for(daily_sales)
+    cache.put(key, daily_sales)
+    path = cache._path(key)
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+
+    with open(path, 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+
+def test_feature_cache_evicts_least_recently_used(tmp_path, daily_sales):
+    cache = FeatureCache(cache_dir=str(tmp_path / 'features'), max_entries=3)
+    for i in range(3):
+        cache.put(f'k{i}', daily_sales.head(10 + i))
+        os.utime(cache._path(f'k{i}'), (i, i))
+    cache.get('k0')
+    cache.put('k3', daily_sales.head(20))
+
+    assert cache.get('k1') is None
+    assert cache.get('k0') is not None
+
+def test_feature_cache_clear_without_directory(tmp_path):
+    cache = FeatureCache(cache_dir=str(tmp_path / 'missing'))
+    cache.clear()
+    assert cache.get('anything') is None
+
+def test_panel_features_match_per_series_features(daily_sales):
+    panel = make_panel(daily_sales)
+    # Shuffled input: the panel builder sorts by series and date itself
+    features = create_panel_features(panel.sample(frac=1, random_state=0), 'Store',
+                                     lag_periods=LAGS, rolling_windows=WINDOWS)
+
+    for store, series in panel.groupby('Store'):
+        expected = create_all_features(series.drop(columns='Store'), lag_periods=LAGS, rolling_windows=WINDOWS)
+        actual = features[features['Store'] == store].drop(columns='Store')
+        pd.testing.assert_frame_equal(actual[expected.columns].reset_index(drop=True),
+                                      expected.reset_index(drop=True), check_dtype=False)
+
+def test_online_updates_match_batch_features(daily_sales):
+    batch = create_all_features(daily_sales, lag_periods=LAGS, rolling_windows=WINDOWS)
+    state = OnlineFeatureState(lag_periods=LAGS, rolling_windows=WINDOWS)
+    rows = [state.update(date, value) for date, value in zip(daily_sales['Order Date'], daily_sales['Sales'])]
+    online = pd.concat(rows, ignore_index=True).dropna(ignore_index=True)
+
+    assert state.is_ready
+    pd.testing.assert_frame_equal(online[batch.columns], batch.reset_index(drop=True), check_dtype=False)
+
+def test_online_state_for_many_series(daily_sales):
+    wide = make_panel(daily_sales).pivot(index='Order Date', columns='Store', values='Sales')
+    state = OnlineFeatureState.from_history(wide.iloc[:400], lag_periods=LAGS, rolling_windows=WINDOWS)
+    for date, values in wide.iloc[400:-1].iterrows():
+        state.push(values.to_numpy())
+
+    date = wide.index[-1]
+    rows = state.update(date, wide.iloc[-1].to_numpy())
+    for i, store in enumerate(wide.columns):
+        expected = create_all_features(wide[store].rename('Sales').rename_axis('Order Date').reset_index(),
+                                       lag_periods=LAGS, rolling_windows=WINDOWS).iloc[-1]
+        np.testing.assert_allclose(rows.iloc[i][expected.index[1:]].to_numpy(dtype=float),
+                                   expected.iloc[1:].to_numpy(dtype=float))
+
+def test_next_features_match_the_next_training_row(daily_sales):
+    batch = create_all_features(daily_sales, lag_periods=LAGS, rolling_windows=WINDOWS)
+    history = daily_sales.set_index('Order Date')['Sales']
+    target = batch.iloc[-1]
+    state = OnlineFeatureState.from_history(history[history.index < target['Order Date']],
+                                            lag_periods=LAGS, rolling_windows=WINDOWS)
+
+    row = state.next_features(target['Order Date']).iloc[0]
+    columns = [c for c in batch.columns if c not in ('Order Date', 'Sales')]
+    np.testing.assert_allclose(row[columns].to_numpy(dtype=float), target[columns].to_numpy(dtype=float))
+
+def test_feature_cache_key_includes_feature_version(tmp_path, daily_sales, monkeypatch):
+    import feature_engineering
+
+    cache = FeatureCache(cache_dir=str(tmp_path / 'features'))
+    key = cache.key_for(daily_sales, lag_periods=LAGS)
+    monkeypatch.setattr(feature_engineering, 'FEATURE_VERSION', feature_engineering.FEATURE_VERSION + 1)
+    assert cache.key_for(daily_sales, lag_periods=LAGS) != key
+
+def test_feature_cache_survives_concurrent_removal(tmp_path, daily_sales, monkeypatch):
+    cache = FeatureCache(cache_dir=str(tmp_path / 'features'), max_entries=1)
+    cache.put('a', daily_sales)
+    path = cache._path('a')
+
+    # The entry disappears between the read and the access-time refresh
+    read_pickle = pd.read_pickle
+    def read_then_clear(p):
+        frame = read_pickle(p)
+        os.remove(p)
+        return frame
+    monkeypatch.setattr(pd, 'read_pickle', read_then_clear)
+    pd.testing.assert_frame_equal(cache.get('a'), daily_sales)
+    monkeypatch.undo()
+
+    # ...or between the eviction scan and the removal
+    cache.put('a', daily_sales)
+    stat, removed = os.stat, []
+    def stat_then_remove(p, *args, **kwargs):
+        result = stat(p, *args, **kwargs)
+        if str(p) == path and not removed:
+            removed.append(p)
+            os.remove(p)
+        return result
+    monkeypatch.setattr(os, 'stat', stat_then_remove)
+    cache.put('b', daily_sales)
+    cache.clear()
+    assert cache.get('b') is None
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+HEAVY = ['matplotlib.pyplot', 'seaborn', 'sklearn', 'statsmodels', 'joblib']
+
+@pytest.mark.parametrize('module', ['data_preprocessing', 'feature_engineering', 'artifact_store',
+                                    'models', 'backtesting', 'visualization'])
+def test_src_modules_defer_heavy_imports(module):
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, '-c', code], cwd=f"{ROOT}/src", capture_output=True,
+                            text=True, check=True).stdout.strip()
+    assert loaded == ''
+
+def test_plot_style_is_applied_on_first_figure():
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import visualization
+
+    visualization.plot_forecast(pd.Series([1.0, 2.0]), pd.Series([2.0, 3.0]), show=False)
+    assert plt.rcParams['font.size'] == 12
@@ -0,0 +1,63 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import instrumentation
+from instrumentation import configure, instrument, reset, stage, summary
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    reset()
+    yield
+    configure(quiet=False, enabled=True)
+    reset()
+
+@instrument('features')
+def noisy(values):
+    print('from the stage')
+    return values
+
+def test_records_calls_and_rows():
+    noisy(pd.DataFrame({'a': range(5)}))
+    row = summary().set_index('function').loc['noisy']
+    assert row['calls'] == 1 and row['rows_in'] == 5 and row['rows_out'] == 5
+
+def test_quiet_mode_only_silences_the_instrumented_thread(capsys):
+    configure(quiet=True)
+    inside, release = threading.Event(), threading.Event()
+
+    @instrument('features')
+    def blocking():
+        print('hidden')
+        inside.set()
+        release.wait(5)
+        print('hidden too')
+
+    worker = threading.Thread(target=blocking)
+    worker.start()
+    inside.wait(5)
+    print('main thread output')
+    release.set()
+    worker.join()
+
+    out = capsys.readouterr().out
+    assert 'main thread output' in out
+    assert 'hidden' not in out
+
+def test_works_without_resource_module(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'resource', None)
+    with stage('load'):
+        pass
+    assert summary().loc[0, 'peak_rss_bytes'] == 0
+
+def test_worker_process_metrics_are_merged():
+    from models import BaselineForecaster, fit_predict_many
+    tasks = {i: pd.Series([1.0, 2.0, float(i)]) for i in range(6)}
+    fit_predict_many(tasks, BaselineForecaster, horizon=3, n_jobs=2)
+
+    df = summary().set_index('function')
+    assert df.loc['BaselineForecaster.predict', 'calls'] == 6
+    # Forecaster fits are nested inside the fit_predict_many 'fit' stage, as in-process
+    assert 'BaselineForecaster.fit' not in df.index
+    assert df.loc['fit_predict_many', 'calls'] == 1
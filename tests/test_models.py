@@ -0,0 +1,247 @@
+import os
+import signal
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import ARIMAForecaster, BaselineForecaster, fit_predict_many
+
+class CrashingForecaster(BaselineForecaster):
+    """Kills its worker process when fitted on a series starting with -1."""
+    def fit(self, y):
+        if y.iloc[0] == -1:
+            os.kill(os.getpid(), signal.SIGKILL)
+        return super().fit(y)
+
+class SlowForecaster(BaselineForecaster):
+    def fit(self, y):
+        time.sleep(2)
+        return super().fit(y)
+
+def panel(n):
+    return {f's{i}': pd.Series([float(i), float(i) + 1.0]) for i in range(n)}
+
+def test_fit_predict_many_matches_serial():
+    serial = fit_predict_many(panel(5), BaselineForecaster, horizon=3, n_jobs=1)
+    parallel = fit_predict_many(panel(5), BaselineForecaster, horizon=3, n_jobs=2)
+    assert list(parallel['predictions']) == list(serial['predictions'])
+    for series_id, prediction in serial['predictions'].items():
+        np.testing.assert_allclose(parallel['predictions'][series_id], prediction)
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason='needs POSIX signals')
+def test_crashed_worker_fails_only_its_series():
+    tasks = panel(6)
+    tasks['s2'] = pd.Series([-1.0, 0.0])
+    for max_pending in (1, None, 6):
+        result = fit_predict_many(tasks, CrashingForecaster, horizon=2, n_jobs=2, max_pending=max_pending)
+
+        report = result['report'].set_index('series_id')
+        assert report.loc['s2', 'status'] == 'failed'
+        assert 'BrokenProcessPool' in report.loc['s2', 'error']
+        assert set(result['predictions']) == {'s0', 's1', 's3', 's4', 's5'}
+        assert list(report.index) == list(tasks)
+
+def test_duplicate_series_ids_are_rejected():
+    tasks = [('a', pd.Series([1.0, 2.0])), ('a', pd.Series([3.0, 4.0]))]
+    for n_jobs in (1, 2):
+        with pytest.raises(ValueError, match='Duplicate'):
+            fit_predict_many(tasks, BaselineForecaster, horizon=1, n_jobs=n_jobs)
+
+def test_serial_timeout_outside_the_main_thread_raises():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(1) as executor:
+        future = executor.submit(fit_predict_many, panel(2), BaselineForecaster, horizon=1, n_jobs=1, timeout=1)
+        with pytest.raises(ValueError, match='main thread'):
+            future.result()
+        # Worker processes run each series in their own main thread
+        result = executor.submit(fit_predict_many, panel(2), BaselineForecaster, horizon=1, n_jobs=2, timeout=5).result()
+    assert set(result['predictions']) == {'s0', 's1'}
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGALRM'), reason='needs SIGALRM')
+def test_timeout_restores_signal_handler():
+    before = signal.getsignal(signal.SIGALRM)
+    result = fit_predict_many(panel(1), SlowForecaster, horizon=2, n_jobs=1, timeout=0.2)
+    assert result['report'].loc[0, 'status'] == 'timeout'
+    assert signal.getsignal(signal.SIGALRM) is before
+
+def arima_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 + np.cumsum(rng.normal(0, 1, n)),
+                     index=pd.date_range('2020-01-01', periods=n, freq='D'))
+
+def test_arima_update_matches_extend_without_copying_history():
+    y = arima_series(120)
+    forecaster = ARIMAForecaster(order=(1, 1, 0))
+    forecaster.fit(y.iloc[:100])
+    reference = forecaster.model_fit.extend(y.iloc[100:])
+    for start in range(100, 120, 5):
+        forecaster.update(y.iloc[start:start + 5])
+
+    assert len(forecaster._pending) == 4
+    np.testing.assert_allclose(forecaster.predict(7), reference.forecast(steps=7))
+    pd.testing.assert_series_equal(forecaster.history, y)
+
+def test_arima_update_refits_on_full_history():
+    y = arima_series(120)
+    forecaster = ARIMAForecaster(order=(1, 1, 0), refit_every=10)
+    forecaster.fit(y.iloc[:100])
+    forecaster.update(y.iloc[100:110])
+
+    assert forecaster.updates_since_fit == 0
+    assert forecaster._pending == []
+    pd.testing.assert_series_equal(forecaster.history, y.iloc[:110])
+    assert forecaster.model_fit.nobs == 110
+
+def test_one_step_recursive_forecast_matches_training_features(daily_sales):
+    from feature_engineering import create_all_features
+    from models import MLForecaster
+
+    features = create_all_features(daily_sales, lag_periods=[1, 7, 14], rolling_windows=[7, 30])
+    X = features.drop(columns=['Order Date', 'Sales'])
+    model = MLForecaster('linear_regression')
+    model.fit(X, features['Sales'])
+
+    history = daily_sales.set_index('Order Date')['Sales']
+    for row in (0, 100, len(features) - 1):
+        date = features['Order Date'].iloc[row]
+        forecast = model.forecast_recursive(history[history.index < date], 1,
+                                            lag_periods=[1, 7, 14], rolling_windows=[7, 30])
+        assert forecast.index[0] == date
+        np.testing.assert_allclose(forecast.iloc[0], model.predict(X.iloc[[row]])[0])
+
+def test_grid_search_early_stopping_is_optional():
+    from models import select_arima_order
+
+    y = arima_series(150).reset_index(drop=True)
+    _, _, full = select_arima_order(y, max_p=2, max_q=2, search='grid', early_stopping=None, n_jobs=1)
+    order, _, stopped = select_arima_order(y, max_p=2, max_q=2, search='grid', early_stopping=1, n_jobs=1)
+
+    assert len(full) == 9
+    assert len(stopped) <= len(full)
+    assert stopped['score'].min() >= full['score'].min()
+    assert order == stopped.loc[0, 'order']
+
+def test_direct_forecast_matches_one_model_per_horizon(daily_sales):
+    from sklearn.linear_model import LinearRegression
+    from feature_engineering import create_all_features
+    from models import MLForecaster
+
+    features = create_all_features(daily_sales, lag_periods=[1, 7], rolling_windows=[7])
+    X = features.drop(columns=['Order Date', 'Sales']).reset_index(drop=True)
+    y = features['Sales'].reset_index(drop=True)
+
+    single = MLForecaster('linear_regression')
+    single.fit_direct(X, y, horizon=6)
+    bucketed = MLForecaster('linear_regression')
+    bucketed.fit_direct(X, y, horizon=6, n_buckets=3, n_jobs=1)
+
+    origins = X.iloc[-5:]
+    forecasts = single.predict_direct(origins)
+    assert forecasts.shape == (5, 6)
+    np.testing.assert_allclose(bucketed.predict_direct(origins), forecasts)
+
+    # Step h targets the value h - 1 days after the row's own day; only rows
+    # with all 6 targets known are trained on
+    for h in (1, 6):
+        reference = LinearRegression().fit(X.iloc[:-5], y.iloc[h - 1:len(y) - 6 + h])
+        np.testing.assert_allclose(forecasts[:, h - 1], reference.predict(origins))
+
+def test_direct_first_step_matches_one_step_predict(daily_sales):
+    from feature_engineering import OnlineFeatureState, create_all_features
+    from models import MLForecaster
+
+    features = create_all_features(daily_sales, lag_periods=[1, 7], rolling_windows=[7])
+    X = features.drop(columns=['Order Date', 'Sales']).reset_index(drop=True)
+    y = features['Sales'].reset_index(drop=True)
+
+    direct = MLForecaster('linear_regression')
+    direct.fit_direct(X, y, horizon=4)
+    one_step = MLForecaster('linear_regression')
+    one_step.fit(X.iloc[:-3], y.iloc[:-3])
+    np.testing.assert_allclose(direct.predict_direct(X.iloc[[100]])[:, 0], one_step.predict(X.iloc[[100]]))
+
+    # From the last known day, the origin row is the next day's features
+    history = daily_sales.set_index('Order Date')['Sales']
+    state = OnlineFeatureState.from_history(history, lag_periods=[1, 7], rolling_windows=[7])
+    origin = state.next_features(history.index[-1] + pd.Timedelta(days=1))[list(X.columns)]
+    recursive = one_step.forecast_recursive(history, 1, lag_periods=[1, 7], rolling_windows=[7])
+    np.testing.assert_allclose(direct.predict_direct(origin)[0, 0], recursive.iloc[0])
+
+def test_direct_rejects_more_buckets_than_steps(daily_sales):
+    from models import MLForecaster
+
+    X = pd.DataFrame({'x': np.arange(10, dtype=float)})
+    with pytest.raises(ValueError):
+        MLForecaster('linear_regression').fit_direct(X, X['x'], horizon=2, n_buckets=3)
+
+def test_direct_targets_stay_within_series():
+    from models import MLForecaster
+
+    X = pd.DataFrame({'x': np.arange(8, dtype=float), 'is_b': [0.0] * 4 + [1.0] * 4})
+    y = X['x'] + 96 * X['is_b']
+    forecaster = MLForecaster('linear_regression')
+    forecaster.fit_direct(X, y, horizon=2, groups=['a'] * 4 + ['b'] * 4)
+
+    # Within a series the targets are exactly linear; a pair crossing from a to b would not be
+    forecasts = forecaster.predict_direct(pd.DataFrame({'x': [0.0, 4.0], 'is_b': [0.0, 1.0]}))
+    np.testing.assert_allclose(forecasts, [[0, 1], [100, 101]], atol=1e-8)
+
+def test_batch_metrics_match_sklearn():
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+    from models import batch_metrics
+
+    rng = np.random.default_rng(3)
+    y_true = rng.uniform(50, 150, (4, 40))
+    y_pred = y_true[None] + rng.normal(0, 10, (2, 4, 40))
+    scores = batch_metrics(y_true, y_pred, series_ids=list('abcd'), model_names=['m1', 'm2'])
+
+    assert len(scores) == 8
+    for _, row in scores.iterrows():
+        actual = y_true['abcd'.index(row['series'])]
+        pred = y_pred[int(row['model'][1]) - 1, 'abcd'.index(row['series'])]
+        np.testing.assert_allclose(row['RMSE'], np.sqrt(mean_squared_error(actual, pred)))
+        np.testing.assert_allclose(row['MAE'], mean_absolute_error(actual, pred))
+        np.testing.assert_allclose(row['MAPE'], 100 * mean_absolute_percentage_error(actual, pred))
+        np.testing.assert_allclose(row['R2'], r2_score(actual, pred))
+
+def test_batch_metrics_skip_padding_and_zero_actuals():
+    from models import batch_metrics, evaluate_model
+
+    y_true = np.array([[0.0, 10.0, 20.0, np.nan], [5.0, 5.0, 5.0, 5.0]])
+    y_pred = np.array([[1.0, 12.0, 18.0, 99.0], [5.0, 5.0, 5.0, 5.0]])
+    scores = batch_metrics(y_true, y_pred)
+
+    first = scores.iloc[0]
+    assert first['n'] == 3
+    np.testing.assert_allclose(first['MAE'], 5 / 3)
+    np.testing.assert_allclose(first['MAPE'], 100 * (2 / 10 + 2 / 20) / 2)
+    assert np.isfinite(first['sMAPE'])
+    # A perfect forecast of a constant series: zero error, R2 undefined
+    assert scores.iloc[1]['RMSE'] == 0 and np.isnan(scores.iloc[1]['R2'])
+
+    quiet = evaluate_model(y_true[0, :3], y_pred[0, :3], 'model', verbose=False)
+    np.testing.assert_allclose(quiet['MAE'], first['MAE'])
+
+def test_mase_scales_by_in_sample_naive_error():
+    from models import batch_metrics
+
+    y_train = np.array([1.0, 3.0, 2.0, 4.0])
+    scores = batch_metrics([5.0, 6.0], [6.0, 6.0], y_train=y_train)
+    # MAE 0.5 over a mean absolute one-step naive error of 5/3
+    np.testing.assert_allclose(scores.loc[0, 'MASE'], 0.5 / (5 / 3))
+
+@pytest.mark.parametrize('criterion', ['aic', 'holdout'])
+def test_order_search_accepts_arrays(criterion):
+    from models import select_arima_order
+
+    y = arima_series(150)
+    kwargs = dict(max_p=1, max_q=1, search='grid', early_stopping=None, criterion=criterion, holdout=20, n_jobs=1)
+    order, _, from_array = select_arima_order(y.to_numpy(), **kwargs)
+    _, _, from_series = select_arima_order(y.reset_index(drop=True), **kwargs)
+
+    assert (from_array['status'] == 'ok').all()
+    assert order == from_series.loc[0, 'order']
+    np.testing.assert_allclose(from_array['score'], from_series['score'])
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+import pipeline
+from pipeline import run_pipeline
+
+TARGETS = ['forecast', 'backtest']
+
+def make_config(root, raw_path):
+    return {
+        'raw_path': raw_path,
+        'processed_dir': str(root / 'processed'),
+        'outputs_dir': str(root / 'outputs'),
+        'work_dir': str(root / 'work'),
+        'horizon': 14,
+        'models': {
+            'Naive Baseline': ['BaselineForecaster', {'method': 'naive'}],
+            'Linear Regression': ['MLForecaster', {'model_type': 'linear_regression'}],
+        },
+        'final_model': {'model_type': 'linear_regression'},
+        'backtest': {'n_folds': 2, 'horizon': 7},
+    }
+
+@pytest.fixture
+def checkout(tmp_path, orders_csv, monkeypatch):
+    root = tmp_path / 'checkout'
+    os.makedirs(root)
+    raw_path = str(root / 'orders.csv')
+    shutil.copy(orders_csv, raw_path)
+    monkeypatch.setattr(pipeline, 'ROOT', root)
+    return root, make_config(root, raw_path)
+
+def test_rerun_skips_every_stage(checkout):
+    _, config = checkout
+    first = run_pipeline(config, targets=TARGETS, n_jobs=1)
+    assert set(first.values()) == {'ran'}
+
+    second = run_pipeline(config, targets=TARGETS, n_jobs=1)
+    assert set(second.values()) == {'skipped'}
+
+def test_manifests_use_relative_paths(checkout):
+    root, config = checkout
+    run_pipeline(config, targets=['features'], n_jobs=1)
+    manifest = pipeline._read_manifest(config, 'features')
+    assert all(not os.path.isabs(entry['path']) for entry in manifest['outputs'])
+
+def test_modified_output_reruns_only_its_stage(checkout):
+    root, config = checkout
+    run_pipeline(config, targets=TARGETS, n_jobs=1)
+
+    # Truncate a published output; the stage regenerates identical content,
+    # so its downstream stages stay up to date
+    with open(os.path.join(config['processed_dir'], 'daily_sales_features.csv'), 'w'):
+        pass
+    status = run_pipeline(config, targets=TARGETS, n_jobs=1)
+    assert status['features'] == 'ran'
+    assert {status[name] for name in ('ingest', 'aggregate', 'train', 'backtest', 'forecast')} == {'skipped'}
+
+def test_moved_checkout_stays_up_to_date(checkout, tmp_path, monkeypatch):
+    root, config = checkout
+    run_pipeline(config, targets=TARGETS, n_jobs=1)
+
+    moved = tmp_path / 'moved'
+    shutil.move(str(root), str(moved))
+    monkeypatch.setattr(pipeline, 'ROOT', moved)
+    status = run_pipeline(make_config(moved, str(moved / 'orders.csv')), targets=TARGETS, n_jobs=1)
+    assert set(status.values()) == {'skipped'}
+
+def test_fingerprint_covers_imported_src_modules():
+    modules = {name: set(pipeline._code_dependencies(func)['modules']) for name, (_, func, _) in pipeline.STAGES.items()}
+    assert 'data_preprocessing.py' in modules['ingest']
+    assert 'feature_engineering.py' in modules['features']
+    assert {'models.py', 'feature_engineering.py'} <= modules['train']
+    assert 'models.py' in modules['forecast']
+    assert 'backtesting.py' in modules['backtest']
+    assert 'visualization.py' in modules['figures']
+
+def test_fingerprint_changes_with_src_module_source(checkout, monkeypatch):
+    config = {**pipeline.DEFAULT_CONFIG, **checkout[1]}
+    manifests = {'aggregate': {'output_fingerprint': 'x'}}
+    before = pipeline._stage_fingerprint(config, 'features', manifests)
+
+    original = pipeline._code_dependencies
+    def edited(func):
+        dependencies = original(func)
+        dependencies['modules']['feature_engineering.py'] = 'edited'
+        return dependencies
+    monkeypatch.setattr(pipeline, '_code_dependencies', edited)
+    assert pipeline._stage_fingerprint(config, 'features', manifests) != before
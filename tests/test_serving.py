@@ -0,0 +1,207 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from models import BaselineForecaster
+from serving import ForecastCache, ForecastService
+
+def fitted_baseline(values):
+    forecaster = BaselineForecaster(method='naive')
+    forecaster.fit(pd.Series(values, dtype=float))
+    return forecaster
+
+@pytest.fixture
+def service(tmp_path):
+    return ForecastService(max_wait_ms=1, cache=ForecastCache(max_entries=16, disk_dir=str(tmp_path / 'cache')))
+
+def test_reregistering_without_version_invalidates_cache(service):
+    service.register('m', fitted_baseline([1, 2, 3]))
+    assert service.forecast({'model': 'm', 'horizon': 3}, timeout=5) == [3.0, 3.0, 3.0]
+
+    service.register('m', fitted_baseline([7, 8, 9]))
+    assert service.forecast({'model': 'm', 'horizon': 3}, timeout=5) == [9.0, 9.0, 9.0]
+
+def test_derived_version_is_stable_for_identical_models(service):
+    service.register('m', fitted_baseline([1, 2, 3]))
+    first = service.versions['m']
+    service.register('m', fitted_baseline([1, 2, 3]))
+    assert service.versions['m'] == first
+
+def test_disk_cache_round_trip(tmp_path):
+    disk_dir = str(tmp_path / 'cache')
+    ForecastCache(disk_dir=disk_dir).get_or_compute('s', 7, 'v1', lambda: [1.0, 2.0])
+
+    restarted = ForecastCache(disk_dir=disk_dir)
+    value = restarted.get_or_compute('s', 7, 'v1', lambda: pytest.fail('should hit the disk tier'))
+    assert value == [1.0, 2.0]
+    assert restarted.stats()['hits'] == 1
+
+def test_disk_cache_is_bounded_lru(tmp_path):
+    disk_dir = str(tmp_path / 'cache')
+    cache = ForecastCache(max_entries=2, disk_dir=disk_dir, max_disk_entries=10)
+    cache.get_or_compute('hot', 1, 'v1', lambda: [0.0])
+    for i in range(30):
+        cache.get_or_compute(f's{i}', 1, 'v1', lambda: [float(i)])
+        # Keep 'hot' recently used on disk (the memory tier only holds 2 entries)
+        hot_path = cache._disk_path(('hot', 1, 'v1'))
+        if os.path.exists(hot_path):
+            os.utime(hot_path, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+
+    files = [name for name in os.listdir(disk_dir) if name.endswith('.pkl')]
+    assert len(files) <= 10
+    assert cache.stats()['disk_evictions'] > 0
+    assert os.path.exists(cache._disk_path(('hot', 1, 'v1')))
+
+def test_ttl_expires_entries():
+    cache = ForecastCache(ttl=0.01)
+    cache.get_or_compute('s', 1, 'v1', lambda: [1.0])
+    time.sleep(0.02)
+    assert cache.get_or_compute('s', 1, 'v1', lambda: [2.0]) == [2.0]
+
+@pytest.fixture
+def linear_service():
+    from models import MLForecaster
+    X = pd.DataFrame({'a': [0.0, 1.0, 2.0, 3.0], 'b': [1.0, 1.0, 2.0, 2.0]})
+    forecaster = MLForecaster(model_type='linear_regression')
+    forecaster.fit(X, 2 * X['a'] + X['b'])
+    service = ForecastService(max_wait_ms=200)
+    service.register('lr', forecaster, version='v1')
+    service.register('naive', fitted_baseline([1, 2, 3]), version='v1')
+    return service
+
+def test_malformed_request_fails_only_itself(linear_service):
+    # Submitted together, so they are coalesced into one batch
+    futures = [linear_service.submit(request) for request in [
+        {'model': 'lr', 'features': [[1.0, 1.0], [2.0, 2.0]]},
+        {'model': 'lr', 'features': [{'a': 1.0}]},
+        {'model': 'lr', 'features': [[1.0, 2.0, 3.0]]},
+        {'model': 'lr', 'features': [{'a': 3.0, 'b': 2.0}]},
+        {'model': 'naive'},
+        {'model': 'naive', 'horizon': 2},
+        {'model': 'missing', 'horizon': 2},
+    ]]
+
+    assert futures[0].result(5) == pytest.approx([3.0, 6.0])
+    with pytest.raises(KeyError):
+        futures[1].result(5)
+    with pytest.raises(ValueError):
+        futures[2].result(5)
+    assert futures[3].result(5) == pytest.approx([8.0])
+    with pytest.raises(KeyError):
+        futures[4].result(5)
+    assert futures[5].result(5) == [3.0, 3.0]
+    with pytest.raises(KeyError):
+        futures[6].result(5)
+    assert linear_service.batches == 1
+
+def test_failed_batched_predict_falls_back_per_request(linear_service):
+    futures = [linear_service.submit(request) for request in [
+        {'model': 'lr', 'features': [[1.0, 1.0]]},
+        {'model': 'lr', 'features': [[float('nan'), 1.0]]},
+        {'model': 'lr', 'features': [[2.0, 1.0]]},
+    ]]
+
+    assert futures[0].result(5) == pytest.approx([3.0])
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    assert futures[2].result(5) == pytest.approx([5.0])
+
+def test_non_string_model_is_rejected(linear_service):
+    with pytest.raises(TypeError):
+        linear_service.submit({'model': ['lr'], 'features': [[1.0, 2.0]]})
+    with pytest.raises(TypeError):
+        linear_service.forecast(['lr'])
+
+def test_batching_thread_survives_bad_items(linear_service):
+    from concurrent.futures import Future
+
+    # Bypass submit() to reach the batching thread with items it cannot even group
+    bad = [Future(), Future()]
+    linear_service.queue.put(({'model': ['lr']}, bad[0]))
+    linear_service.queue.put((None, bad[1]))
+    good = linear_service.submit({'model': 'naive', 'horizon': 1})
+
+    for future in bad:
+        with pytest.raises((TypeError, AttributeError)):
+            future.result(5)
+    assert good.result(5) == [3.0]
+    assert linear_service._worker.is_alive()
+    assert linear_service.forecast({'model': 'naive', 'horizon': 2}, timeout=5) == [3.0, 3.0]
+
+def test_http_rejects_malformed_requests_with_400(linear_service):
+    import json
+    import threading
+    import urllib.error
+    import urllib.request
+    from serving import ForecastHTTPServer, _make_handler
+
+    server = ForecastHTTPServer(('127.0.0.1', 0), _make_handler(linear_service, 5))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/forecast"
+    try:
+        for payload in ({'model': ['lr'], 'features': [[1, 2]]}, ['lr']):
+            request = urllib.request.Request(url, data=json.dumps(payload).encode(), method='POST')
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request, timeout=5)
+            assert error.value.code == 400
+        request = urllib.request.Request(url, data=json.dumps({'model': 'naive', 'horizon': 2}).encode(), method='POST')
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert json.loads(response.read())['forecast'] == [3.0, 3.0]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_disk_io_does_not_block_memory_hits(tmp_path):
+    import threading
+
+    cache = ForecastCache(disk_dir=str(tmp_path / 'cache'))
+    cache.get_or_compute('fast', 1, 'v1', lambda: [1.0])
+    reading, release = threading.Event(), threading.Event()
+    disk_lookup = cache._disk_lookup
+
+    def slow_disk_lookup(key):
+        reading.set()
+        release.wait(5)
+        return disk_lookup(key)
+
+    cache._disk_lookup = slow_disk_lookup
+    slow = threading.Thread(target=cache.get_or_compute, args=('slow', 1, 'v1', lambda: [2.0]))
+    slow.start()
+    try:
+        assert reading.wait(5)
+        started = time.perf_counter()
+        assert cache.get_or_compute('fast', 1, 'v1', lambda: pytest.fail('should hit memory')) == [1.0]
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        slow.join(5)
+
+def test_invalidate_keeps_only_the_current_version_on_disk(tmp_path):
+    disk_dir = str(tmp_path / 'cache')
+    cache = ForecastCache(disk_dir=disk_dir)
+    for version in ('v1', 'v2'):
+        cache.get_or_compute('m', 3, version, lambda: [float(version[1])])
+    cache.get_or_compute('other', 3, 'v1', lambda: [9.0])
+
+    cache.invalidate('m', keep_version='v2')
+    assert cache.stats()['disk_entries'] == 2
+    restarted = ForecastCache(disk_dir=disk_dir)
+    assert restarted.get_or_compute('m', 3, 'v2', lambda: pytest.fail('v2 was dropped')) == [2.0]
+    assert restarted.get_or_compute('other', 3, 'v1', lambda: pytest.fail('other was dropped')) == [9.0]
+    assert restarted.get_or_compute('m', 3, 'v1', lambda: [0.0]) == [0.0]
+
+def test_feature_requests_bypass_the_cache(tmp_path):
+    from models import MLForecaster
+
+    X = pd.DataFrame({'a': [0.0, 1.0, 2.0]})
+    forecaster = MLForecaster(model_type='linear_regression')
+    forecaster.fit(X, 3 * X['a'])
+    service = ForecastService(max_wait_ms=1, cache=ForecastCache())
+    service.register('lr', forecaster)
+
+    first = service.forecast({'model': 'lr', 'horizon': 1, 'features': [[1.0]]}, timeout=5)
+    second = service.forecast({'model': 'lr', 'horizon': 1, 'features': [[2.0]]}, timeout=5)
+    assert first == pytest.approx([3.0]) and second == pytest.approx([6.0])
+    assert service.cache.stats()['entries'] == 0
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from conftest import SUPERSTORE_CSV
+from data_preprocessing import load_data, prepare_time_series_data, prepare_time_series_data_streaming
+from synthetic_data import generate_orders, iter_order_chunks, write_orders
+
+def test_same_seed_gives_same_orders():
+    tm.assert_frame_equal(generate_orders(3000, seed=7, chunk_rows=1000), generate_orders(3000, seed=7, chunk_rows=1000))
+    assert not generate_orders(3000, seed=8)['Sales'].equals(generate_orders(3000, seed=7)['Sales'])
+
+def test_chunks_follow_the_superstore_schema():
+    sample = pd.read_csv(SUPERSTORE_CSV, encoding='windows-1252', nrows=5)
+    chunks = list(iter_order_chunks(2500, seed=1, chunk_rows=1000))
+    orders = pd.concat(chunks, ignore_index=True)
+
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    assert set(orders.columns) <= set(sample.columns)
+    assert orders['Order Date'].is_monotonic_increasing
+    assert (orders['Sales'] > 0).all() and orders['Discount'].between(0, 0.8).all()
+    assert orders['Product ID'].str[:6].eq(
+        orders['Category'].str[:3].str.upper() + '-' + orders['Sub-Category'].str[:2].str.upper()
+    ).all()
+
+def test_category_mix_is_calibrated_on_the_sample():
+    sample = pd.read_csv(SUPERSTORE_CSV, encoding='windows-1252')
+    orders = generate_orders(50_000, seed=3)
+    expected = sample['Category'].value_counts(normalize=True)
+    actual = orders['Category'].value_counts(normalize=True)
+    np.testing.assert_allclose(actual[expected.index], expected, atol=0.02)
+
+def test_written_orders_load_like_the_sample(tmp_path):
+    path = write_orders(str(tmp_path / 'orders.csv'), 4000, seed=5, chunk_rows=1500)
+    orders = load_data(path)
+    assert len(orders) == 4000
+    batch = prepare_time_series_data(orders)
+    streamed = prepare_time_series_data_streaming(path, chunksize=999)
+    np.testing.assert_allclose(streamed['Sales'].to_numpy(), batch['Sales'].to_numpy())
@@ -0,0 +1,60 @@
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualization import plot_forecast, render_figures
+
+@pytest.fixture
+def series():
+    index = pd.date_range('2021-01-01', periods=60, freq='D')
+    historical = pd.Series(np.linspace(100, 160, 60), index=index)
+    return historical, historical.iloc[-10:] * 1.05
+
+def test_batch_figures_leave_no_pyplot_state(series, tmp_path):
+    historical, forecast = series
+    plt.close('all')
+    fig = plot_forecast(historical, forecast, save_path=str(tmp_path / 'f.png'), show=False)
+    assert fig is not None
+    assert plt.get_fignums() == []
+    assert os.path.getsize(tmp_path / 'f.png') > 0
+
+def test_shown_figures_return_none(series):
+    historical, forecast = series
+    plt.close('all')
+    # Under Agg plt.show() is a no-op; the figure is still registered with pyplot
+    assert plot_forecast(historical, forecast) is None
+    assert len(plt.get_fignums()) == 1
+    plt.close('all')
+
+def test_batch_save_failure_raises(series, tmp_path):
+    historical, forecast = series
+    with pytest.raises(ValueError):
+        plot_forecast(historical, forecast, save_path=str(tmp_path / 'f.unknown-format'), show=False)
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_render_figures_isolates_failures(series, tmp_path, n_jobs):
+    historical, forecast = series
+    good = str(tmp_path / 'good.png')
+    # An existing file must not be mistaken for a successful render
+    stale = tmp_path / 'stale.unknown-format'
+    stale.write_bytes(b'old')
+    jobs = [
+        ('plot_forecast', {'historical': historical, 'forecast': forecast, 'save_path': good}),
+        ('plot_forecast', {'historical': historical, 'no_such_argument': 1,
+                           'save_path': str(tmp_path / 'bad_kwargs.png')}),
+        ('plot_forecast', {'historical': historical, 'forecast': forecast, 'save_path': str(stale)}),
+        ('plot_error_analysis', {'y_true': forecast, 'y_pred': forecast * 0.9,
+                                 'save_path': str(tmp_path / 'errors.png')}),
+    ]
+    paths = render_figures(jobs, n_jobs=n_jobs)
+
+    assert paths == [good, None, None, str(tmp_path / 'errors.png')]
+    assert os.path.exists(good) and os.path.exists(tmp_path / 'errors.png')
+    assert stale.read_bytes() == b'old'
+
+def test_render_figures_rejects_unknown_functions():
+    with pytest.raises(ValueError):
+        render_figures([('plot_nothing', {})])